@@ -53,8 +53,8 @@ class BadLineDetect(Entity):
 					    (self.i_cycl.now < specs.CYCL_REF + 40            )):
 						self.o_bdln.nxt <<= not self.i_aec.now
 
-				if self.o_bdln.now:
-					bl.add("Badline")
+				if (bl.enabled & bl.BADLINE) and self.o_bdln.now:
+					bl.add("[BADLINE] Badline")
 
 
 			if self.i_rst.now:
@@ -29,6 +29,14 @@ from registers import *
 
 import bus_logger as bl
 
+# registers the edges and the border color are decoded from
+BORD_REGS = regs_mask(17, 22, 32)
+
+# per-line border spans, so that GraphicsMux can fill border runs in bulk, are
+# not there yet: GraphicsMux drives o_colr for every pixel and LineOut takes
+# them one at a time, both would have to accept runs, to be checked against
+# the 8-pixel border pipeline and mid-line border color writes
+
 class Border(Entity):
 	def __init__(self):
 		self.i_specs = Input (t_vic_specs_h63)
@@ -39,6 +47,7 @@ class Border(Entity):
 		self.i_xpos  = Input (t_vic_ppos)
 		self.i_ypos  = Input (t_vic_ppos)
 		self.i_regs  = Input (t_vic_regs)
+		self.i_wmsk  = Input (t_vic_wmsk)
 		self.o_vbrd  = Output(Wire())
 		self.o_bord  = Output(Wire())
 		self.o_colr  = Output(t_vic_colr)
@@ -46,6 +55,12 @@ class Border(Entity):
 		self.ff_main = Signal(Wire())
 		self.ff_vert = Signal(Wire())
 
+		# decoded registers, these are combinational and only updated when
+		# one of BORD_REGS is written
+		self.reg_ec  = 0
+		self.reg_den = 0
+		self.edges   = (0, 0, 0, 0)
+
 	def _run(self):
 		if self.i_clk.posedge():
 
@@ -53,16 +68,17 @@ class Border(Entity):
 			ff_main = local(self.ff_main)
 			ff_vert = local(self.ff_vert)
 
-			reg_ec   = self.i_regs.now[32][4:0]
-			reg_rsel = self.i_regs.now[17][3]
-			reg_csel = self.i_regs.now[22][3]
-			reg_den  = self.i_regs.now[17][4]
+			if self.i_wmsk.now.dump & BORD_REGS:
+				reg_17 = self.i_regs.now[17].dump
+				reg_22 = self.i_regs.now[22].dump
 
-			edge_ll = specs.xfvc + 7 if (reg_csel == 0) else specs.xfvc
-			edge_rr = specs.xlvc - 8 if (reg_csel == 0) else specs.xlvc + 1
-			edge_hi = specs.yfvc + 4 if (reg_rsel == 0) else specs.yfvc
-			edge_lo = specs.ylvc - 3 if (reg_rsel == 0) else specs.ylvc + 1
+				self.reg_ec  = self.i_regs.now[32].dump & 15
+				self.reg_den = (reg_17 >> 4) & 1
+				self.edges   = specs.edges[(reg_22 & 8) >> 2 | (reg_17 & 8) >> 3]
 
+			reg_ec  = self.reg_ec
+			reg_den = self.reg_den
+			edge_ll, edge_rr, edge_hi, edge_lo = self.edges
 
 			if self.i_strb.now[0]:
 				# vertical ff control
@@ -93,14 +109,15 @@ class Border(Entity):
 				self.ff_vert.nxt <<= ff_vert
 				self.ff_main.nxt <<= ff_main
 
-				if self.o_bord.now:
-					bl.add("[BORDER] On")
-				else:
-					bl.add("[BORDER] Off")
-				bl.add(f"    Left Edge  = {edge_ll}")
-				bl.add(f"    Right Edge = {edge_rr}")
-				bl.add(f"    Top Edge   = {edge_hi}")
-				bl.add(f"    Bot Edge   = {edge_lo}")
+				if bl.enabled & bl.BORDER:
+					if self.o_bord.now:
+						bl.add("[BORDER] On")
+					else:
+						bl.add("[BORDER] Off")
+					bl.add("    Left Edge  = {}", edge_ll)
+					bl.add("    Right Edge = {}", edge_rr)
+					bl.add("    Top Edge   = {}", edge_hi)
+					bl.add("    Bot Edge   = {}", edge_lo)
 
 			if self.i_rst.now:
 				self.ff_main.nxt <<= 1
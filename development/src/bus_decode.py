@@ -0,0 +1,103 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Bit layout of a captured bus sample (one per dot-clock tick):               #
+#                                                                              #
+#    bits   field  dtype   description                                         #
+#    25:22  cnt    uint8   free-running sample counter of the logger           #
+#    21     ph0    uint8   phi0 clock                                          #
+#    20:9   db     uint16  data bus, 8 bits of data + 4 bits of color ram      #
+#    8:3    a      uint8   address bus, low 6 bits                             #
+#    2      rw     uint8   read/write                                          #
+#    1      cs     uint8   chip select (active low)                            #
+#    0      aec    uint8   address enable control                              #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import numpy as np
+
+# (name, lsb, width, dtype)
+FIELDS = (
+	("cnt", 22,  4, np.uint8 ),
+	("ph0", 21,  1, np.uint8 ),
+	("db" ,  9, 12, np.uint16),
+	("a"  ,  3,  6, np.uint8 ),
+	("rw" ,  2,  1, np.uint8 ),
+	("cs" ,  1,  1, np.uint8 ),
+	("aec",  0,  1, np.uint8 ),
+)
+
+FIELD_NAMES = tuple(f[0] for f in FIELDS)
+
+
+def field(words, name):
+	"""
+	Extracts a single field from an array of sample words
+	"""
+	for fname, lsb, width, dtype in FIELDS:
+		if fname == name:
+			return ((words >> lsb) & ((1 << width) - 1)).astype(dtype)
+	raise Exception(f"Unknown bus field {name}")
+
+
+class BusColumns:
+	"""
+	Columnar view of a decoded capture, one typed array per bus field
+	"""
+	def __init__(self, **columns):
+		for name in FIELD_NAMES:
+			setattr(self, name, columns[name])
+
+	def __len__(self):
+		return len(self.ph0)
+
+	def __getitem__(self, idx):
+		return BusColumns(**{name: getattr(self, name)[idx] for name in FIELD_NAMES})
+
+	def rows(self):
+		"""
+		Yields (ph0, db, a, rw, cs, aec) tuples of python integers, in the
+		order the testbench drives them
+		"""
+		return zip(self.ph0.tolist(), self.db.tolist(), self.a.tolist(),
+		           self.rw.tolist(), self.cs.tolist(), self.aec.tolist())
+
+
+def decode(words):
+	"""
+	Decodes an array of sample words (e.g. Capture.words) in one vectorized
+	pass
+	"""
+	words = np.asarray(words, dtype=np.uint32)
+	return BusColumns(**{name: field(words, name) for name in FIELD_NAMES})
+
+
+def decode_blocks(words, block=1 << 16, start=0):
+	"""
+	Decodes a capture block by block, so that arbitrarily long captures can
+	be streamed with a flat memory profile
+	"""
+	for i in range(start, len(words), block):
+		yield decode(words[i:i + block])
@@ -25,19 +25,149 @@
 
 from vic_pkg import *
 
-log = []
+from collections import deque
 
-def add(new):
+# logging categories, all disabled by default. Producers test the category
+# before building a message, so a disabled category costs a single branch:
+#
+#   if bl.enabled & bl.SYNC:
+#       bl.add("[SYNC] CYCLE = {}", cycl)
+#
+SYNC     = 1 << 0
+STROBE   = 1 << 1
+BORDER   = 1 << 2
+SPRITES  = 1 << 3
+REGISTER = 1 << 4
+BADLINE  = 1 << 5
+ALL      = SYNC | STROBE | BORDER | SPRITES | REGISTER | BADLINE
+
+enabled = 0
+
+TAGS = {
+	"[SYNC]"    : SYNC,
+	"[STROBE]"  : STROBE,
+	"[BORDER]"  : BORDER,
+	"[SPRITES]" : SPRITES,
+	"[REGISTER]": REGISTER,
+	"[BADLINE]" : BADLINE,
+}
+
+# entries are either plain strings or (template, args) pairs, which are only
+# formatted when a sink reads them through lines(). A template is a format
+# string or a function decorated with @formatter. The log is a ring buffer,
+# once full the oldest entries are dropped and counted in "overflow"
+DEFAULT_DEPTH = 4096
+
+log      = deque(maxlen=DEFAULT_DEPTH)
+overflow = 0
+
+# trigger points: when the raster reaches one of the (xpos, ypos) pairs in
+# trig_pixel, or one of the registers in trig_reg is written, the last
+# trig_depth entries are rendered and appended to snapshots as (label, lines)
+trig_pixel = set()
+trig_reg   = set()
+trig_depth = 64
+snapshots  = []
+
+# when an event_trace.EventTrace is attached here, entries are recorded as
+# typed events in the trace instead of the log
+trace = None
+
+
+def enable(mask=ALL):
+	global enabled
+	enabled |= mask
+
+
+def disable(mask=ALL):
+	global enabled
+	enabled &= ~mask
+
+
+def set_depth(depth):
 	global log
-	if isinstance(new, list):
-		log.extend(new)
-	else:
-		log.append(new)
+	log = deque(log, maxlen=depth)
+
+
+def add(new, *args):
+	global overflow
+	if trace is not None:
+		if isinstance(new, list):
+			for l in new:
+				trace.add(l, ())
+		else:
+			trace.add(new, args)
+		return
+
+	if args:
+		new = [(new, args)]
+	elif not isinstance(new, list):
+		new = [new]
+
+	drop = len(log) + len(new) - log.maxlen
+	if drop > 0:
+		overflow += drop
+	log.extend(new)
+
+
+def formatter(source):
+	"""
+	Marks a function as a message template of the given category. It is
+	called with the message arguments when the message is rendered
+	"""
+	def wrap(f):
+		f.source = source
+		return f
+	return wrap
+
+
+def source_of(template):
+	"""
+	Category of a message template, None for untagged continuation lines
+	"""
+	if callable(template):
+		return template.source
+	if template.startswith("["):
+		return TAGS.get(template[:template.find("]") + 1])
+	return None
+
+
+def render(entry):
+	if isinstance(entry, tuple):
+		template, args = entry
+		if callable(template):
+			return template(*args)
+		return template.format(*args)
+	return entry
+
+
+def lines(n=None):
+	"""
+	Renders the whole log, or only its last <n> entries
+	"""
+	if (n is None) or (n >= len(log)):
+		return [render(e) for e in log]
+	return [render(log[i]) for i in range(len(log) - n, len(log))]
+
+
+def snapshot(label, n=None):
+	ret = (label, lines(trig_depth if n is None else n))
+	snapshots.append(ret)
+	return ret
+
+
+def on_pixel(xpos, ypos):
+	if (xpos, ypos) in trig_pixel:
+		snapshot(f"pixel {xpos}, {ypos}")
+
+
+def on_reg_write(reg):
+	if reg in trig_reg:
+		snapshot(f"register {reg} write")
 
 
 def clear():
-	global log
-	log = []
+	log.clear()
 
 
 REG_NAMES = [
@@ -142,14 +272,19 @@ def get_video_mode(ecm, bmm, mcm):
 	return mode
 
 
-def reg_write_analyze(reg, val, regs=t_vic_regs):
+@formatter(REGISTER)
+def reg_write_text(reg, val, reg16, reg17, reg22):
+	return "\n".join(reg_write_lines(reg, val, reg16, reg17, reg22))
+
+
+def reg_write_lines(reg, val, reg16, reg17, reg22):
 	ret = []
 	name = REG_NAMES[reg]
 	ret.append(f"[REGISTER] {name} Write: {val}")
 
 	if reg in range(0, 16, 2):
 		idx = reg // 2
-		x_hi = (regs[16].val >> idx) & 1
+		x_hi = (reg16 >> idx) & 1
 		ret.append(f"    Sprite {idx} X (low) position => {val + (x_hi << 8)}")
 
 	if reg in range(1, 16, 2):
@@ -162,15 +297,15 @@ def reg_write_analyze(reg, val, regs=t_vic_regs):
 		ret.append(f"    DEN        => {(val >> 4) & 1}")
 		ecm = (val >> 6) & 1
 		bmm = (val >> 5) & 1
-		mcm = (regs[22].val >> 4) & 1
+		mcm = (reg22 >> 4) & 1
 		mode = get_video_mode(ecm, bmm, mcm)
 		ret.append(f"    Video Mode => {mode}")
 
 	if reg == 22:
 		ret.append(f"    Xscroll    => {val & 0b111}")
 		ret.append(f"    CSEL       => {(val >> 3) & 1}")
-		ecm = (regs[17].val >> 6) & 1
-		bmm = (regs[17].val >> 5) & 1
+		ecm = (reg17 >> 6) & 1
+		bmm = (reg17 >> 5) & 1
 		mcm = (val >> 4) & 1
 		mode = get_video_mode(ecm, bmm, mcm)
 		ret.append(f"    Video Mode => {mode}")
@@ -0,0 +1,151 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Packed binary bus capture. A capture file is a 32-byte little-endian        #
+#  header followed by one 32-bit little-endian word per dot-clock sample:      #
+#                                                                              #
+#    offset  size  field                                                       #
+#    0       8     magic "VICCAP\0\0"                                          #
+#    8       2     format version                                              #
+#    10      2     header size (offset of the first sample word)               #
+#    12      4     chip version, ascii, zero padded (e.g. "H63")               #
+#    16      8     sample rate in Hz (float64)                                 #
+#    24      8     number of samples                                           #
+#                                                                              #
+#  The sample words keep the bit layout of the original text dumps, see        #
+#  bus_decode.py for the field description.                                    #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import os
+import sys
+import struct
+
+import numpy as np
+
+MAGIC          = b"VICCAP\0\0"
+FORMAT_VERSION = 1
+HEADER         = struct.Struct("<8sHH4sdQ")
+WORD           = np.dtype("<u4")
+
+DEFAULT_RATE = 16.0e6
+DEFAULT_CHIP = "H63"
+
+# number of text lines converted per block, keeps the converter memory flat
+CONVERT_BLOCK = 1 << 16
+
+
+def write_header(f, nsamples, rate=DEFAULT_RATE, chip=DEFAULT_CHIP):
+	f.seek(0)
+	f.write(HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size,
+	                    chip.encode("ascii"), rate, nsamples))
+
+
+def convert_text(txt_path, cap_path, rate=DEFAULT_RATE, chip=DEFAULT_CHIP):
+	"""
+	Converts a text dump (one "<raster-line> <sample>" pair per line) into a
+	binary capture file. Returns the number of converted samples
+	"""
+	nsamples = 0
+	with open(txt_path) as fi, open(cap_path, "wb") as fo:
+		write_header(fo, 0, rate, chip)
+		block = []
+		for l in fi:
+			if not l.strip():
+				continue
+			block.append(int(l.split()[1]))
+			if len(block) == CONVERT_BLOCK:
+				fo.write(np.array(block, dtype=WORD).tobytes())
+				nsamples += len(block)
+				block = []
+		if block:
+			fo.write(np.array(block, dtype=WORD).tobytes())
+			nsamples += len(block)
+		write_header(fo, nsamples, rate, chip)
+	return nsamples
+
+
+class Capture:
+	"""
+	Read-only view of a binary capture file. Samples are memory-mapped, so
+	opening a capture costs the same regardless of its length
+	"""
+	def __init__(self, path):
+		self.path = path
+		with open(path, "rb") as f:
+			raw = f.read(HEADER.size)
+
+		if len(raw) < HEADER.size:
+			raise Exception(f"{path}: truncated capture header")
+
+		magic, version, hsize, chip, rate, nsamples = HEADER.unpack(raw)
+
+		if magic != MAGIC:
+			raise Exception(f"{path}: not a capture file")
+		if version != FORMAT_VERSION:
+			raise Exception(f"{path}: capture format version {version} not supported")
+
+		self.chip  = chip.rstrip(b"\0").decode("ascii")
+		self.rate  = rate
+		self.words = np.memmap(path, dtype=WORD, mode="r", offset=hsize, shape=(nsamples,))
+
+	def __len__(self):
+		return len(self.words)
+
+	def __getitem__(self, idx):
+		return self.words[idx]
+
+	def __iter__(self):
+		return self.iter_from(0)
+
+	def iter_from(self, start, block=CONVERT_BLOCK):
+		"""
+		Yields the samples as python integers, starting at sample <start>.
+		Only one block of the file is converted at a time
+		"""
+		for i in range(start, len(self.words), block):
+			yield from self.words[i:i + block].tolist()
+
+
+def open_capture(path):
+	"""
+	Opens <path> as a binary capture. Text dumps are converted once into a
+	".cap" file next to them, which is reused as long as it is up to date
+	"""
+	if path.endswith(".txt"):
+		cap_path = path[:-4] + ".cap"
+		if (not os.path.exists(cap_path) or
+		    os.path.getmtime(cap_path) < os.path.getmtime(path)):
+			convert_text(path, cap_path)
+		path = cap_path
+	return Capture(path)
+
+
+if __name__ == "__main__":
+	if len(sys.argv) != 3:
+		print("usage: capture.py <frame_dump.txt> <frame_dump.cap>")
+		sys.exit(1)
+	n = convert_text(sys.argv[1], sys.argv[2])
+	print(f"Converted {n} samples")
@@ -0,0 +1,99 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Engine checkpoints taken at frame starts. A checkpoint file is a 32-byte    #
+#  little-endian header followed by the zlib-compressed pickle of the engine   #
+#  state and of the pixels the engine pushed in the checkpointed cycle from    #
+#  the frame start onwards:                                                    #
+#                                                                              #
+#    offset  size  field                                                       #
+#    0       8     magic "VICSTATE"                                            #
+#    8       2     format version                                              #
+#    10      2     header size (offset of the compressed state)                #
+#    12      4     reserved                                                    #
+#    16      8     capture sample the engine resumes from                      #
+#    24      8     number of the frame that starts in the checkpoint           #
+#                                                                              #
+#  Resuming restores the state, replays the pending pixels and continues at    #
+#  the stored sample, so reaching any frame costs at most one frame of         #
+#  simulation. Pickles can run code when loaded, only open checkpoints you     #
+#  wrote yourself.                                                             #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import zlib
+import pickle
+import struct
+
+from capture import HEADER as CAPTURE_HEADER, WORD
+
+MAGIC          = b"VICSTATE"
+FORMAT_VERSION = 1
+HEADER         = struct.Struct("<8sHH4xQQ")
+
+
+class Checkpoint:
+	def __init__(self, state, offset, frame, pending=()):
+		self.state   = state
+		self.offset  = offset
+		self.frame   = frame
+		self.pending = list(pending)
+
+	@property
+	def byte_offset(self):
+		"""
+		Position of the resume sample in the capture file
+		"""
+		return CAPTURE_HEADER.size + self.offset * WORD.itemsize
+
+
+def save(path, engine, offset, frame, pending=()):
+	"""
+	Writes the state of <engine> once it has consumed the capture up to
+	sample <offset>. <pending> are the (colr, flag) pixels it pushed in the
+	last cycle starting with the frame start of frame <frame>
+	"""
+	body = pickle.dumps((engine.state(), list(pending)), pickle.HIGHEST_PROTOCOL)
+	with open(path, "wb") as f:
+		f.write(HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size, offset, frame))
+		f.write(zlib.compress(body, 9))
+
+
+def load(path):
+	with open(path, "rb") as f:
+		raw = f.read()
+
+	if len(raw) < HEADER.size:
+		raise Exception(f"{path}: truncated checkpoint header")
+
+	magic, version, hsize, offset, frame = HEADER.unpack_from(raw)
+
+	if magic != MAGIC:
+		raise Exception(f"{path}: not a checkpoint file")
+	if version != FORMAT_VERSION:
+		raise Exception(f"{path}: checkpoint format version {version} not supported")
+
+	state, pending = pickle.loads(zlib.decompress(raw[hsize:]))
+	return Checkpoint(state, offset, frame, pending)
@@ -0,0 +1,180 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Cycle-level decimation of a dot-clock capture. The emulator only samples    #
+#  the bus on a few strobes of each character cycle:                           #
+#                                                                              #
+#    strobe  field        consumer                                             #
+#    2       a            Sync (refresh pattern)                               #
+#    7       db           VideoMatrix (g-access), Sprites                      #
+#    9       aec          BadLineDetect                                        #
+#    10      a, cs, rw    Registers                                            #
+#    13      db           VideoMatrix (c-access)                               #
+#    14      db           Registers                                            #
+#    15      db           Sprites                                              #
+#                                                                              #
+#  so each cycle is collapsed into a single 12-byte record holding exactly     #
+#  those values. Strobes are recovered from ph0 the same way the Strobe        #
+#  entity does it: strobe 0 is the sample following the first low sample of    #
+#  ph0. Cycles of the wrong length, and cycles where a skipped sample          #
+#  disagrees with the value kept for it, are flagged.                          #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import numpy as np
+
+from bus_decode import decode
+
+STRB_A_SYNC = 2
+STRB_DB_GFX = 7
+STRB_AEC    = 9
+STRB_A_REG  = 10
+STRB_DB_CHR = 13
+STRB_DB_REG = 14
+STRB_DB_SPR = 15
+
+# ctl packs the control lines with the same bit positions as a sample word
+CTL_AEC = 0
+CTL_CS  = 1
+CTL_RW  = 2
+
+# the distance to the next ph0 falling edge is not 16 samples. Strobes only
+# depend on ph0 falling edges, so without this flag the emulator samples
+# exactly the strobes kept in the record
+FLAG_PHASE = 1 << 0
+
+# a skipped sample in the hold window of a kept value disagrees with it, the
+# line was still changing around the strobe the value was taken on
+FLAG_SKEW  = 1 << 1
+
+# hold windows, the first and last strobe over which each kept value is driven
+# steadily within its bus phase. Outside of them the lines legitimately change:
+# the VIC multiplexes the address and the data bus turns around between the
+# two halves of the cycle. db15 has no skipped sample in its window
+WINDOWS = [
+	("a"  , STRB_A_SYNC,  1,  2),
+	("a"  , STRB_A_REG ,  9, 10),
+	("db" , STRB_DB_GFX,  4,  8),
+	("db" , STRB_DB_CHR, 13, 14),
+	("aec", STRB_AEC   ,  8, 15),
+	("cs" , STRB_A_REG ,  9, 15),
+	("rw" , STRB_A_REG ,  9, 15),
+]
+
+CYCLE = np.dtype([
+	("a2"   , "u1" ),
+	("a10"  , "u1" ),
+	("ctl"  , "u1" ),
+	("flags", "u1" ),
+	("db7"  , "<u2"),
+	("db13" , "<u2"),
+	("db14" , "<u2"),
+	("db15" , "<u2"),
+])
+
+
+def cycle_starts(ph0):
+	"""
+	Returns the sample index of strobe 0 for every complete cycle in <ph0>
+	"""
+	ph0    = np.asarray(ph0)
+	starts = np.flatnonzero((ph0[:-1] == 1) & (ph0[1:] == 0)) + 2
+	return starts[starts + 16 <= len(ph0)]
+
+
+def decimate(words):
+	"""
+	Collapses a capture (array of sample words) into one CYCLE record per
+	character cycle. Returns (records, starts), where starts holds the sample
+	index of strobe 0 of each record
+	"""
+	bus    = decode(words)
+	starts = cycle_starts(bus.ph0)
+	rec    = np.zeros(len(starts), dtype=CYCLE)
+
+	rec["a2"  ] = bus.a [starts + STRB_A_SYNC]
+	rec["a10" ] = bus.a [starts + STRB_A_REG ]
+	rec["db7" ] = bus.db[starts + STRB_DB_GFX]
+	rec["db13"] = bus.db[starts + STRB_DB_CHR]
+	rec["db14"] = bus.db[starts + STRB_DB_REG]
+	rec["db15"] = bus.db[starts + STRB_DB_SPR]
+	rec["ctl" ] = ((bus.aec[starts + STRB_AEC  ] << CTL_AEC) |
+	               (bus.cs [starts + STRB_A_REG] << CTL_CS ) |
+	               (bus.rw [starts + STRB_A_REG] << CTL_RW ))
+
+	# the last record has no following edge, the capture simply ends there
+	rec["flags"][:-1][np.diff(starts) != 16] |= FLAG_PHASE
+
+	for field, strb, lo, hi in WINDOWS:
+		line = getattr(bus, field)
+		held = line[starts[:, None] + np.arange(lo, hi + 1)]
+		skew = (held != line[starts + strb][:, None]).any(axis=1)
+		rec["flags"][skew] |= FLAG_SKEW
+
+	return rec, starts
+
+
+def expand(rec):
+	"""
+	Rebuilds a dot-clock sample stream (16 words per record, starting at
+	strobe 0) which presents the recorded values on the strobes the emulator
+	samples. For records without flags this drives the emulator exactly like
+	the original capture
+	"""
+	n   = len(rec)
+	out = np.zeros((n, 16), dtype=np.uint32)
+	s   = np.arange(16)
+
+	ph0 = ((s >= 7) & (s <= 14)).astype(np.uint32)
+	a   = np.where(s < 6, rec["a2"][:, None], rec["a10"][:, None]).astype(np.uint32)
+	db  = np.select([s < 11, s < 14, s == 14],
+	                [rec["db7"][:, None], rec["db13"][:, None], rec["db14"][:, None]],
+	                rec["db15"][:, None]).astype(np.uint32)
+	ctl = rec["ctl"][:, None].astype(np.uint32)
+
+	out |= ph0 << 21
+	out |= db  << 9
+	out |= a   << 3
+	out |= ctl
+	return out.reshape(-1)
+
+
+def is_lossless(rec):
+	"""
+	True when no record carries a flag: every cycle is 16 samples long and
+	every skipped sample agrees with the value kept for its window
+	"""
+	return not rec["flags"].any()
+
+
+def save(path, rec):
+	np.save(path, rec)
+
+
+def load(path):
+	"""
+	Opens a decimated capture memory-mapped
+	"""
+	return np.load(path, mmap_mode="r")
@@ -0,0 +1,225 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Typed event trace. Instead of storing formatted strings, every bus_logger   #
+#  message becomes a fixed-size record holding the tick it was produced on,    #
+#  its source category, an event id (one per message template) and up to       #
+#  MAX_ARGS integer arguments. Sinks mark pixel boundaries, which builds an    #
+#  index from (frame, y, x) to the range of records produced for that pixel,   #
+#  so text is only rendered for the pixels somebody actually looks at. Sinks   #
+#  release every row they are done with, which drops its index and records,    #
+#  so the trace only holds the rows still being drawn.                         #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+from operator import index
+
+import numpy as np
+
+import bus_logger as bl
+
+MAX_ARGS = 6
+
+MAX_HRES = 504
+MAX_VRES = 312
+
+EVENT = np.dtype([
+	("tick", "<u8"),
+	("src" , "u1" ),
+	("evt" , "<u2"),
+	("narg", "u1" ),
+	("args", "<i4", (MAX_ARGS,)),
+])
+
+PAD = (0,) * MAX_ARGS
+
+
+class EventTrace:
+	"""
+	Record positions are absolute: base is the position of rec[0], records
+	before it have been released
+	"""
+	def __init__(self, capacity=1 << 16):
+		self.rec   = np.zeros(capacity, dtype=EVENT)
+		self.count = 0
+		self.base  = 0
+		self.tick  = 0
+
+		# event id -> template / source, and template -> event id
+		self.templates = []
+		self.sources   = []
+		self.ids       = {}
+
+		# (frame, y) -> (MAX_HRES, 2) array of [start, end) record ranges
+		self.index    = {}
+		self.mark_pos = 0
+
+
+	def event_id(self, template):
+		evt = self.ids.get(template)
+		if evt is None:
+			src = bl.source_of(template)
+			if src is None:
+				# continuation lines belong to the message they follow
+				src = self.sources[-1] if self.sources else 0
+			evt = len(self.templates)
+			self.templates.append(template)
+			self.sources.append(src)
+			self.ids[template] = evt
+		return evt
+
+
+	def add(self, template, args):
+		if len(args) > MAX_ARGS:
+			raise Exception(f"Too many event arguments for {template}")
+
+		if self.count == len(self.rec):
+			rec = np.zeros(2 * len(self.rec), dtype=EVENT)
+			rec[:self.count] = self.rec
+			self.rec = rec
+
+		evt  = self.event_id(template)
+		args = tuple(index(a) for a in args)
+		self.rec[self.count] = (self.tick, self.sources[evt], evt, len(args),
+		                        args + PAD[len(args):])
+		self.count += 1
+
+
+	def mark(self, frame, ypos, xpos):
+		"""
+		Closes the record range of pixel (frame, ypos, xpos): every record
+		added since the previous mark belongs to it
+		"""
+		idx = self.index.get((frame, ypos))
+		if idx is None:
+			idx = np.zeros((MAX_HRES, 2), dtype=np.int64)
+			self.index[(frame, ypos)] = idx
+		idx[xpos, 0] = self.mark_pos
+		idx[xpos, 1] = self.base + self.count
+		self.mark_pos = self.base + self.count
+
+
+	def spans(self, frame, ypos):
+		"""
+		[start, end) record ranges of every pixel of a row, None once the row
+		was released or when it was never marked
+		"""
+		return self.index.get((frame, ypos))
+
+
+	def range(self, frame, ypos, xpos):
+		idx = self.index.get((frame, ypos))
+		if idx is None:
+			return (0, 0)
+		start, end = idx[xpos]
+		return (int(start), int(end))
+
+
+	def records(self, start, end):
+		"""
+		Records in the absolute range [start, end), released ones are gone
+		"""
+		start = min(max(start - self.base, 0), self.count)
+		end   = min(max(end   - self.base, 0), self.count)
+		return self.rec[start:max(start, end)]
+
+
+	def events(self, frame, ypos, xpos, src=None):
+		"""
+		Records of a pixel, optionally only those of the categories in the
+		<src> mask
+		"""
+		rec = self.records(*self.range(frame, ypos, xpos))
+		if src is not None:
+			rec = rec[(rec["src"] & src) != 0]
+		return rec
+
+
+	def render(self, r):
+		return bl.render((self.templates[r["evt"]], tuple(r["args"][:r["narg"]].tolist())))
+
+
+	def lines(self, frame, ypos, xpos, src=None):
+		return [self.render(r) for r in self.events(frame, ypos, xpos, src)]
+
+
+	def find(self, template):
+		"""
+		All records still held that were produced from a given template
+		"""
+		evt = self.ids.get(template)
+		if evt is None:
+			return self.rec[:0]
+		rec = self.rec[:self.count]
+		return rec[rec["evt"] == evt]
+
+
+	def release(self, frame, ypos=None):
+		"""
+		Drops the index of a row, or of every row of a frame, together with
+		all records up to the last one of those rows. Sinks call it once a row
+		is written, rows are drawn in order so nothing else still needs them
+		"""
+		if ypos is None:
+			keys = [k for k in self.index if k[0] == frame]
+		else:
+			keys = [(frame, ypos)] if (frame, ypos) in self.index else []
+
+		end = self.base
+		for k in keys:
+			end = max(end, int(self.index.pop(k)[:, 1].max()))
+
+		drop = min(end - self.base, self.count)
+		if drop > 0:
+			self.count -= drop
+			self.rec[:self.count] = self.rec[drop:drop + self.count]
+			self.base += drop
+
+
+	def clear(self):
+		self.base    += self.count
+		self.count    = 0
+		self.mark_pos = self.base
+		self.index    = {}
+
+
+def attach(trace=None, mask=bl.ALL):
+	"""
+	Enables the bus_logger categories in <mask> and records their entries in
+	<trace>, a new EventTrace when None. Returns the trace
+	"""
+	if trace is None:
+		trace = EventTrace()
+	bl.enable(mask)
+	bl.trace = trace
+	return trace
+
+
+def detach():
+	"""
+	Undoes attach(), entries go to the bus_logger ring buffer again
+	"""
+	bl.trace = None
+	bl.disable(bl.ALL)
@@ -34,6 +34,9 @@ MODE      = EnumDef("STD_TEXT", "MCL_TEXT", "STD_BMAP", "MCL_BMAP", "ECM_TEXT",
 # we have an additional cell in the shift register to implement an additional cycle delay
 SHREG_LEN = 8
 
+# background color registers
+BGND_REGS = regs_mask(33, 34, 35, 36)
+
 class GraphicsGen(Entity):
 	def __init__(self):
 		self.i_clk     = Input (Wire())
@@ -73,6 +76,10 @@ class GraphicsGen(Entity):
 		self.gfx_val   = Signal(Unsigned().bits(2))
 		self.gfx_bgnd  = Signal(Wire())
 
+		# cached 4-color table, see get_palette
+		self.pal_key   = None
+		self.pal       = (0, 0, 0, 0)
+
 
 	@classmethod
 	def get_mode(cls, ecm, bmm, mcm):
@@ -89,15 +96,44 @@ class GraphicsGen(Entity):
 		else:
 			return MODE.INVALID
 
+	@classmethod
+	def get_palette(cls, flags, data, bg_colr, bg_sel=1):
+		"""
+		Colors of the four pixel values for a character, flags being
+		(ECM << 2) | (BMM << 1) | MCM as in get_mode. In ECM mode bits 7:6 of
+		the character select the background color through a single bit wide
+		bg_sel, so only bit 6 is used; VicFast passes bg_sel=3 for both bits
+		"""
+		colr = (data >> 8) & 15
+
+		if flags == 0b000:   # STD_TEXT
+			return (bg_colr[0], bg_colr[0], colr, colr)
+
+		elif flags == 0b001: # MCL_TEXT
+			if data & 0x800:
+				return (bg_colr[0], bg_colr[1], bg_colr[2], colr & 7)
+			else:
+				return (bg_colr[0], bg_colr[0], colr & 7, colr & 7)
+
+		elif flags == 0b010: # STD_BMAP
+			return (data & 15, data & 15, (data >> 4) & 15, (data >> 4) & 15)
+
+		elif flags == 0b011: # MCL_BMAP
+			return (bg_colr[0], (data >> 4) & 15, data & 15, colr)
+
+		elif flags == 0b100: # ECM_TEXT
+			bg = bg_colr[(data >> 6) & bg_sel]
+			return (bg, bg, colr, colr)
+
+		else:
+			return (0, 0, 0, 0)
+
 
 	def _run(self):
 
-		mode     = Enum(MODE)
 		mc_flag  = Wire()
-		gfx_colr = Array([t_vic_colr]*4)
 		gfx_val  = Unsigned().bits(2)
 		gfx_bgnd = Wire()
-		bg_sel   = Wire()
 
 		if self.i_clk.posedge():
 
@@ -214,61 +250,22 @@ class GraphicsGen(Entity):
 				self.gfx_val.nxt  <<= gfx_val
 				self.gfx_bgnd.nxt <<= gfx_bgnd
 
-				# color selection is based on current mode flags
-				mode <<= self.get_mode(self.ecm.now, self.bmm.now, self.mcm.now)
+				# color selection is based on current mode flags. The 4-color
+				# table only changes with a new character, new mode flags or new
+				# background colors, so it is resolved once and then cached
+				flags     = (self.ecm.now.dump << 2) | (self.bmm.now.dump << 1) | self.mcm.now.dump
+				data_colr = self.data_3r.now.dump
+				bg_colr   = tuple(self.bg_colr.now[i].dump for i in range(4))
 
-				gfx_colr[0] <<= 0
-				gfx_colr[1] <<= 0
-				gfx_colr[2] <<= 0
-				gfx_colr[3] <<= 0
-
-				data_colr = self.data_3r.now
-
-				if (mode == MODE.STD_TEXT):
-					gfx_colr[0] <<= self.bg_colr.now[0]
-					gfx_colr[1] <<= self.bg_colr.now[0]
-					gfx_colr[2] <<= data_colr[12:8]
-					gfx_colr[3] <<= data_colr[12:8]
-
-				elif (mode == MODE.MCL_TEXT):
-					if mc_flag:
-						gfx_colr[0] <<= self.bg_colr.now[0]
-						gfx_colr[1] <<= self.bg_colr.now[1]
-						gfx_colr[2] <<= self.bg_colr.now[2]
-						gfx_colr[3] <<= data_colr[11:8]
-					else:
-						gfx_colr[0] <<= self.bg_colr.now[0]
-						gfx_colr[1] <<= self.bg_colr.now[0]
-						gfx_colr[2] <<= data_colr[11:8]
-						gfx_colr[3] <<= data_colr[11:8]
-
-				elif (mode ==  MODE.STD_BMAP):
-					gfx_colr[0] <<= data_colr[4:0]
-					gfx_colr[1] <<= data_colr[4:0]
-					gfx_colr[2] <<= data_colr[8:4]
-					gfx_colr[3] <<= data_colr[8:4]
-
-				elif (mode == MODE.MCL_BMAP):
-					gfx_colr[0] <<= self.bg_colr.now[0]
-					gfx_colr[1] <<= data_colr[8:4]
-					gfx_colr[2] <<= data_colr[4:0]
-					gfx_colr[3] <<= data_colr[12:8]
-
-				elif (mode == MODE.ECM_TEXT):
-					bg_sel      <<= data_colr[8:6]
-					gfx_colr[0] <<= self.bg_colr.now[bg_sel]
-					gfx_colr[1] <<= self.bg_colr.now[bg_sel]
-					gfx_colr[2] <<= data_colr[12:8]
-					gfx_colr[3] <<= data_colr[12:8]
-
-				else:
-					pass
+				if (flags, data_colr, bg_colr) != self.pal_key:
+					self.pal_key = (flags, data_colr, bg_colr)
+					self.pal     = self.get_palette(flags, data_colr, bg_colr)
 
 				################################################################
 				#                            OUTPUT                            #
 				################################################################
 
-				self.o_colr.nxt <<= gfx_colr[gfx_val]
+				self.o_colr.nxt <<= self.pal[gfx_val.dump]
 				self.o_bgnd.nxt <<= gfx_bgnd
 
 				################################################################
@@ -279,17 +276,17 @@ class GraphicsGen(Entity):
 #				bl.add(f"    {bin(data_colr)}")
 #				bl.add(f"    {bin(gfx_val)}")
 #				bl.add("[GFX-GEN] Graphics Colors:")
-#				bl.add(f"    {bl.COLOR[gfx_colr[0]]}")
-#				bl.add(f"    {bl.COLOR[gfx_colr[1]]}")
-#				bl.add(f"    {bl.COLOR[gfx_colr[2]]}")
-#				bl.add(f"    {bl.COLOR[gfx_colr[3]]}")
+#				bl.add(f"    {bl.COLOR[self.pal[0]]}")
+#				bl.add(f"    {bl.COLOR[self.pal[1]]}")
+#				bl.add(f"    {bl.COLOR[self.pal[2]]}")
+#				bl.add(f"    {bl.COLOR[self.pal[3]]}")
 #				bl.add("[GFX-GEN] Background Colors:")
 #				bl.add(f"    {bl.COLOR[self.bg_colr.now[0]]}")
 #				bl.add(f"    {bl.COLOR[self.bg_colr.now[1]]}")
 #				bl.add(f"    {bl.COLOR[self.bg_colr.now[2]]}")
 #				bl.add(f"    {bl.COLOR[self.bg_colr.now[3]]}")
 #				bl.add(f"[GFX-GEN] Video Mode:")
-#				bl.add(f"    {mode.dump}")
+#				bl.add(f"    {flags:03b}")
 #				bl.add("[GFX-GEN] Is Background:")
 #				bl.add(f"    {gfx_bgnd.dump}")
 #				bl.add("[GFX-GEN] Xscroll:")
@@ -29,9 +29,10 @@ from registers import *
 
 
 class GraphicsMux(Entity):
-	def __init__(self, g_mark_lines=False):
+	def __init__(self, g_mark_lines=False, g_line_out=None):
 
 		self.g_mark_lines = g_mark_lines
+		self.g_line_out   = g_line_out
 
 		self.i_specs     = Input(t_vic_specs_h63)
 		self.i_clk       = Input(Wire())
@@ -74,6 +75,12 @@ class GraphicsMux(Entity):
 		if self.i_clk.posedge():
 			specs = self.i_specs.now
 
+			# line-batched output (see LineOut), fed with the pixel that the
+			# outputs hold before this edge
+			line_out = self.g_line_out
+			if (line_out is not None) and line_out.sinks and (self.o_push.now == 1):
+				line_out.push(self.o_colr.now, self.o_lstr.now, self.o_lend.now, self.o_fstr.now)
+
 			if not (self.i_strb.now[0]):
 
 				self.sprt_actv.nxt <<= self.i_sprt_actv.now
@@ -0,0 +1,91 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Line-batched pixel output. LineOut frames the pixels pushed by the          #
+#  graphics mux the same way FrameSink does and hands every completed line to  #
+#  its sinks at o_lend, as a view of one preallocated buffer together with     #
+#  the line and frame numbers. Sinks run once per line and share the buffer,   #
+#  so they have to copy what they keep before returning. LineOut is not an     #
+#  entity: GraphicsMux passes it the pixel of its outputs on each clock edge   #
+#  once a sink is attached, so no extra process is evaluated on every tick.    #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+from vic_pkg import *
+
+import numpy as np
+
+
+class LineOut:
+	def __init__(self, g_specs=t_vic_specs_h63):
+		self.xlen  = g_specs.xlen
+		self.ylen  = g_specs.ylen
+		self.line  = np.zeros(self.xlen, dtype=np.uint8)
+		self.sinks = []
+
+		self.xpos  = 0
+		self.lnum  = 0
+		self.fcnt  = 0
+		self.dirty = False
+
+
+	def push(self, colr, lstr, lend, fstr):
+		"""
+		One pixel, with the framing strobes of the graphics mux. Positions are
+		clamped like in FrameSink
+		"""
+		if self.xpos > self.xlen - 1:
+			self.xpos = self.xlen - 1
+
+		if self.lnum > self.ylen - 1:
+			self.lnum = self.ylen - 1
+
+		if lstr == 1:
+			self.xpos = 0
+			if fstr == 1:
+				self.lnum = 0
+				self.fcnt += 1
+
+		self.line[self.xpos] = colr
+		self.xpos += 1
+		self.dirty = True
+
+		if lend == 1:
+			self.flush()
+			self.lnum += 1
+
+
+	def flush(self):
+		"""
+		Hands the pixels of the current line to the sinks, also used to pass
+		on the last line of a run when it is cut short
+		"""
+		if not self.dirty:
+			return
+
+		self.dirty = False
+		line = self.line[:self.xpos]
+		for sink in self.sinks:
+			sink(line, self.lnum, self.fcnt)
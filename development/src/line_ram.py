@@ -0,0 +1,75 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Compact RAM for line buffers and other small memories of the entities,      #
+#  standing in for an Array signal. The words live in an array.array, with     #
+#  one registered write port and one read port.                                #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+from array import array
+
+
+class LineRam:
+	"""
+	RAM of <size> words of array type <typecode>. write() stages a word that
+	clock() commits, the owner calls clock() once at the start of every rising
+	edge. read() returns the committed words, so a write becomes visible on
+	the edge after it like ram.nxt[a] <<= d would. There is a single write
+	port, a second write on the same edge replaces the first. clear() is
+	staged the same way
+	"""
+	def __init__(self, size, typecode="H"):
+		self.mem  = array(typecode, [0]) * size
+		self.wclr = False
+		self.wadd = -1
+		self.wdat = 0
+
+	def __len__(self):
+		return len(self.mem)
+
+	def clock(self):
+		if self.wclr:
+			self.mem  = array(self.mem.typecode, [0]) * len(self.mem)
+			self.wclr = False
+		if self.wadd >= 0:
+			self.mem[self.wadd] = self.wdat
+			self.wadd = -1
+
+	def write(self, addr, data):
+		self.wadd = addr
+		self.wdat = data
+
+	def read(self, addr):
+		return self.mem[addr]
+
+	def clear(self):
+		"""
+		Clears every word on the next clock(), like assigning 0 to all of
+		ram.nxt: a write staged earlier on the same edge is dropped, a later
+		one still lands
+		"""
+		self.wclr = True
+		self.wadd = -1
@@ -0,0 +1,172 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Whole-line graphics renderer. The 40 c-access words and the 40 g-access     #
+#  bytes latched on a display line determine its 320 graphics pixels, as long  #
+#  as the mode flags and the background colors do not change during the line.  #
+#  render_line expands them through bit-unpacking tables in one vectorized     #
+#  step. LineGfx keeps the rendered pixels by character and renders the ones   #
+#  missed on a line when the line ends. Only VicFast uses it: it plays a       #
+#  character back from there after its load, and goes back to the cycle-exact  #
+#  path when one of GFX_REGS is written. GraphicsGen always runs cycle-exact.  #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import numpy as np
+
+from registers import regs_mask
+
+# registers that can change the graphics pixels of a line
+GFX_REGS = regs_mask(17, 22, 33, 34, 35, 36)
+
+# pixel values of a g-access byte: single-color pixels are 0 or 3, 0 or 2 with
+# BMM or a multi-color character, multi-color ones are bit pairs lasting two
+# pixels each
+BITS     = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+STD_VALS = BITS * 3
+BMC_VALS = BITS << 1
+MCL_VALS = np.repeat((BITS[:, 0::2] << 1) | BITS[:, 1::2], 2, axis=1)
+
+
+def get_palettes(flags, cc, bg_colr):
+	"""
+	Vectorized GraphicsGen.get_palette as VicFast calls it (bg_sel=3), one row
+	of 4 colors per c-access word
+	"""
+	bg   = np.asarray(bg_colr, dtype=np.uint8)
+	colr = ((cc >> 8) & 15).astype(np.uint8)
+	lo   = (cc & 15).astype(np.uint8)
+	hi   = ((cc >> 4) & 15).astype(np.uint8)
+	pal  = np.zeros((len(cc), 4), dtype=np.uint8)
+
+	if flags == 0b000:   # STD_TEXT
+		pal[:, 0:2] = bg[0]
+		pal[:, 2:4] = colr[:, None]
+
+	elif flags == 0b001: # MCL_TEXT
+		mc = (cc & 0x800) != 0
+		pal[:, 0] = bg[0]
+		pal[:, 1] = np.where(mc, bg[1], bg[0])
+		pal[:, 2] = np.where(mc, bg[2], colr & 7)
+		pal[:, 3] = colr & 7
+
+	elif flags == 0b010: # STD_BMAP
+		pal[:, 0:2] = lo[:, None]
+		pal[:, 2:4] = hi[:, None]
+
+	elif flags == 0b011: # MCL_BMAP
+		pal[:, 0] = bg[0]
+		pal[:, 1] = hi
+		pal[:, 2] = lo
+		pal[:, 3] = colr
+
+	elif flags == 0b100: # ECM_TEXT
+		pal[:, 0:2] = bg[(cc >> 6) & 3][:, None]
+		pal[:, 2:4] = colr[:, None]
+
+	return pal
+
+
+def render_line(flags, mcm_old, cc, gg, bg_colr):
+	"""
+	Colors and pixel values of the graphics pixels of a line, 8 for every
+	c/g-access pair, background pixels having values below 2. flags is
+	(ECM << 2) | (BMM << 1) | MCM as in get_mode, mcm_old the delayed MCM that
+	selects multi-color pixels in GraphicsGen
+	"""
+	cc = np.asarray(cc, dtype=np.uint16)
+	gg = np.asarray(gg, dtype=np.uint8)
+
+	# like GraphicsGen, BMM and the multi-color flag of a character give
+	# values 0 and 2 unless mcm_old pairs the bits
+	mc   = (((flags & 0b010) != 0) | ((cc & 0x800) != 0))[:, None]
+	vals = np.where(mc, BMC_VALS[gg], STD_VALS[gg])
+
+	if mcm_old:
+		vals = np.where(mc, MCL_VALS[gg], vals)
+
+	pal  = get_palettes(flags, cc, bg_colr)
+	colr = np.take_along_axis(pal, vals, axis=1)
+
+	return colr.ravel(), vals.ravel()
+
+
+class LineGfx:
+	"""
+	Rendered pixels of the characters loaded by the graphics generator, looked
+	up by mode flags, c-access word, background colors and g-access byte. A
+	row holds the (color, background) pairs of the 8 pixels shifted out after
+	the load and of the empty shift register after them, and the pixel values
+	of the same 9 pixels. Characters that are not there yet are rendered
+	together when the display line ends
+	"""
+	def __init__(self, size=1 << 16):
+		self.rows = {}
+		self.size = size
+		self.miss = {}
+
+	def get(self, flags, cc, bg_colr, gg):
+		"""
+		Row of a character in steady mode flags, MCM being also the delayed
+		MCM. None the first time, the character is rendered at the end of the
+		line or when it comes up again
+		"""
+		key = (flags, cc, bg_colr, gg)
+		row = self.rows.get(key)
+
+		if row is None:
+			# a character missed twice is rendered right away with the rest
+			if key in self.miss:
+				self.flush()
+				return self.rows[key]
+			self.miss[key] = None
+
+		return row
+
+	def flush(self):
+		"""
+		Renders the characters missed so far, one render_line call for every
+		mode and set of background colors among them. Called by VicFast at the
+		end of every line
+		"""
+		if len(self.rows) > self.size:
+			self.rows.clear()
+
+		groups = {}
+		for key in self.miss:
+			groups.setdefault((key[0], key[2]), []).append(key)
+		self.miss = {}
+
+		for (flags, bg_colr), keys in groups.items():
+			cc = [key[1] for key in keys]
+			gg = [key[3] for key in keys]
+			colr, vals = render_line(flags, flags & 1, cc, gg, bg_colr)
+			tail = get_palettes(flags, np.asarray(cc, dtype=np.uint16), bg_colr)[:, 0]
+
+			colr = np.column_stack((colr.reshape(-1, 8), tail)).tolist()
+			vals = np.column_stack((vals.reshape(-1, 8), np.zeros(len(keys), dtype=vals.dtype))).tolist()
+
+			for key, c, v in zip(keys, colr, vals):
+				self.rows[key] = (tuple((x, 1 if y < 2 else 0) for x, y in zip(c, v)), tuple(v))
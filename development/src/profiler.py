@@ -0,0 +1,183 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+
+import json
+import time
+
+# opt-in profiling of the sub-entities of a VicPassive. attach() replaces the
+# _run method of the given entity classes with a timed one before any entity
+# is built, so the simulator only ever sees the wrapped method and classes
+# that were never attached run untouched. start() starts the clock once the
+# DUT exists, its strobe is used to count the calls per strobe value. The
+# testbench is timed by passing its callables and iterators through timed():
+#
+#   pf.attach(SUB_ENTITIES)
+#   dut = VicPassive()
+#   pf.start(dut)
+#   SimpleSim.run(testcase)
+#   print(pf.table())
+#   pf.dump("profile.json")
+#
+# For each class the cumulative wall time spent in _run, the number of calls
+# and the number of calls per strobe value are recorded. Line sinks are
+# called from GraphicsMux._run, their time is part of the GraphicsMux row.
+# The time that is not spent in anything timed, measured between start() and
+# report(), is shown as "(other)": the ezhdl scheduler and whatever was not
+# passed to timed()
+
+NUM_STRB = 16
+
+# entity name -> [seconds, calls, calls per strobe]
+stats = {}
+
+# class -> original _run
+patched = {}
+
+strb    = None
+t_start = None
+t_stop  = None
+
+
+def _wrap(name, run):
+	entry = stats.setdefault(name, [0.0, 0, [0] * NUM_STRB])
+	by_strb = entry[2]
+	clock   = time.perf_counter
+
+	def wrapper(self):
+		t = clock()
+		if strb is not None:
+			by_strb[strb.now.dump] += 1
+		run(self)
+		entry[0] += clock() - t
+		entry[1] += 1
+	return wrapper
+
+
+def timed(name, obj):
+	"""
+	Times a callable, or every step of an iterator, under <name>. Several
+	objects can share a name, their times add up
+	"""
+	entry = stats.setdefault(name, [0.0, 0, [0] * NUM_STRB])
+	clock = time.perf_counter
+
+	if callable(obj):
+		def wrapper(*args):
+			t = clock()
+			ret = obj(*args)
+			entry[0] += clock() - t
+			entry[1] += 1
+			return ret
+		return wrapper
+
+	def steps():
+		it = iter(obj)
+		while True:
+			t = clock()
+			try:
+				item = next(it)
+			except StopIteration:
+				entry[0] += clock() - t
+				return
+			entry[0] += clock() - t
+			entry[1] += 1
+			yield item
+	return steps()
+
+
+def attach(classes):
+	"""
+	Instruments the _run method of every class in <classes> under the class
+	name, must be called before the entities are built
+	"""
+	for cls in classes:
+		if cls not in patched:
+			patched[cls] = cls._run
+			cls._run = _wrap(cls.__name__, cls._run)
+
+
+def detach():
+	"""
+	Restores the original _run methods and clears the results
+	"""
+	global strb, t_start, t_stop
+	for cls, run in patched.items():
+		cls._run = run
+	patched.clear()
+	stats.clear()
+	strb    = None
+	t_start = None
+	t_stop  = None
+
+
+def start(vic=None):
+	"""
+	Starts the clock, the strobe of <vic> is used for the per-strobe counts
+	"""
+	global strb, t_start, t_stop
+	strb    = vic.e_strobe.o_strb if vic is not None else None
+	t_start = time.perf_counter()
+	t_stop  = None
+
+
+def stop():
+	global t_stop
+	t_stop = time.perf_counter()
+
+
+def report():
+	"""
+	Per-entity results sorted by decreasing time, followed by the untimed
+	remainder
+	"""
+	if t_start is None:
+		return []
+
+	total = (t_stop or time.perf_counter()) - t_start
+	ret = []
+	for name, (sec, calls, by_strb) in stats.items():
+		ret.append({"entity": name, "time": sec, "calls": calls, "strobe": list(by_strb)})
+	ret.sort(key=lambda r: r["time"], reverse=True)
+
+	ret.append({"entity": "(other)", "time": total - sum(r["time"] for r in ret), "calls": 0,
+	            "strobe": [0] * NUM_STRB})
+	for r in ret:
+		r["share"] = r["time"] / total if total else 0.0
+	return ret
+
+
+def table():
+	ret = [f"{'entity':16} {'time [s]':>10} {'share':>7} {'calls':>10} {'us/call':>8}   calls per strobe 0..F"]
+	for r in report():
+		per_call = 1e6 * r["time"] / r["calls"] if r["calls"] else 0.0
+		ret.append(f"{r['entity']:16} {r['time']:10.3f} {100 * r['share']:6.1f}% {r['calls']:10} {per_call:8.2f}   "
+		           + " ".join(str(c) for c in r["strobe"]))
+	return "\n".join(ret)
+
+
+def dump(path):
+	total = (t_stop or time.perf_counter()) - t_start if t_start is not None else 0.0
+	with open(path, "w") as f:
+		json.dump({"total": total, "entities": report()}, f, indent=1)
@@ -28,8 +28,33 @@ from vic_pkg import *
 
 import bus_logger as bl
 
+# these values were dumped from a real VIC during the register timing test,
+# other programs can pass their own through g_init (see warm_start.py)
+REGS_INIT = [
+	 56,  91,  56,  99,  56, 107,  56, 115,
+	 56, 123,  56, 131,  56, 139,  56, 147,
+	  0,  15,  55,   0,   0, 255,   8,   0,
+	 28,  15,   0,   0, 128, 255,   0,   0,
+	 11,   0,   8,   0,   0,  11,  11,  11,
+	 11,  11,  11,  11,  11,  11,  11,
+]
+
+# write mask with every register set, as seen by the consumers after a reset
+REGS_ALL = (1 << 64) - 1
+
+def regs_mask(*regs):
+	"""
+	Bits of the given registers in the o_wmsk write mask
+	"""
+	mask = 0
+	for r in regs:
+		mask |= 1 << r
+	return mask
+
 class Registers(Entity):
-	def __init__(self):
+	def __init__(self, g_init=REGS_INIT):
+		self.g_init = g_init
+
 		self.i_clk  = Input(Wire())
 		self.i_rst  = Input(Wire())
 		self.i_strb = Input(t_vic_strb)
@@ -38,15 +63,25 @@ class Registers(Entity):
 		self.i_cs   = Input(Wire())
 		self.i_rw   = Input(Wire())
 		self.o_regs = Output(t_vic_regs)
+		self.o_wmsk = Output(t_vic_wmsk)
 
 		self.wen    = Signal(Wire())
 		self.a_tmp  = Signal(t_vic_addr)
 		self.d_tmp  = Signal(t_vic_data)
 
+		# (regs, wmsk) of a restored state, they take the place of g_init on
+		# the reset that precedes the first tick, see VicPassive.restore
+		self.restored = None
+
 	def _run(self):
 
 		if self.i_clk.posedge():
 
+			# the registers written at strobe 15 are flagged until the following
+			# odd strobe, so that units working on odd strobes only see them too
+			if self.i_strb.now[0]:
+				self.o_wmsk.nxt <<= 0
+
 			if (self.i_strb.now == 10):
 				self.a_tmp.nxt <<= self.i_a.now
 				if (self.i_cs.now == 0) and (self.i_rw.now == 0):
@@ -58,58 +93,25 @@ class Registers(Entity):
 			if (self.i_strb.now == 15) and self.wen.now:
 				self.wen.nxt <<= 0
 				self.o_regs.nxt[self.a_tmp.now] <<= self.d_tmp.now
-				bl.add(bl.reg_write_analyze(self.a_tmp.now.dump, self.d_tmp.now.dump, self.o_regs.now))
+				self.o_wmsk.nxt <<= 1 << self.a_tmp.now.dump
+				if bl.enabled & bl.REGISTER:
+					bl.add(bl.reg_write_text, self.a_tmp.now.dump, self.d_tmp.now.dump,
+					       self.o_regs.now[16].dump, self.o_regs.now[17].dump, self.o_regs.now[22].dump)
+				if bl.trig_reg:
+					bl.on_reg_write(self.a_tmp.now.dump)
 
 			if self.i_rst.now:
 				self.wen.nxt <<= 0
 
 
 	def _reset(self):
-		# these values were dumped from a real VIC during the register timing test
-		self.o_regs.nxt[0 ] <<= 56
-		self.o_regs.nxt[1 ] <<= 91
-		self.o_regs.nxt[2 ] <<= 56
-		self.o_regs.nxt[3 ] <<= 99
-		self.o_regs.nxt[4 ] <<= 56
-		self.o_regs.nxt[5 ] <<= 107
-		self.o_regs.nxt[6 ] <<= 56
-		self.o_regs.nxt[7 ] <<= 115
-		self.o_regs.nxt[8 ] <<= 56
-		self.o_regs.nxt[9 ] <<= 123
-		self.o_regs.nxt[10] <<= 56
-		self.o_regs.nxt[11] <<= 131
-		self.o_regs.nxt[12] <<= 56
-		self.o_regs.nxt[13] <<= 139
-		self.o_regs.nxt[14] <<= 56
-		self.o_regs.nxt[15] <<= 147
-		self.o_regs.nxt[16] <<= 0
-		self.o_regs.nxt[17] <<= 15
-		self.o_regs.nxt[18] <<= 55
-		self.o_regs.nxt[19] <<= 0
-		self.o_regs.nxt[20] <<= 0
-		self.o_regs.nxt[21] <<= 255
-		self.o_regs.nxt[22] <<= 8
-		self.o_regs.nxt[23] <<= 0
-		self.o_regs.nxt[24] <<= 28
-		self.o_regs.nxt[25] <<= 15
-		self.o_regs.nxt[26] <<= 0
-		self.o_regs.nxt[27] <<= 0
-		self.o_regs.nxt[28] <<= 128
-		self.o_regs.nxt[29] <<= 255
-		self.o_regs.nxt[30] <<= 0
-		self.o_regs.nxt[31] <<= 0
-		self.o_regs.nxt[32] <<= 11
-		self.o_regs.nxt[33] <<= 0
-		self.o_regs.nxt[34] <<= 8
-		self.o_regs.nxt[35] <<= 0
-		self.o_regs.nxt[36] <<= 0
-		self.o_regs.nxt[37] <<= 11
-		self.o_regs.nxt[38] <<= 11
-		self.o_regs.nxt[39] <<= 11
-		self.o_regs.nxt[40] <<= 11
-		self.o_regs.nxt[41] <<= 11
-		self.o_regs.nxt[42] <<= 11
-		self.o_regs.nxt[43] <<= 11
-		self.o_regs.nxt[44] <<= 11
-		self.o_regs.nxt[45] <<= 11
-		self.o_regs.nxt[46] <<= 11
+		if self.restored is not None:
+			regs, wmsk = self.restored
+			self.restored = None
+			self.o_regs.nxt <<= regs
+			self.o_wmsk.nxt <<= wmsk
+			return
+
+		for i in range(len(self.g_init)):
+			self.o_regs.nxt[i] <<= self.g_init[i]
+		self.o_wmsk.nxt <<= REGS_ALL
@@ -29,12 +29,19 @@ from registers import *
 
 import bus_logger as bl
 
+# indices of the sprites set in an activity mask, in the order they are played
+ACTIVE_SPRITES = [tuple(i for i in range(7, -1, -1) if (m >> i) & 1) for m in range(256)]
+
+# registers aliased below
+SPRT_REGS = regs_mask(*range(17), 21, 23, 27, 28, *range(37, 47))
+
 class Sprites(Entity):
 	def __init__(self):
 		self.i_clk     = Input(Wire())
 		self.i_rst     = Input(Wire())
 		self.i_specs   = Input(VicSpecs(H63))
 		self.i_regs    = Input(t_vic_regs)
+		self.i_wmsk    = Input(t_vic_wmsk)
 		self.i_strb    = Input(t_vic_strb)
 		self.i_cycl    = Input(t_vic_cycl)
 		self.i_xpos    = Input(t_vic_ppos)
@@ -95,19 +102,21 @@ class Sprites(Entity):
 		if self.i_clk.posedge():
 
 			# really just aliasing registers. Running on even cycles too makes
-			# this behave like a concurrent statement for all intents & purposes
-			self.spen.nxt <<=  self.i_regs.now[21]
-			self.prio.nxt <<= ~self.i_regs.now[27]
-			self.mxmc.nxt <<=  self.i_regs.now[28]
-			self.yexp.nxt <<=  self.i_regs.now[23]
+			# this behave like a concurrent statement for all intents & purposes.
+			# The aliases only change when one of their registers is written
+			if self.i_wmsk.now.dump & SPRT_REGS:
+				self.spen.nxt <<=  self.i_regs.now[21]
+				self.prio.nxt <<= ~self.i_regs.now[27]
+				self.mxmc.nxt <<=  self.i_regs.now[28]
+				self.yexp.nxt <<=  self.i_regs.now[23]
 
-			for i in range(8):
-				self.colr.nxt[i] <<= self.i_regs.now[39 + i][4:0]
-				self.ypos.nxt[i] <<= self.i_regs.now[i*2 + 1]
-				self.xpos.nxt[i] <<= join(self.i_regs.now[16][i], self.i_regs.now[i*2])
+				for i in range(8):
+					self.colr.nxt[i] <<= self.i_regs.now[39 + i][4:0]
+					self.ypos.nxt[i] <<= self.i_regs.now[i*2 + 1]
+					self.xpos.nxt[i] <<= join(self.i_regs.now[16][i], self.i_regs.now[i*2])
 
-			self.mclr.nxt[0] <<= self.i_regs.now[37][4:0]
-			self.mclr.nxt[1] <<= self.i_regs.now[38][4:0]
+				self.mclr.nxt[0] <<= self.i_regs.now[37][4:0]
+				self.mclr.nxt[1] <<= self.i_regs.now[38][4:0]
 
 
 			# rising edges of DOD clock
@@ -117,20 +126,35 @@ class Sprites(Entity):
 				self.o_actv.nxt <<= 0
 				self.o_prio.nxt <<= 0
 
-				bl.add(f"[SPRITES] x-display   = {bin(self.xdisp.now.dump)}")
-				bl.add(f"[SPRITES] x-display   = {bin(self.xdisp.now.dump)}")
-				bl.add(f"[SPRITES] y-display   = {bin(self.ydisp.now.dump)}")
-				bl.add(f"[SPRITES] x-expansion = {bin(self.xexp.now.dump)}")
-				bl.add(f"[SPRITES] y_expansion = {bin(self.yexp.now.dump)}")
-				bl.add(f"[SPRITES] multicolor  = {bin(self.mxmc.now.dump)}")
-				bl.add(f"[SPRITES] mc-phy      = {bin(self.mc_phy.now.dump)}")
-				bl.add(f"[SPRITES] xy-incr     = {bin(self.xincr.now.dump)}, {bin(self.yincr.now.dump)}")
+				log = bl.enabled & bl.SPRITES
 
-				for i in range(8):
-					bl.add(f"[SPRITES][{i}] xy-pos = {self.xpos.now[i]}, {self.ypos.now[i]} | xy-count = {self.count_xlen.now[i].dump}, {self.count_ylen.now[i].dump}")
+				if log:
+					bl.add("[SPRITES] x-display   = {:#b}", self.xdisp.now.dump)
+					bl.add("[SPRITES] x-display   = {:#b}", self.xdisp.now.dump)
+					bl.add("[SPRITES] y-display   = {:#b}", self.ydisp.now.dump)
+					bl.add("[SPRITES] x-expansion = {:#b}", self.xexp.now.dump)
+					bl.add("[SPRITES] y_expansion = {:#b}", self.yexp.now.dump)
+					bl.add("[SPRITES] multicolor  = {:#b}", self.mxmc.now.dump)
+					bl.add("[SPRITES] mc-phy      = {:#b}", self.mc_phy.now.dump)
+					bl.add("[SPRITES] xy-incr     = {:#b}, {:#b}", self.xincr.now.dump, self.yincr.now.dump)
+
+					for i in range(8):
+						bl.add("[SPRITES][{}] xy-pos = {}, {} | xy-count = {}, {}", i,
+						       self.xpos.now[i].dump, self.ypos.now[i].dump,
+						       self.count_xlen.now[i].dump, self.count_ylen.now[i].dump)
 
-				# looping over the sprites
-				for i in range(7, -1, -1):
+				# sprites that are idle cannot play back, so they are skipped.
+				# The vertical trigger still runs for all of them, idle sprites
+				# keep counting their y-counter
+				actv = (self.spen.now.dump | self.spdma.now.dump |
+				        self.ydisp.now.dump | self.xdisp.now.dump)
+
+				vert = (self.i_strb.now == 1) and (self.i_cycl.now in (15,
+				        self.dma1_cycl.now, self.dma2_cycl.now,
+				        self.yexp_cycl.now, self.strt_cycl.now))
+
+				# looping over the active sprites
+				for i in ACTIVE_SPRITES[actv]:
 
 					############################################################
 					#                     SPRITE PLAYBACK                      #
@@ -172,7 +196,8 @@ class Sprites(Entity):
 							elif sprt_val == 0b11:
 								self.o_colr.nxt <<= self.mclr.now[1]
 
-							bl.add(f"[SPRITES] Playing Sprite {i}, value = {sprt_val}, color: {self.o_colr.nxt}")
+							if log:
+								bl.add("[SPRITES] Playing Sprite {}, value = {}, color: {}", i, sprt_val, self.o_colr.nxt.dump)
 
 							if (self.count_xlen.now[i] == 23) and (self.xincr.now[i] == 1):
 								# horizontal end of a sprite
@@ -189,35 +214,40 @@ class Sprites(Entity):
 								else:
 									self.xincr.nxt[i] <<= 1
 
-					############################################################
-					#                     VERTICAL TRIGGER                     #
-					############################################################
+				################################################################
+				#                       VERTICAL TRIGGER                       #
+				################################################################
 
-					if (self.i_strb.now == 1) and (self.i_cycl.now == 15):
-						if (self.count_ylen.now[i] == 20) and (self.yincr.now[i] == 1):
-							self.spdma.nxt[i] <<= 0
-						else:
-							if self.yincr.now[i]:
-								self.count_ylen.nxt[i] <<= self.count_ylen.now[i] + 1
-
-					if (self.i_strb.now == 1) and ((self.i_cycl.now == self.dma1_cycl.now) or (self.i_cycl.now == self.dma2_cycl.now)):
-						if (not self.spdma.now[i]) and self.spen.now[i] and (self.ypos.now[i] == self.i_ypos.now[8:0]):
-							self.spdma.nxt[i]      <<= 1
-							self.yincr.nxt[i]      <<= 1
-							self.count_ylen.nxt[i] <<= 0
-
-					if (self.i_strb.now == 1) and (self.i_cycl.now == self.yexp_cycl.now):
-						if self.spdma.now[i] and self.yexp.now[i]:
-							self.yincr.nxt[i] <<= not self.yincr.now[i]
-						else:
-							self.yincr.nxt[i] <<= 1
+				# on the cycles where a trigger can fire, for all the sprites
+				if vert:
+					for i in range(7, -1, -1):
+
+						if (self.i_strb.now == 1) and (self.i_cycl.now == 15):
+							if (self.count_ylen.now[i] == 20) and (self.yincr.now[i] == 1):
+								self.spdma.nxt[i] <<= 0
+							else:
+								if self.yincr.now[i]:
+									self.count_ylen.nxt[i] <<= self.count_ylen.now[i] + 1
+
+						if (self.i_strb.now == 1) and ((self.i_cycl.now == self.dma1_cycl.now) or (self.i_cycl.now == self.dma2_cycl.now)):
+							if (not self.spdma.now[i]) and self.spen.now[i] and (self.ypos.now[i] == self.i_ypos.now[8:0]):
+								self.spdma.nxt[i]      <<= 1
+								self.yincr.nxt[i]      <<= 1
+								self.count_ylen.nxt[i] <<= 0
+
+						if (self.i_strb.now == 1) and (self.i_cycl.now == self.yexp_cycl.now):
+							if self.spdma.now[i] and self.yexp.now[i]:
+								self.yincr.nxt[i] <<= not self.yincr.now[i]
+							else:
+								self.yincr.nxt[i] <<= 1
+
+						if (self.i_strb.now == 1) and (self.i_cycl.now == self.strt_cycl.now):
+							if self.spdma.now[i]:
+								if self.spen.now[i] and (self.ypos.now[i] == self.i_ypos.now[8:0]):
+									self.ydisp.nxt[i] <<= 1 # non-blocking in kawari
+							else:
+								self.ydisp.nxt[i] <<= 0 # non-blocking in kawari
 
-					if (self.i_strb.now == 1) and (self.i_cycl.now == self.strt_cycl.now):
-						if self.spdma.now[i]:
-							if self.spen.now[i] and (self.ypos.now[i] == self.i_ypos.now[8:0]):
-								self.ydisp.nxt[i] <<= 1 # non-blocking in kawari
-						else:
-							self.ydisp.nxt[i] <<= 0 # non-blocking in kawari
 
 				################################################################
 				#                      SPRITE ACQUISITION                      #
@@ -236,7 +266,8 @@ class Sprites(Entity):
 					self.xdisp     .nxt[self.count_sprt.now] <<= 0
 
 					if (self.i_strb.now == 7) or (self.i_strb.now == 15):
-						bl.add(f"[SPRITES] Acquiring Sprite {i}, cycle {self.count_data.now.dump}")
+						if log:
+							bl.add("[SPRITES] Acquiring Sprite {}, cycle {}", self.count_sprt.now.dump, self.count_data.now.dump)
 
 						if (self.count_data.now != 3):
 							if self.count_data.now == 0:
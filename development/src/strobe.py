@@ -58,8 +58,11 @@ class Strobe(Entity):
 				self.o_strb.nxt <<= self.o_strb.now + 1
 			self.ph0_1r.nxt <<= self.i_ph0.now
 
-			if self.o_strb.now[0]:
-				bl.add(f"[STROBE] strobe = {self.o_strb.now.dump}")
+			if bl.trace is not None:
+				bl.trace.tick += 1
+
+			if (bl.enabled & bl.STROBE) and self.o_strb.now[0]:
+				bl.add("[STROBE] strobe = {}", self.o_strb.now.dump)
 
 			if self.i_rst.now:
 				self.ph0_1r.nxt <<= 1
@@ -161,10 +161,13 @@ class Sync(Entity):
 				else:
 					self.o_xpos.nxt <<= 0
 
-				if self.state.now == STATE.LOCKED:
-					bl.add(f"[SYNC] X-RASTER = {self.o_xpos.now.dump}")
-					bl.add(f"[SYNC] Y-RASTER = {self.o_ypos.now.dump}")
-					bl.add(f"[SYNC] CYCLE    = {self.o_cycl.now.dump}")
+				if (bl.enabled & bl.SYNC) and (self.state.now == STATE.LOCKED):
+					bl.add("[SYNC] X-RASTER = {}", self.o_xpos.now.dump)
+					bl.add("[SYNC] Y-RASTER = {}", self.o_ypos.now.dump)
+					bl.add("[SYNC] CYCLE    = {}", self.o_cycl.now.dump)
+
+				if bl.trig_pixel:
+					bl.on_pixel(self.o_xpos.now.dump, self.o_ypos.now.dump)
 
 			# position outputs are latched on the last strobe of a character
 			# cycle, so that they are constant and correct during the whole
@@ -0,0 +1,1030 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Behavioral model of VicPassive. Every sub-entity is reproduced with plain   #
+#  integers and preallocated lists, with the same register-transfer timing:    #
+#  on each dot-clock tick the units are evaluated from the pixel mux back to   #
+#  the strobe generator, so every unit still sees the values its producers     #
+#  held before the clock edge. Signals declared with ppl=N are modeled as      #
+#  N+1 stage shift registers that advance whenever they are assigned.          #
+#                                                                              #
+#  The engine is stepped once per PHI2 cycle (16 bus samples) and returns      #
+#  the pixels that VicPassive would have pushed during that cycle. Its whole   #
+#  state lives in the unit-prefixed attributes, state() and restore() copy     #
+#  it out and back in for checkpointing (see checkpoint.py).                   #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import copy
+from array       import array
+from collections import deque
+
+from vic_pkg   import *
+from registers    import REGS_INIT, REGS_ALL
+from border       import BORD_REGS
+from graphics_gen import BGND_REGS, GraphicsGen
+from line_render  import GFX_REGS, LineGfx
+from sprites      import ACTIVE_SPRITES, SPRT_REGS
+
+# pixel flags, mirroring o_lstr/o_lend/o_fstr of VicPassive
+PIX_LSTR = 1
+PIX_LEND = 2
+PIX_FSTR = 4
+
+# sync states, same order as sync.STATE
+UNLOCKED = 0
+LLOCKING = 1
+LLOCKED  = 2
+LOCKED   = 3
+
+UNLOCK_CYCLES = 3
+
+# see Sprites._run
+SPRT_DMA1_CYCL = 54
+SPRT_DMA2_CYCL = 55
+SPRT_YEXP_CYCL = 55
+SPRT_STRT_CYCL = 57
+
+RAM_LEN = 40
+
+# attribute prefixes of the units, together they hold the complete state
+STATE_UNITS = ("st_", "rg_", "sy_", "bl_", "vm_", "bd_", "gx_", "sp_", "mx_")
+
+
+def ppl(n, init=0):
+	return deque([init] * (n + 1), maxlen=n + 1)
+
+
+def rot2(x):
+	# join(x[8:], x[8:6]) on a 10-bit value
+	return ((x & 0xff) << 2) | ((x >> 6) & 3)
+
+
+class VicFast:
+	def __init__(self, specs=t_vic_specs_h63, regs_init=REGS_INIT):
+		self.specs = specs
+
+		# per-cycle output, only the first o_npix entries are valid
+		self.o_npix = 0
+		self.o_colr = [0] * 16
+		self.o_flag = [0] * 16
+
+		# rendered graphics rows (line_render.LineGfx), None for the per-pixel
+		# path only
+		self.line_gfx = LineGfx()
+
+		# strobe
+		self.st_strb   = 0
+		self.st_ph0_1r = 0
+
+		# registers
+		self.rg_regs  = [0] * 64
+		self.rg_wen   = 0
+		self.rg_a_tmp = 0
+		self.rg_d_tmp = 0
+		self.rg_wmsk  = REGS_ALL
+		self.rg_regs[:len(regs_init)] = regs_init
+
+		# sync
+		self.sy_state        = UNLOCKED
+		self.sy_shreg_old    = 0
+		self.sy_refpat       = 0
+		self.sy_count_unlock = 0
+		self.sy_cycl_i       = 0
+		self.sy_ypos_i       = 0
+		self.sy_o_cycl       = 0
+		self.sy_o_xpos       = 0
+		self.sy_o_ypos       = 0
+
+		# bad line detect
+		self.bl_o_bdln = 0
+
+		# video matrix
+		self.vm_idle       = 0
+		self.vm_ram        = array("H", [0]) * RAM_LEN
+		self.vm_ram_wadd   = 0
+		self.vm_ram_radd   = 0
+		self.vm_count_line = 0
+		self.vm_count_cycl = 0
+		self.vm_o_cc       = 0
+		self.vm_o_gg       = 0
+		self.vm_o_en       = 0
+
+		# border
+		self.bd_ff_main = 0
+		self.bd_ff_vert = 0
+		self.bd_o_vbrd  = 0
+		self.bd_o_bord  = 0
+		self.bd_o_colr  = 0
+		self.bd_reg_ec  = 0
+		self.bd_reg_den = 0
+		self.bd_edges   = (0, 0, 0, 0)
+
+		# graphics generator
+		self.gx_shreg    = 0
+		self.gx_xscroll  = 0
+		self.gx_vbrd_1r  = ppl(4)
+		self.gx_actv_1r  = ppl(1)
+		self.gx_grfx_1r  = ppl(1)
+		self.gx_data_1r  = ppl(1)
+		self.gx_data_3r  = 0
+		self.gx_mc_phy   = 0
+		self.gx_bg_colr  = ppl(1, (0, 0, 0, 0))
+		self.gx_ecm_ppl  = ppl(2)
+		self.gx_mcm_ppl  = ppl(2)
+		self.gx_bmm_ppl  = ppl(2)
+		self.gx_ecm      = 0
+		self.gx_mcm      = 0
+		self.gx_bmm      = 0
+		self.gx_mcm_old  = 0
+		self.gx_gfx_val  = 0
+		self.gx_gfx_bgnd = 0
+		self.gx_o_colr   = 0
+		self.gx_o_bgnd   = 0
+		self.gx_pal      = None
+		self.gx_pal_bg   = None
+		self.gx_row      = None
+		self.gx_row_vals = None
+		self.gx_row_gfx  = 0
+		self.gx_row_phy  = 0
+		self.gx_row_pos  = 0
+
+		# sprites
+		self.sp_acquire    = 0
+		self.sp_spen       = 0
+		self.sp_prio       = 0
+		self.sp_mxmc       = 0
+		self.sp_xexp       = ppl(3)
+		self.sp_yexp       = 0
+		self.sp_colr       = [0] * 8
+		self.sp_mclr       = [0] * 2
+		self.sp_xpos       = [0] * 8
+		self.sp_ypos       = [0] * 8
+		self.sp_spdma      = 0
+		self.sp_xtrig      = ppl(5)
+		self.sp_ydisp      = 0
+		self.sp_xdisp      = 0
+		self.sp_yincr      = 0
+		self.sp_xincr      = 0
+		self.sp_count_sprt = 0
+		self.sp_count_data = 0
+		self.sp_count_ylen = [0] * 8
+		self.sp_count_xlen = [0] * 8
+		self.sp_shreg      = [0] * 8
+		self.sp_sprt_val   = [0] * 8
+		self.sp_mc_phy     = 0
+		self.sp_o_actv     = 0
+		self.sp_o_prio     = 0
+		self.sp_o_colr     = 0
+
+		# graphics mux
+		self.mx_xval      = 0
+		self.mx_yval      = 0
+		self.mx_bord_actv = ppl(8)
+		self.mx_bord_colr = ppl(1)
+		self.mx_sprt_actv = ppl(1)
+		self.mx_sprt_prio = ppl(1)
+		self.mx_sprt_colr = ppl(1)
+		self.mx_o_lstr    = 0
+		self.mx_o_lend    = 0
+		self.mx_o_fstr    = 0
+		self.mx_o_colr    = 0
+
+
+	def reset(self):
+		"""
+		Same sequence the testbench applies to VicPassive: one idle clock,
+		one clock in reset, one more idle clock before the first sample
+		"""
+		self.o_npix = 0
+		self.tick(0, 0, 0, 0, 0, 0)
+		self.tick(0, 0, 0, 0, 0, 0, rst=1)
+		self.tick(0, 0, 0, 0, 0, 0)
+
+
+	def state(self):
+		"""
+		Copy of the state of every unit, can be pickled
+		"""
+		return copy.deepcopy({k: v for k, v in vars(self).items() if k.startswith(STATE_UNITS)})
+
+
+	def restore(self, state):
+		"""
+		Continues from a state() taken earlier, in place of reset()
+		"""
+		vars(self).update(copy.deepcopy(state))
+		self.o_npix = 0
+
+
+	def cycle(self, ph0, db, a, rw, cs, aec):
+		"""
+		Runs one PHI2 cycle worth of bus samples (16 values per argument).
+		Returns the number of pushed pixels, stored in o_colr/o_flag
+		"""
+		self.o_npix = 0
+		tick = self.tick
+		for i in range(len(ph0)):
+			tick(ph0[i], db[i], a[i], rw[i], cs[i], aec[i])
+		return self.o_npix
+
+
+	def run(self, bus):
+		"""
+		Steps the engine over decoded bus columns (see bus_decode), yielding
+		the number of pixels pushed on every cycle
+		"""
+		ph0 = bus.ph0.tolist()
+		db  = bus.db .tolist()
+		a   = bus.a  .tolist()
+		rw  = bus.rw .tolist()
+		cs  = bus.cs .tolist()
+		aec = bus.aec.tolist()
+
+		for i in range(0, len(ph0), 16):
+			j = i + 16
+			yield self.cycle(ph0[i:j], db[i:j], a[i:j], rw[i:j], cs[i:j], aec[i:j])
+
+
+	def tick(self, ph0, db, a, rw, cs, aec, rst=0):
+		strb = self.st_strb
+
+		# o_push is a concurrent statement of GraphicsMux, sinks sample it
+		# together with the registered framing outputs
+		if self.mx_xval and self.mx_yval and (strb & 1):
+			n = self.o_npix
+			self.o_colr[n] = self.mx_o_colr
+			self.o_flag[n] = ((PIX_LSTR if self.mx_o_lstr else 0) |
+			                  (PIX_LEND if self.mx_o_lend else 0) |
+			                  (PIX_FSTR if self.mx_o_fstr else 0))
+			self.o_npix = n + 1
+
+		# consumers first, so that everyone sees the pre-edge values
+		self._gfx_mux(strb, rst)
+		self._gfx_gen(strb)
+		self._sprites(strb, db, rst)
+		self._border(strb, rst)
+		self._video_matrix(strb, db, rst)
+		self._bdln_detect(strb, aec, rst)
+		self._sync(strb, a, rst)
+		self._registers(strb, db, a, rw, cs, rst)
+		self._strobe(ph0, rst)
+
+
+	############################################################################
+	#                                  STROBE                                  #
+	############################################################################
+
+	def _strobe(self, ph0, rst):
+		if self.st_ph0_1r == 1 and ph0 == 0:
+			self.st_strb = 0
+		else:
+			self.st_strb = (self.st_strb + 1) & 15
+		self.st_ph0_1r = ph0
+
+		if rst:
+			self.st_ph0_1r = 1
+			self.st_strb   = 15
+
+
+	############################################################################
+	#                                REGISTERS                                 #
+	############################################################################
+
+	def _registers(self, strb, db, a, rw, cs, rst):
+		wen = self.rg_wen
+
+		if strb & 1:
+			self.rg_wmsk = 0
+
+		if strb == 10:
+			self.rg_a_tmp = a
+			if cs == 0 and rw == 0:
+				self.rg_wen = 1
+
+		elif strb == 14:
+			self.rg_d_tmp = db & 0xff
+
+		elif strb == 15 and wen:
+			self.rg_wen = 0
+			self.rg_regs[self.rg_a_tmp] = self.rg_d_tmp
+			self.rg_wmsk = 1 << self.rg_a_tmp
+
+		if rst:
+			self.rg_wen = 0
+
+
+	############################################################################
+	#                                   SYNC                                   #
+	############################################################################
+
+	def _sync(self, strb, a, rst):
+		specs  = self.specs
+		cycl_i = self.sy_cycl_i
+		ypos_i = self.sy_ypos_i
+
+		if strb == 2:
+			shreg = ((self.sy_shreg_old & 0xff) << 2) | (a & 3)
+			self.sy_shreg_old = shreg
+
+			if cycl_i < specs.cycl - 1:
+				self.sy_cycl_i = cycl_i + 1
+			else:
+				self.sy_cycl_i = 0
+				self.sy_ypos_i = ypos_i + 1 if (ypos_i < specs.ylen - 1) else 0
+
+			if cycl_i == specs.CYCL_REF:
+				state  = self.sy_state
+				refpat = self.sy_refpat
+				count  = self.sy_count_unlock
+				skip   = False
+
+				if state == UNLOCKED:
+					if shreg in (0b1110010011, 0b1001001110, 0b0100111001, 0b0011100100):
+						self.sy_state  = LLOCKING
+						self.sy_refpat = rot2(shreg)
+					else:
+						skip = True
+
+				elif state == LLOCKING:
+					if shreg == refpat:
+						self.sy_state        = LLOCKED
+						self.sy_count_unlock = UNLOCK_CYCLES
+						self.sy_refpat       = rot2(shreg)
+					else:
+						self.sy_state = UNLOCKED
+						skip = True
+
+				elif state == LLOCKED:
+					if shreg == 0b1111111111:
+						self.sy_state        = LOCKED
+						self.sy_ypos_i       = specs.ylen - 1
+						self.sy_refpat       = 0b1110010011
+						self.sy_count_unlock = UNLOCK_CYCLES
+					elif shreg == refpat:
+						self.sy_refpat       = rot2(refpat)
+						self.sy_count_unlock = UNLOCK_CYCLES
+					elif count != 0:
+						# join(refpat[6:], refpat[8:6]), as in Sync
+						self.sy_refpat       = ((refpat & 0x3f) << 2) | ((refpat >> 6) & 3)
+						self.sy_count_unlock = count - 1
+					else:
+						self.sy_state = UNLOCKED
+						skip = True
+
+				else:
+					if ypos_i == specs.ylen - 1:
+						if shreg == 0b1111111111:
+							self.sy_refpat       = 0b1110010011
+							self.sy_count_unlock = UNLOCK_CYCLES
+						elif count != 0:
+							self.sy_refpat       = 0b1110010011
+							self.sy_count_unlock = count - 1
+						else:
+							self.sy_state = UNLOCKED
+							skip = True
+					else:
+						if shreg == refpat:
+							self.sy_refpat       = rot2(refpat)
+							self.sy_count_unlock = UNLOCK_CYCLES
+						elif count != 0:
+							self.sy_refpat       = rot2(refpat)
+							self.sy_count_unlock = count - 1
+						else:
+							self.sy_state = UNLOCKED
+							skip = True
+
+				if skip:
+					self.sy_cycl_i = specs.CYCL_REF + 2
+
+		if strb & 1:
+			xpos = self.sy_o_xpos
+			self.sy_o_xpos = xpos + 1 if (xpos < specs.xlen - 1) else 0
+
+			if strb == 15:
+				self.sy_o_cycl = cycl_i
+
+				if cycl_i == 0:
+					ypos = self.sy_o_ypos
+					self.sy_o_ypos = ypos + 1 if (ypos < specs.ylen - 1) else 0
+
+				if cycl_i == specs.CYCL_REF + 1:
+					self.sy_o_xpos = specs.xref
+					if ypos_i == 0:
+						self.sy_o_ypos = specs.yref
+
+		if rst:
+			self.sy_state        = LOCKED
+			self.sy_count_unlock = UNLOCK_CYCLES
+			self.sy_shreg_old    = 0b111001
+			self.sy_refpat       = 0b1110010011
+			self.sy_cycl_i       = specs.CYCL_REF - 1
+			self.sy_o_cycl       = specs.CYCL_REF - 1
+			self.sy_ypos_i       = 0
+			self.sy_o_ypos       = 0
+
+
+	############################################################################
+	#                             BAD LINE DETECT                              #
+	############################################################################
+
+	def _bdln_detect(self, strb, aec, rst):
+		if strb == 9:
+			cycl = self.sy_o_cycl
+			ypos = self.sy_o_ypos
+			CYCL_REF = self.specs.CYCL_REF
+
+			self.bl_o_bdln = 0
+			if ((cycl != CYCL_REF - 1) and (48 <= ypos < 248) and
+			    (CYCL_REF <= cycl < CYCL_REF + 40)):
+				self.bl_o_bdln = 0 if aec else 1
+
+		if rst:
+			self.bl_o_bdln = 0
+
+
+	############################################################################
+	#                               VIDEO MATRIX                               #
+	############################################################################
+
+	def _video_matrix(self, strb, db, rst):
+		specs    = self.specs
+		CYCL_REF = specs.CYCL_REF
+		cycl     = self.sy_o_cycl
+
+		if strb == 13:
+			wadd = self.vm_ram_wadd
+
+			if cycl == CYCL_REF:
+				self.vm_ram_wadd = 0
+			elif wadd < RAM_LEN - 1:
+				self.vm_ram_wadd = wadd + 1
+
+			if self.bl_o_bdln:
+				if cycl == CYCL_REF:
+					self.vm_ram[wadd]  = db
+					self.vm_count_line = 0
+					self.vm_idle       = 0
+				elif wadd < RAM_LEN - 1:
+					self.vm_ram[wadd] = db
+
+			# once cleared, idle is only set again by a reset, exactly like
+			# VideoMatrix where "idle.nxt <= 1" is a comparison
+			if (cycl == 57) and (self.vm_count_line != 7):
+				self.vm_count_line += 1
+
+		elif strb == 2:
+			count = self.vm_count_cycl
+			if count < RAM_LEN:
+				self.vm_count_cycl = count + 1
+
+			if cycl == CYCL_REF + 1:
+				self.vm_ram_radd   = 0
+				self.vm_count_cycl = 0
+			elif self.vm_ram_radd < RAM_LEN - 1:
+				self.vm_ram_radd += 1
+
+		elif strb == 7:
+			if self.vm_count_cycl != RAM_LEN:
+				ypos = self.sy_o_ypos
+				self.vm_o_en = 1
+				self.vm_o_gg = db & 0xff
+				if specs.yfvc <= ypos <= specs.ylvc:
+					self.vm_o_cc = self.vm_ram[self.vm_ram_radd]
+				else:
+					self.vm_o_cc = 0
+			else:
+				self.vm_o_en = 0
+				self.vm_o_gg = 0
+				self.vm_o_cc = 0
+
+			if self.vm_idle:
+				self.vm_o_cc = 0
+
+		if rst:
+			self.vm_ram  = array("H", [0]) * RAM_LEN
+			self.vm_o_en = 0
+			self.vm_o_gg = 0
+			self.vm_o_cc = 0
+			self.vm_idle = 1
+
+
+	############################################################################
+	#                                  BORDER                                  #
+	############################################################################
+
+	def _border(self, strb, rst):
+		if strb & 1:
+			specs = self.specs
+			regs  = self.rg_regs
+			cycl  = self.sy_o_cycl
+			xpos  = self.sy_o_xpos
+			ypos  = self.sy_o_ypos
+
+			if self.rg_wmsk & BORD_REGS:
+				self.bd_reg_ec  = regs[32] & 15
+				self.bd_reg_den = (regs[17] >> 4) & 1
+				self.bd_edges   = specs.edges[(regs[22] & 8) >> 2 | (regs[17] & 8) >> 3]
+
+			den = self.bd_reg_den
+			edge_ll, edge_rr, edge_hi, edge_lo = self.bd_edges
+
+			ff_main = self.bd_ff_main
+			ff_vert = self.bd_ff_vert
+
+			if (cycl == specs.CYCLE_YFF) or (xpos == edge_ll):
+				if ypos == edge_lo:
+					ff_vert = 1
+				elif (ypos == edge_hi) and den:
+					ff_vert = 0
+
+			if xpos == edge_rr:
+				ff_main = 1
+			elif (xpos == edge_ll) and (ff_vert == 0):
+				ff_main = 0
+
+			self.bd_o_vbrd  = ff_vert
+			self.bd_o_bord  = ff_main
+			self.bd_o_colr  = self.bd_reg_ec
+			self.bd_ff_vert = ff_vert
+			self.bd_ff_main = ff_main
+
+		if rst:
+			self.bd_ff_main = 1
+			self.bd_ff_vert = 1
+
+
+	############################################################################
+	#                            GRAPHICS GENERATOR                            #
+	############################################################################
+
+	def _gfx_latch(self, vbrd):
+		if self.vm_o_en:
+			if not vbrd:
+				self.gx_xscroll = self.rg_regs[22] & 7
+			self.gx_grfx_1r.appendleft(self.vm_o_gg)
+			self.gx_data_1r.appendleft(self.vm_o_cc)
+			self.gx_actv_1r.appendleft(1)
+		else:
+			self.gx_grfx_1r.appendleft(self.gx_grfx_1r[0])
+			self.gx_data_1r.appendleft(0)
+			self.gx_actv_1r.appendleft(0)
+
+
+	def _gfx_gen(self, strb):
+		if not (strb & 1):
+			return
+
+		# playing back a row of LineGfx until the next possible load or a write
+		# that can change its pixels, the 9th entry is repeated once the shift
+		# register is empty
+		pos = self.gx_row_pos
+		if pos:
+			if not (self.rg_wmsk & GFX_REGS) and ((strb >> 1) != self.gx_xscroll):
+				vbrd = self.gx_vbrd_1r[-1]
+				self.gx_vbrd_1r.appendleft(self.bd_o_vbrd)
+				if strb == 15:
+					self._gfx_latch(vbrd)
+				self.gx_o_colr, self.gx_o_bgnd = self.gx_row[min(pos, 9) - 1]
+				self.gx_row_pos = pos + 1
+				return
+			self._gfx_resume(pos)
+
+		regs = self.rg_regs
+
+		vbrd = self.gx_vbrd_1r[-1]
+		actv = self.gx_actv_1r[-1]
+		grfx = self.gx_grfx_1r[-1]
+		data = self.gx_data_1r[-1]
+
+		xscroll = self.gx_xscroll
+		shreg   = self.gx_shreg
+		data_3r = self.gx_data_3r
+		mc_phy  = self.gx_mc_phy
+		ecm     = self.gx_ecm
+		bmm     = self.gx_bmm
+		mcm     = self.gx_mcm
+		mcm_old = self.gx_mcm_old
+		bg_colr = self.gx_bg_colr[-1]
+
+		# latching new character
+		self.gx_vbrd_1r.appendleft(self.bd_o_vbrd)
+
+		if strb == 15:
+			self._gfx_latch(vbrd)
+
+		# latching mode flags
+		mc_phy_nxt = 0 if mc_phy else 1
+
+		ecm_ppl = self.gx_ecm_ppl[-1]
+		bmm_ppl = self.gx_bmm_ppl[-1]
+		mcm_ppl = self.gx_mcm_ppl[-1]
+		self.gx_ecm_ppl.appendleft((regs[17] >> 6) & 1)
+		self.gx_bmm_ppl.appendleft((regs[17] >> 5) & 1)
+		self.gx_mcm_ppl.appendleft((regs[22] >> 4) & 1)
+
+		# the cached color table is dropped after this pixel whenever the
+		# character or the mode flags change
+		stale = 0
+
+		if strb == 1:
+			self.gx_ecm = ecm | ecm_ppl
+			self.gx_bmm = bmm | bmm_ppl
+			stale = (self.gx_ecm != ecm) or (self.gx_bmm != bmm)
+		elif strb == 3:
+			self.gx_ecm = ecm & ecm_ppl
+			self.gx_bmm = bmm & bmm_ppl
+			stale = (self.gx_ecm != ecm) or (self.gx_bmm != bmm)
+		elif strb == 9:
+			self.gx_mcm = mcm_ppl
+			stale = (mcm_ppl != mcm)
+		elif strb == 15:
+			self.gx_mcm_old = mcm
+			if mcm != mcm_old:
+				mc_phy_nxt = 1
+
+		# loading shift register
+		shreg_nxt = (shreg << 1) & 0xff
+		load      = 0
+
+		if (strb >> 1) == xscroll:
+			if actv or (strb < 7):
+				mc_phy_nxt = 0
+			if actv and not vbrd:
+				self.gx_data_3r = data
+				shreg_nxt = grfx
+				stale = 1
+				load  = 1
+
+		self.gx_shreg  = shreg_nxt
+		self.gx_mc_phy = mc_phy_nxt
+
+		# color selection
+		if self.rg_wmsk & BGND_REGS:
+			self.gx_bg_colr.appendleft((regs[33] & 15, regs[34] & 15, regs[35] & 15, regs[36] & 15))
+		else:
+			self.gx_bg_colr.appendleft(self.gx_bg_colr[0])
+
+		mc_flag = (data_3r >> 11) & 1
+		msb     = (shreg >> 7) & 1
+
+		if mcm_old and (bmm | mc_flag):
+			if mc_phy == 0:
+				gfx_val  = shreg >> 6
+				gfx_bgnd = 1 - msb
+			else:
+				gfx_val  = self.gx_gfx_val
+				gfx_bgnd = self.gx_gfx_bgnd
+		elif bmm | mc_flag:
+			gfx_val  = msb << 1
+			gfx_bgnd = 1 - msb
+		else:
+			gfx_val  = msb * 3
+			gfx_bgnd = 1 - msb
+
+		self.gx_gfx_val  = gfx_val
+		self.gx_gfx_bgnd = gfx_bgnd
+
+		# 4-color table, see GraphicsGen. bg_colr only changes identity when
+		# the background colors are written
+		pal = self.gx_pal
+		if (pal is None) or (bg_colr is not self.gx_pal_bg):
+			pal = GraphicsGen.get_palette((ecm << 2) | (bmm << 1) | mcm, data_3r, bg_colr, 3)
+			self.gx_pal    = pal
+			self.gx_pal_bg = bg_colr
+
+		colr = pal[gfx_val]
+
+		if stale:
+			self.gx_pal = None
+
+		self.gx_o_colr = colr
+		self.gx_o_bgnd = gfx_bgnd
+
+		# rows start on a load, or on an empty shift register outside of the
+		# display window
+		if (self.line_gfx is not None) and ((strb >> 1) == xscroll):
+			if load:
+				self._gfx_steady(grfx)
+			elif (shreg_nxt == 0) and (gfx_val == 0):
+				self._gfx_steady(0)
+
+
+	def _gfx_steady(self, grfx):
+		# the rendered row replaces the per-pixel path from the next pixel on
+		# only when nothing in flight can change the mode flags or the
+		# background colors before the next load
+		if self.rg_wmsk & GFX_REGS:
+			return
+
+		regs = self.rg_regs
+		ecm  = (regs[17] >> 6) & 1
+		bmm  = (regs[17] >> 5) & 1
+		mcm  = (regs[22] >> 4) & 1
+
+		if (self.gx_ecm != ecm) or (self.gx_bmm != bmm) or (self.gx_mcm != mcm) or (self.gx_mcm_old != mcm):
+			return
+		if (self.gx_ecm_ppl.count(ecm) != 3) or (self.gx_bmm_ppl.count(bmm) != 3) or (self.gx_mcm_ppl.count(mcm) != 3):
+			return
+
+		bg_colr = self.gx_bg_colr
+		if bg_colr[0] != bg_colr[-1]:
+			return
+
+		row = self.line_gfx.get((ecm << 2) | (bmm << 1) | mcm, self.gx_data_3r, bg_colr[-1], grfx)
+		if row is not None:
+			self.gx_row, self.gx_row_vals = row
+			self.gx_row_gfx = grfx
+			self.gx_row_phy = self.gx_mc_phy
+			self.gx_row_pos = 1
+
+
+	def _gfx_resume(self, pos):
+		# state of the per-pixel path after pos - 1 pixels of the row
+		self.gx_shreg  = (self.gx_row_gfx << (pos - 1)) & 0xff
+		self.gx_mc_phy = (self.gx_row_phy + pos - 1) & 1
+
+		if pos > 1:
+			val = self.gx_row_vals[min(pos, 10) - 2]
+			self.gx_gfx_val  = val
+			self.gx_gfx_bgnd = 1 if val < 2 else 0
+
+		self.gx_pal     = None
+		self.gx_row_pos = 0
+
+
+	############################################################################
+	#                                 SPRITES                                  #
+	############################################################################
+
+	def _sprites(self, strb, db, rst):
+		regs = self.rg_regs
+
+		# register aliases, registered on every edge like in Sprites
+		spen = self.sp_spen
+		prio = self.sp_prio
+		mxmc = self.sp_mxmc
+		yexp = self.sp_yexp
+		colr = self.sp_colr
+		mclr = self.sp_mclr
+		xpos = self.sp_xpos
+		ypos = self.sp_ypos
+
+		if self.rg_wmsk & SPRT_REGS:
+			self.sp_spen = regs[21]
+			self.sp_prio = ~regs[27] & 0xff
+			self.sp_mxmc = regs[28]
+			self.sp_yexp = regs[23]
+			self.sp_colr = [regs[39 + i] & 15 for i in range(8)]
+			self.sp_mclr = [regs[37] & 15, regs[38] & 15]
+			self.sp_ypos = [regs[i*2 + 1] for i in range(8)]
+			self.sp_xpos = [(((regs[16] >> i) & 1) << 8) | regs[i*2] for i in range(8)]
+
+		if strb & 1:
+			cycl   = self.sy_o_cycl
+			i_xpos = self.sy_o_xpos
+			i_ypos = self.sy_o_ypos & 0xff
+
+			xexp  = self.sp_xexp[-1]
+			xtrig = self.sp_xtrig[-1]
+			self.sp_xexp.appendleft(regs[29])
+
+			ydisp      = self.sp_ydisp
+			xdisp      = self.sp_xdisp
+			yincr      = self.sp_yincr
+			xincr      = self.sp_xincr
+			spdma      = self.sp_spdma
+			mc_phy     = self.sp_mc_phy
+			count_xlen = self.sp_count_xlen
+			count_ylen = self.sp_count_ylen
+			shreg      = self.sp_shreg
+			sprt_val   = self.sp_sprt_val
+
+			xtrig_nxt      = 0
+			ydisp_nxt      = ydisp
+			xdisp_nxt      = xdisp
+			yincr_nxt      = yincr
+			xincr_nxt      = xincr
+			spdma_nxt      = spdma
+			mc_phy_nxt     = mc_phy
+			count_xlen_nxt = count_xlen[:]
+			count_ylen_nxt = count_ylen[:]
+			shreg_nxt      = shreg[:]
+			sprt_val_nxt   = sprt_val[:]
+
+			o_actv = 0
+			o_prio = 0
+			o_colr = self.sp_o_colr
+
+			# idle sprites are skipped in playback, see Sprites
+			actv = spen | spdma | ydisp | xdisp
+			vert = (strb == 1) and (cycl in (15, SPRT_DMA1_CYCL, SPRT_DMA2_CYCL,
+			                                 SPRT_YEXP_CYCL, SPRT_STRT_CYCL))
+
+			for i in ACTIVE_SPRITES[actv]:
+				bit = 1 << i
+
+				# sprite playback
+				if ydisp & bit:
+					if (xpos[i] == i_xpos) and not (xdisp & bit) and (count_xlen[i] == 0):
+						xtrig_nxt |= bit
+
+					if xtrig & bit:
+						xdisp_nxt  |= bit
+						mc_phy_nxt &= ~bit
+						if xexp & bit:
+							xincr_nxt &= ~bit
+						else:
+							xincr_nxt |= bit
+
+					if xdisp & bit:
+						if mxmc & bit:
+							if mc_phy & bit:
+								val = sprt_val[i]
+							else:
+								val = shreg[i] >> 22
+						else:
+							val = (shreg[i] >> 22) & 2
+						sprt_val_nxt[i] = val
+
+						if val:
+							o_actv = 1
+							o_prio = (prio >> i) & 1
+							if val == 1:
+								o_colr = mclr[0]
+							elif val == 2:
+								o_colr = colr[i]
+							else:
+								o_colr = mclr[1]
+
+						if (count_xlen[i] == 23) and (xincr & bit):
+							# horizontal end of a sprite
+							xdisp_nxt &= ~bit
+						else:
+							if xincr & bit:
+								count_xlen_nxt[i] = (count_xlen[i] + 1) & 63
+								shreg_nxt[i]      = (shreg[i] << 1) & 0xffffff
+								mc_phy_nxt        = (mc_phy_nxt & ~bit) | (~mc_phy & bit)
+
+							if xexp & bit:
+								xincr_nxt = (xincr_nxt & ~bit) | (~xincr & bit)
+							else:
+								xincr_nxt |= bit
+
+			# vertical trigger, for all the sprites, see Sprites
+			if vert:
+				for i in range(7, -1, -1):
+					bit = 1 << i
+
+					if cycl == 15:
+						if (count_ylen[i] == 20) and (yincr & bit):
+							spdma_nxt &= ~bit
+						elif yincr & bit:
+							count_ylen_nxt[i] = (count_ylen[i] + 1) & 63
+
+					if (cycl == SPRT_DMA1_CYCL) or (cycl == SPRT_DMA2_CYCL):
+						if not (spdma & bit) and (spen & bit) and (ypos[i] == i_ypos):
+							spdma_nxt        |= bit
+							yincr_nxt        |= bit
+							count_ylen_nxt[i] = 0
+
+					if cycl == SPRT_YEXP_CYCL:
+						if (spdma & bit) and (yexp & bit):
+							yincr_nxt = (yincr_nxt & ~bit) | (~yincr & bit)
+						else:
+							yincr_nxt |= bit
+
+					if cycl == SPRT_STRT_CYCL:
+						if spdma & bit:
+							if (spen & bit) and (ypos[i] == i_ypos):
+								ydisp_nxt |= bit
+						else:
+							ydisp_nxt &= ~bit
+
+			# sprite acquisition
+			acquire = self.sp_acquire
+
+			if vert and (cycl == SPRT_STRT_CYCL):
+				self.sp_count_sprt = 0
+				self.sp_count_data = 3
+				self.sp_acquire    = 1
+
+			if acquire:
+				k = self.sp_count_sprt
+				count_xlen_nxt[k] = 0
+				xdisp_nxt &= ~(1 << k)
+
+				if (strb == 7) or (strb == 15):
+					count = self.sp_count_data
+					if count != 3:
+						shift = 16 - count * 8
+						shreg_nxt[k] = (shreg_nxt[k] & ~(0xff << shift)) | ((db & 0xff) << shift)
+
+						if count == 2:
+							if k == 7:
+								self.sp_acquire = 0
+							else:
+								self.sp_count_sprt = k + 1
+
+						self.sp_count_data = count + 1
+					else:
+						self.sp_count_data = 0
+
+			self.sp_xtrig.appendleft(xtrig_nxt)
+			self.sp_ydisp      = ydisp_nxt
+			self.sp_xdisp      = xdisp_nxt
+			self.sp_yincr      = yincr_nxt
+			self.sp_xincr      = xincr_nxt
+			self.sp_spdma      = spdma_nxt
+			self.sp_mc_phy     = mc_phy_nxt
+			self.sp_count_xlen = count_xlen_nxt
+			self.sp_count_ylen = count_ylen_nxt
+			self.sp_shreg      = shreg_nxt
+			self.sp_sprt_val   = sprt_val_nxt
+			self.sp_o_actv     = o_actv
+			self.sp_o_prio     = o_prio
+			self.sp_o_colr     = o_colr
+
+		if rst:
+			self.sp_acquire = 0
+			self.sp_xdisp   = 0
+			self.sp_ydisp   = 0
+
+
+	############################################################################
+	#                               GRAPHICS MUX                               #
+	############################################################################
+
+	def _gfx_mux(self, strb, rst):
+		if not (strb & 1):
+			specs = self.specs
+			xpos  = self.sy_o_xpos
+			ypos  = self.sy_o_ypos
+
+			sprt_actv = self.mx_sprt_actv[-1]
+			sprt_prio = self.mx_sprt_prio[-1]
+			sprt_colr = self.mx_sprt_colr[-1]
+			bord_actv = self.mx_bord_actv[-1]
+			bord_colr = self.mx_bord_colr[-1]
+
+			self.mx_sprt_actv.appendleft(self.sp_o_actv)
+			self.mx_sprt_prio.appendleft(self.sp_o_prio)
+			self.mx_sprt_colr.appendleft(self.sp_o_colr)
+			self.mx_bord_actv.appendleft(self.bd_o_bord)
+			self.mx_bord_colr.appendleft(self.bd_o_colr)
+
+			self.mx_o_lstr = 0
+			self.mx_o_lend = 0
+
+			if bord_actv:
+				self.mx_o_colr = bord_colr
+			elif (sprt_actv == 0) or ((sprt_prio == 0) and (self.gx_o_bgnd == 0)):
+				self.mx_o_colr = self.gx_o_colr
+			else:
+				self.mx_o_colr = sprt_colr
+
+			# frame alignment signals
+			if xpos == specs.xnul:
+				self.mx_o_lstr = 1
+				self.mx_xval   = 1
+				if ypos == specs.ynul:
+					self.mx_yval   = 1
+					self.mx_o_fstr = 1
+
+			if xpos == specs.xend:
+				self.mx_o_lend = 1
+				if (self.line_gfx is not None) and self.line_gfx.miss:
+					self.line_gfx.flush()
+
+			if xpos == specs.xend + 1:
+				self.mx_xval   = 0
+				self.mx_o_fstr = 0
+				if ypos == specs.yend:
+					self.mx_yval = 0
+
+		if rst:
+			self.mx_o_fstr = 0
+			self.mx_o_lstr = 0
+			self.mx_o_lend = 0
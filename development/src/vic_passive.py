@@ -23,6 +23,8 @@
 #  limitations under the License.                                              #
 # ---------------------------------------------------------------------------- #
 
+import copy
+
 from ezhdl            import *
 from vic_pkg          import *
 from strobe           import *
@@ -34,10 +36,18 @@ from border           import *
 from graphics_gen     import *
 from sprites          import *
 from graphics_mux     import *
+from line_out         import *
+
+# attributes of a sub-entity that are not part of its state: inputs are
+# driven by the outputs they are bound to, generics are fixed at build time
+STATE_SKIP = ("i_", "g_", "sinks")
+
+# classes of the sub-entities, see profiler.attach
+SUB_ENTITIES = (Strobe, Registers, Sync, BadLineDetect, VideoMatrix, Border, GraphicsGen, Sprites, GraphicsMux)
 
 
 class VicPassive(Entity):
-	def __init__(self):
+	def __init__(self, g_regs_init=REGS_INIT):
 		self.i_clk = Input(Wire())
 		self.i_rst = Input(Wire())
 		self.i_ph0 = Input(Wire())
@@ -62,7 +72,7 @@ class VicPassive(Entity):
 		self.e_strobe.i_ph0 <<= self.i_ph0
 
 		# register interface
-		self.e_registers = Registers()
+		self.e_registers = Registers(g_regs_init)
 		self.e_registers.i_clk  <<= self.i_clk
 		self.e_registers.i_rst  <<= self.i_rst
 		self.e_registers.i_strb <<= self.e_strobe.o_strb
@@ -107,6 +117,7 @@ class VicPassive(Entity):
 		self.e_border.i_specs <<= self.specs
 		self.e_border.i_strb  <<= self.e_strobe.o_strb
 		self.e_border.i_regs  <<= self.e_registers.o_regs
+		self.e_border.i_wmsk  <<= self.e_registers.o_wmsk
 		self.e_border.i_cycl  <<= self.e_sync.o_cycl
 		self.e_border.i_xpos  <<= self.e_sync.o_xpos
 		self.e_border.i_ypos  <<= self.e_sync.o_ypos
@@ -128,14 +139,19 @@ class VicPassive(Entity):
 		self.e_sprites.i_rst     <<= self.i_rst
 		self.e_sprites.i_specs   <<= self.specs
 		self.e_sprites.i_regs    <<= self.e_registers.o_regs
+		self.e_sprites.i_wmsk    <<= self.e_registers.o_wmsk
 		self.e_sprites.i_strb    <<= self.e_strobe.o_strb
 		self.e_sprites.i_cycl    <<= self.e_sync.o_cycl
 		self.e_sprites.i_xpos    <<= self.e_sync.o_xpos
 		self.e_sprites.i_ypos    <<= self.e_sync.o_ypos
 		self.e_sprites.i_data    <<= self.i_db
 
+		# line-batched output, only collects pixels once a sink is attached.
+		# Not an entity, the graphics mux feeds it
+		self.e_line_out = LineOut(t_vic_specs_h63)
+
 		# graphics mux
-		self.e_gfx_mux = GraphicsMux(g_mark_lines = False)
+		self.e_gfx_mux = GraphicsMux(g_mark_lines = False, g_line_out = self.e_line_out)
 		self.e_gfx_mux.i_clk       <<= self.i_clk
 		self.e_gfx_mux.i_rst       <<= self.i_rst
 		self.e_gfx_mux.i_specs     <<= self.specs
@@ -156,3 +172,57 @@ class VicPassive(Entity):
 		self.o_lstr <<= self.e_gfx_mux.o_lstr
 		self.o_fstr <<= self.e_gfx_mux.o_fstr
 		self.o_lend <<= self.e_gfx_mux.o_lend
+
+
+	def add_line_sink(self, sink):
+		"""
+		sink(line, lnum, fcnt) is called with every completed line, line being
+		a view of a buffer shared by all sinks and reused for the next line
+		"""
+		self.e_line_out.sinks.append(sink)
+
+
+	def flush_lines(self):
+		"""
+		Passes on the line being collected when the simulation stops
+		"""
+		self.e_line_out.flush()
+
+
+	def state(self):
+		"""
+		Snapshot of every sub-entity, can be pickled: the present value of
+		its signals and outputs and a copy of its other attributes
+		"""
+		ret = {}
+		for name, entity in vars(self).items():
+			if not name.startswith("e_"):
+				continue
+			ret[name] = {}
+			for k, v in vars(entity).items():
+				if k.startswith(STATE_SKIP) or callable(v):
+					continue
+				if hasattr(v, "nxt"):
+					ret[name][k] = (True, copy.deepcopy(v.now))
+				else:
+					ret[name][k] = (False, copy.deepcopy(v))
+		return ret
+
+
+	def restore(self, state):
+		"""
+		Continues from a state() taken earlier, in place of a reset. Must be
+		called before the simulation starts, the signals take their values
+		on the first tick. The register file is handed to Registers as well,
+		so that its _reset does not overwrite it with the initial values
+		"""
+		for name, attrs in state.items():
+			entity = getattr(self, name)
+			for k, (signal, v) in attrs.items():
+				if signal:
+					getattr(entity, k).nxt <<= v
+				else:
+					setattr(entity, k, copy.deepcopy(v))
+
+		regs = state["e_registers"]
+		self.e_registers.restored = (copy.deepcopy(regs["o_regs"][1]), copy.deepcopy(regs["o_wmsk"][1]))
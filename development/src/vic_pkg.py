@@ -66,12 +66,28 @@ class VicSpecs(HwType):
 		else:
 			raise Exception(f"Version {version} not supported")
 
+		# xpos of the first pixel of the cycle the vertical border ff is
+		# checked on for the whole cycle
+		self.xyff = self.xref + 8 * (self.CYCLE_YFF - self.CYCL_REF - 1)
+
+		# border edges (left, right, top, bottom), indexed by (CSEL << 1) | RSEL
+		self.edges = []
+		for csel in range(2):
+			for rsel in range(2):
+				self.edges.append((
+					self.xfvc + 7 if (csel == 0) else self.xfvc,
+					self.xlvc - 8 if (csel == 0) else self.xlvc + 1,
+					self.yfvc + 4 if (rsel == 0) else self.yfvc,
+					self.ylvc - 3 if (rsel == 0) else self.ylvc + 1,
+				))
+
 
 t_vic_specs_h63 = VicSpecs(H63)
 #t_vic_specs_h64 = VicSpecs(H64)
 #t_vic_specs_h65 = VicSpecs(H65)
 
 t_vic_regs = Array([Unsigned().bits(8)]*64)
+t_vic_wmsk = Unsigned().bits(64)
 t_vic_strb = Unsigned().bits(4)
 t_vic_addr = Unsigned().bits(6)
 t_vic_data = Unsigned().bits(12)
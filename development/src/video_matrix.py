@@ -23,8 +23,9 @@
 #  limitations under the License.                                              #
 # ---------------------------------------------------------------------------- #
 
-from ezhdl   import *
-from vic_pkg import *
+from ezhdl    import *
+from vic_pkg  import *
+from line_ram import *
 
 RAM_LEN  = 40
 
@@ -46,7 +47,7 @@ class VideoMatrix(Entity):
 		self.o_en       = Output(Wire()    )
 
 		self.idle       = Signal(Wire())
-		self.ram        = Signal(Array([t_vic_data]*RAM_LEN))
+		self.ram        = LineRam(RAM_LEN)
 		self.ram_wadd   = Signal(Unsigned().span(RAM_LEN))
 		self.ram_radd   = Signal(Unsigned().span(RAM_LEN))
 		self.count_line = Signal(Unsigned().upto(8)) # intentional for parking
@@ -55,6 +56,8 @@ class VideoMatrix(Entity):
 	def _run(self):
 
 		if self.i_clk.posedge():
+			self.ram.clock()
+
 			specs = self.i_specs.now
 			CYCL_REF = specs.CYCL_REF
 
@@ -67,13 +70,13 @@ class VideoMatrix(Entity):
 
 				if (self.i_bdln.now == 1):
 					if (self.i_cycl.now == CYCL_REF):
-						self.ram.nxt[self.ram_wadd.now] <<= self.i_db.now
+						self.ram.write(self.ram_wadd.now.dump, self.i_db.now.dump)
 						self.count_line.nxt <<= 0
 						self.idle.nxt       <<= 0
 
 					elif (self.ram_wadd.now < RAM_LEN - 1):
 						# same, but without resetting the line counter
-						self.ram.nxt[self.ram_wadd.now] <<= self.i_db.now
+						self.ram.write(self.ram_wadd.now.dump, self.i_db.now.dump)
 
 				if (self.i_cycl.now == 57):
 					if (self.count_line.now != 7):
@@ -100,7 +103,7 @@ class VideoMatrix(Entity):
 				    (self.i_ypos.now <= specs.ylvc )):
 					self.o_en.nxt <<= 1
 					self.o_gg.nxt <<= self.i_db.now[8:0]
-					self.o_cc.nxt <<= self.ram.now[self.ram_radd.now]
+					self.o_cc.nxt <<= self.ram.read(self.ram_radd.now.dump)
 
 				elif (self.count_cycl.now != RAM_LEN):
 					self.o_en.nxt <<= 1
@@ -116,8 +119,7 @@ class VideoMatrix(Entity):
 					self.o_cc.nxt <<= 0
 
 			if self.i_rst.now:
-				for i in range(RAM_LEN):
-					self.ram.nxt[i] <<= 0
+				self.ram.clear()
 				self.o_en.nxt <<= 0
 				self.o_gg.nxt <<= 0
 				self.o_cc.nxt <<= 0
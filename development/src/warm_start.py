@@ -0,0 +1,159 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Warm start. The emulator comes out of reset assuming that the first bus     #
+#  sample is the ph0 falling edge of cycle CYCL_REF - 1 on raster line 0,      #
+#  with the register file holding its initial values. A warm start provides    #
+#  both for a given capture, either from a snapshot file or from a pre-scan    #
+#  of the capture itself:                                                      #
+#                                                                              #
+#  - the sync position is found from the refresh pattern. The last line of a   #
+#    frame is the one whose refresh addresses end with 0b11 five times in a    #
+#    row, the reset position is (cycl - 1) cycles after its reference cycle    #
+#  - the register file holds the last value written to every register          #
+#    before that position. A capture of exactly one frame is read as a loop,   #
+#    in longer ones registers not written yet keep their initial value         #
+#                                                                              #
+#  Feeding the capture from the start position with these registers locks      #
+#  sync and gets every register right from the first frame on. The video       #
+#  matrix and sprite units also carry state from one frame into the next       #
+#  (display state, row buffer, sprite counters), which is not part of a warm   #
+#  start, so the first settled frame is the one after PRIME_FRAMES frames.     #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import json
+
+import numpy as np
+
+from vic_pkg    import *
+from registers  import REGS_INIT
+from decimate   import decimate, CTL_CS, CTL_RW
+
+REFRESH  = (0b1110010011, 0b1001001110, 0b0100111001, 0b0011100100)
+LAST_REF = 0b1111111111
+
+# frames rendered before the first one that matches a run in steady state
+PRIME_FRAMES = 1
+
+
+class WarmStart:
+	def __init__(self, regs=REGS_INIT, start=0):
+		self.regs  = list(regs)
+		self.start = start
+
+	def save(self, path):
+		with open(path, "w") as f:
+			json.dump({"regs": self.regs, "start": self.start}, f)
+
+
+def load(path):
+	with open(path) as f:
+		ret = json.load(f)
+	return WarmStart(ret["regs"], ret["start"])
+
+
+def frame_samples(specs=t_vic_specs_h63):
+	return 16 * specs.cycl * specs.ylen
+
+
+def sync_start(rec, starts, specs=t_vic_specs_h63):
+	"""
+	Sample where the emulator must start after reset, None when the capture
+	holds no complete frame marker
+	"""
+	# refresh shift register seen on strobe 2 of every cycle, as in Sync
+	shreg = np.zeros(len(rec), dtype=np.int64)
+	a     = (rec["a2"] & 3).astype(np.int64)
+	for i in range(5):
+		shreg[i:] |= a[:len(a) - i] << (2 * i)
+
+	# the reference cycle is the one where refresh patterns keep showing up
+	ref   = np.isin(shreg, REFRESH)
+	phase = np.bincount(np.flatnonzero(ref) % specs.cycl, minlength=specs.cycl).argmax()
+
+	marks = np.flatnonzero(shreg[phase::specs.cycl] == LAST_REF) * specs.cycl + phase
+	marks = marks[marks >= 4]
+	if len(marks) == 0:
+		return None
+
+	start = int(starts[marks[0]]) + 16 * (specs.cycl - 1) - 1
+	return start % frame_samples(specs)
+
+
+def scan(words, init=REGS_INIT, specs=t_vic_specs_h63):
+	"""
+	Pre-scans a capture for its warm start. Registers that are not written
+	before the start position keep the value they have in <init>
+	"""
+	rec, starts = decimate(words)
+
+	start = sync_start(rec, starts, specs)
+	if start is None:
+		raise Exception("No frame start found in the capture")
+
+	regs = list(init)
+	wen  = (((rec["ctl"] >> CTL_CS) & 1) == 0) & (((rec["ctl"] >> CTL_RW) & 1) == 0)
+	idx  = np.flatnonzero(wen)
+
+	# a single frame is a loop, writes after the start position happened
+	# before it on the previous turn. A longer capture only has the writes
+	# that precede the start position
+	if len(words) == frame_samples(specs):
+		idx = idx[np.argsort((starts[idx] - start) % len(words), kind="stable")]
+	else:
+		idx = idx[starts[idx] < start]
+
+	for i in idx.tolist():
+		reg = int(rec["a10"][i]) & 0x3f
+		if reg < len(regs):
+			regs[reg] = int(rec["db14"][i]) & 0xff
+
+	return WarmStart(regs, start)
+
+
+
+def regs_at(words, positions, init=REGS_INIT):
+	"""
+	Register file at each of <positions>, given in increasing order: every
+	register holds the last value written to it earlier in the capture, or
+	its value in <init> when it was not written yet
+	"""
+	rec, starts = decimate(words)
+
+	wen = (((rec["ctl"] >> CTL_CS) & 1) == 0) & (((rec["ctl"] >> CTL_RW) & 1) == 0)
+	idx = np.flatnonzero(wen).tolist()
+
+	ret  = []
+	regs = list(init)
+	k    = 0
+	for pos in positions:
+		while (k < len(idx)) and (starts[idx[k]] < pos):
+			reg = int(rec["a10"][idx[k]]) & 0x3f
+			if reg < len(regs):
+				regs[reg] = int(rec["db14"][idx[k]]) & 0xff
+			k += 1
+		ret.append(list(regs))
+	return ret
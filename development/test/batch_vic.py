@@ -0,0 +1,262 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#                                                                              #
+#  Batch renderer for long captures. The capture is cut into segments of       #
+#  SEGMENT_FRAMES frames and every segment is rendered by a worker process     #
+#  with its own VicPassive (VicFast with --fast). A worker starts WARMUP       #
+#  samples early, so that sync is locked when the segment begins, with the     #
+#  register file holding every write of the capture before its start,          #
+#  see warm_start.regs_at(). Frames are identified by the capture sample       #
+#  they start at. Each worker also renders the first frame of the following    #
+#  segment, which must be identical to the one rendered by the next worker,    #
+#  so every seam is verified. The frames are written in order to               #
+#  output/frames.raw, in the format of FrameSink.                              #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+import time
+import multiprocessing as mp
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from ezhdl       import *
+from vic_pkg     import *
+from vic_passive import *
+from vic_fast    import *
+from frame_sink  import *
+from vic_ref     import *
+from capture     import open_capture
+from bus_decode  import decode_blocks
+
+import warm_start
+import numpy as np
+
+input_path = get_abs_path("input/frame_dump.txt")
+raw_path   = get_abs_path("output/frames.raw")
+
+FRAME_SAMPLES  = 16 * t_vic_specs_h63.cycl * t_vic_specs_h63.ylen
+WARMUP         = FRAME_SAMPLES
+SEGMENT_FRAMES = 8
+
+
+class SegmentBench(Entity):
+	"""
+	Feeds samples [start, stop) of a capture to a VicPassive until the
+	frame starting at or after <hi> is complete. starts[k] is the sample
+	fed when frame k of the sink started
+	"""
+	def __init__(self, words, start, stop, hi, regs):
+		self.words = words
+		self.start = start
+		self.stop  = stop
+		self.hi    = hi
+
+		self.dut    = VicPassive(regs)
+		self.sink   = FrameSink(None)
+		self.starts = []
+		self.clkgen = ClockGen(16.0e6)
+
+		self.clk = Signal(Wire())
+		self.rst = Signal(Wire())
+
+		self.clk          <<= self.clkgen.clk
+		self.dut.i_clk    <<= self.clk
+		self.dut.i_rst    <<= self.rst
+
+		self.dut.add_line_sink(self.sink.put_line)
+
+	@procedure
+	def _run(self):
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 1
+
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 0
+
+		line_out = self.dut.e_line_out
+		fcnt     = line_out.fcnt
+		offset   = self.start
+		for bus in decode_blocks(self.words[:self.stop], start=self.start):
+			for ph0, db, a, rw, cs, aec in bus.rows():
+				yield from posedge(self.clk)
+				if line_out.fcnt != fcnt:
+					fcnt = line_out.fcnt
+					self.starts.append(offset)
+				self.dut.i_ph0.nxt <<= ph0
+				self.dut.i_db .nxt <<= db
+				self.dut.i_a  .nxt <<= a
+				self.dut.i_rw .nxt <<= rw
+				self.dut.i_cs .nxt <<= cs
+				self.dut.i_aec.nxt <<= aec
+				offset += 1
+
+			# stop once the seam frame is complete
+			if self.sink.frames and self.starts[len(self.sink.frames) - 1] >= self.hi:
+				break
+
+		SimpleSim.stop()
+
+
+def run_hdl(words, start, stop, hi, regs):
+	bench = SegmentBench(words, start, stop, hi, regs)
+	SimpleSim.run(bench)
+	bench.dut.flush_lines()
+	bench.sink.close()
+	return bench.starts, bench.sink.frames
+
+
+def run_fast(words, start, stop, hi, regs):
+	engine = VicFast(regs_init=regs)
+	engine.reset()
+	sink   = FrameSink(None)
+	starts = []
+
+	offset = start
+	for bus in decode_blocks(words[:stop], start=start):
+		for n in engine.run(bus):
+			for i in range(n):
+				flag = engine.o_flag[i]
+				lstr = int(bool(flag & PIX_LSTR))
+				lend = int(bool(flag & PIX_LEND))
+				fstr = int(bool(flag & PIX_FSTR))
+				if lstr and fstr:
+					starts.append(offset)
+				sink.push(engine.o_colr[i], lstr, lend, fstr)
+			offset += 16
+
+		# stop once the seam frame is complete
+		if sink.frames and starts[len(sink.frames) - 1] >= hi:
+			break
+
+	# the last frame of the capture is only complete if all its lines are in
+	sink.close()
+	return starts, sink.frames
+
+
+def segment_start(lo):
+	return max(0, lo - WARMUP) // 16 * 16
+
+
+def render_segment(job):
+	"""
+	Worker: renders the frames of the capture at <path> that start in
+	[lo, hi), followed by the first frame starting at or after <hi>, from
+	segment_start(lo) with the register file <regs>. Returns a list of
+	(start sample, frame)
+	"""
+	path, lo, hi, regs, fast = job
+	capture = open_capture(path)
+	start   = segment_start(lo)
+	stop    = min(len(capture), hi + 2 * FRAME_SAMPLES)
+
+	run = run_fast if fast else run_hdl
+	starts, frames = run(capture.words, start, stop, hi, regs)
+
+	# only complete frames are in the list, frames[k] started at starts[k]
+	ret = []
+	for s, frame in zip(starts, frames):
+		if s >= lo:
+			ret.append((s, frame))
+			if s >= hi:
+				break
+	return ret
+
+
+def render_capture(path, workers=None, segment_frames=SEGMENT_FRAMES, fast=False):
+	"""
+	Renders the whole capture in parallel. Returns the frames in order and
+	the list of seams as (segment, verified), a seam is not verified when
+	either side did not complete the overlapping frame
+	"""
+	words = open_capture(path).words
+	seg   = segment_frames * FRAME_SAMPLES
+	bound = [(lo, min(lo + seg, len(words))) for lo in range(0, len(words), seg)]
+	regs  = warm_start.regs_at(words, [segment_start(lo) for lo, hi in bound])
+	jobs  = [(path, lo, hi, r, fast) for (lo, hi), r in zip(bound, regs)]
+
+	with mp.Pool(workers) as pool:
+		results = pool.map(render_segment, jobs)
+
+	frames = []
+	seams  = []
+	for j, ((path, lo, hi, r, fast), found) in enumerate(zip(jobs, results)):
+		frames += [frame for s, frame in found if s < hi]
+
+		if j + 1 < len(results):
+			mine = [(s, frame) for s, frame in found if s >= hi]
+			nxt  = results[j + 1]
+			if mine and nxt and mine[0][0] == nxt[0][0]:
+				seams.append((j, bool((mine[0][1] == nxt[0][1]).all())))
+			else:
+				seams.append((j, None))
+
+	return frames, seams
+
+
+if __name__ == "__main__":
+	path    = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else input_path
+	workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else None
+	fast    = "--fast" in sys.argv
+
+	if fast:
+		warn_stand_in()
+
+	if path.endswith(".txt"):
+		# converts the dump once, before the workers open it
+		open_capture(path)
+		path = path[:-4] + ".cap"
+
+	start = time.perf_counter()
+	frames, seams = render_capture(path, workers, fast=fast)
+	wall  = time.perf_counter() - start
+
+	with open(raw_path, "wb") as f:
+		for frame in frames:
+			f.write(frame.tobytes())
+
+	print(f"{len(frames)} frames in {wall:.2f} s ({len(frames) / wall:.2f} fps)")
+	if not frames:
+		print("FAIL: no frame was rendered")
+		sys.exit(1)
+
+	# a seam that could not be checked fails the run like one that differs
+	fail = False
+	for j, ok in seams:
+		if ok is None:
+			print(f"FAIL: seam {j} not verified")
+			fail = True
+		elif not ok:
+			print(f"FAIL: frames differ across seam {j}")
+			fail = True
+	if fail:
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,92 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Micro-benchmark of the graphics generator of VicFast on synthetic screens,  #
+#  one per video mode. Every cycle latches a new random character, so the      #
+#  color table is resolved once per character and looked up on every pixel.    #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+import time
+import random
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from vic_fast import *
+
+CYCLES  = 5000
+REPEATS = 5
+
+# name, register 17 (ECM, BMM) and register 22 (MCM)
+SCREENS = (
+	("text"     , 0x1b, 0x08),
+	("mc text"  , 0x1b, 0x18),
+	("bitmap"   , 0x3b, 0x08),
+	("mc bitmap", 0x3b, 0x18),
+	("ecm text" , 0x5b, 0x08),
+)
+
+
+def run(reg17, reg22):
+	"""
+	Nanoseconds per pixel spent in the graphics generator, best of REPEATS
+	"""
+	engine = VicFast()
+	engine.rg_regs[17] = reg17
+	engine.rg_regs[22] = reg22
+	engine.vm_o_en = 1
+
+	rnd = random.Random(0)
+	cc = [rnd.getrandbits(12) for i in range(40)]
+	gg = [rnd.getrandbits(8) for i in range(40)]
+
+	# settling the mode flags, then no more register writes
+	for strb in range(32):
+		engine._gfx_gen(strb & 15)
+	engine.rg_wmsk = 0
+
+	wall = None
+	for r in range(REPEATS):
+		start = time.perf_counter()
+		for c in range(CYCLES):
+			engine.vm_o_cc = cc[c % 40]
+			engine.vm_o_gg = gg[c % 40]
+			for strb in range(16):
+				engine._gfx_gen(strb)
+		t = time.perf_counter() - start
+		wall = t if wall is None else min(wall, t)
+
+	return wall * 1e9 / (CYCLES * 8)
+
+
+if __name__ == "__main__":
+	for name, reg17, reg22 in SCREENS:
+		print(f"{name:10} {run(reg17, reg22):7.1f} ns/pixel")
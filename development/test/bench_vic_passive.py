@@ -0,0 +1,280 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Golden-frame regression and throughput benchmark. The capture is run        #
+#  through VicPassive (or VicFast with --fast) without any GUI, the last       #
+#  complete frame is compared with target_pal.png through the palette and      #
+#  the results are appended to output/bench.jsonl. A run fails when the        #
+#  mismatch count is above the baseline of the same engine and workload in     #
+#  input/bench_ref.json, or the speed more than SPEED_TOLERANCE below the      #
+#  baseline of this machine in output/bench_machine.json. A missing baseline   #
+#  is recorded by the run, --record stores the results of the run as the new   #
+#  baselines. --no-sprites runs the capture with all sprites disabled, a       #
+#  sprite-free workload.                                                       #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+import json
+import time
+import platform
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from ezhdl       import *
+from vic_passive import *
+from vic_fast    import *
+from registers   import REGS_INIT
+from frame_sink  import *
+from vic_ref     import *
+from capture     import open_capture
+from bus_decode  import decode_blocks
+
+import numpy as np
+
+input_path   = get_abs_path("input/frame_dump.txt")
+target_path  = get_abs_path("output/target_pal.png")
+results_path = get_abs_path("output/bench.jsonl")
+ref_path     = get_abs_path("input/bench_ref.json")
+machine_path = get_abs_path("output/bench_machine.json")
+
+RECORD = "--record" in sys.argv
+
+PASSES = 2
+
+SPEED_TOLERANCE = 0.2
+
+# target_pal.png is an upscaled emulator screenshot of the TARGET_W x TARGET_H
+# frame pixels starting at (TARGET_X0, TARGET_Y0)
+TARGET_X0 = 21
+TARGET_Y0 = 8
+TARGET_W  = 384
+TARGET_H  = 272
+
+# the screenshot was taken with a different palette, the entries that appear
+# in it are replaced by the colors it actually uses. These are the four flat
+# colors that make up almost all of target_pal.png, every other color in it is
+# a blend between two of them left by the upscaling
+TARGET_PALETTE = PALETTE[:16].astype(int)
+TARGET_PALETTE[0]  = [0x10, 0x10, 0x10] # black
+TARGET_PALETTE[8]  = [0xe0, 0xa0, 0x40] # orange
+TARGET_PALETTE[11] = [0x54, 0x54, 0x54] # dark grey
+TARGET_PALETTE[15] = [0xc0, 0xc0, 0xc0] # light grey
+
+
+def load_target():
+	"""
+	Samples target_pal.png at the center of every frame pixel it covers and
+	maps it to the nearest palette index
+	"""
+	import matplotlib.image as mpimg
+	img = mpimg.imread(target_path)[:, :, :3]
+	img = np.rint(img * 255).astype(int)
+
+	h, w = img.shape[:2]
+	ty = ((np.arange(TARGET_H) + 0.5) * h / TARGET_H).astype(int)
+	tx = ((np.arange(TARGET_W) + 0.5) * w / TARGET_W).astype(int)
+	img = img[np.ix_(ty, tx)]
+
+	dist = ((img[:, :, None, :] - TARGET_PALETTE[None, None]) ** 2).sum(-1)
+	return dist.argmin(-1).astype(np.uint8)
+
+
+def compare(frame, target):
+	win = frame[TARGET_Y0:TARGET_Y0 + TARGET_H, TARGET_X0:TARGET_X0 + TARGET_W]
+	return int((win != target).sum())
+
+
+class VicBench(Entity):
+	def __init__(self, capture, regs_init):
+		self.capture = capture
+		self.ticks   = 0
+
+		self.dut    = VicPassive(regs_init)
+		self.sink   = FrameSink(None)
+		self.clkgen = ClockGen(16.0e6)
+
+		self.clk = Signal(Wire())
+		self.rst = Signal(Wire())
+
+		self.clk          <<= self.clkgen.clk
+		self.dut.i_clk    <<= self.clk
+		self.dut.i_rst    <<= self.rst
+
+		# frames are collected line by line
+		self.dut.add_line_sink(self.sink.put_line)
+
+	@procedure
+	def _run(self):
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 1
+
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 0
+
+		for f in range(PASSES):
+			for bus in decode_blocks(self.capture.words):
+				for ph0, db, a, rw, cs, aec in bus.rows():
+					yield from posedge(self.clk)
+					self.dut.i_ph0.nxt <<= ph0
+					self.dut.i_db .nxt <<= db
+					self.dut.i_a  .nxt <<= a
+					self.dut.i_rw .nxt <<= rw
+					self.dut.i_cs .nxt <<= cs
+					self.dut.i_aec.nxt <<= aec
+					self.ticks += 1
+
+		SimpleSim.stop()
+
+
+def run_hdl(capture, regs_init):
+	bench = VicBench(capture, regs_init)
+	SimpleSim.run(bench)
+	bench.dut.flush_lines()
+	bench.sink.close()
+	return bench.sink.frames, bench.ticks
+
+
+def run_fast(capture, regs_init):
+	engine = VicFast(regs_init=regs_init)
+	engine.reset()
+	sink  = FrameSink(None)
+	ticks = 0
+
+	for f in range(PASSES):
+		for bus in decode_blocks(capture.words):
+			ticks += len(bus)
+			for n in engine.run(bus):
+				for i in range(n):
+					flag = engine.o_flag[i]
+					sink.push(engine.o_colr[i], int(bool(flag & PIX_LSTR)),
+					          int(bool(flag & PIX_LEND)), int(bool(flag & PIX_FSTR)))
+	sink.close()
+	return sink.frames, ticks
+
+
+def load_ref(path):
+	"""
+	Baselines by engine and workload, see --record
+	"""
+	try:
+		with open(path) as f:
+			return json.load(f)
+	except FileNotFoundError:
+		return {}
+
+
+def save_ref(path, ref):
+	with open(path, "w") as f:
+		json.dump(ref, f, indent="\t", sort_keys=True)
+		f.write("\n")
+
+
+if __name__ == "__main__":
+	engine  = "fast" if "--fast" in sys.argv else "hdl"
+	sprites = "--no-sprites" not in sys.argv
+	capture = open_capture(input_path)
+	target  = load_target()
+
+	# the capture never writes $D015, so the initial value decides whether
+	# sprites are displayed at all
+	regs_init = REGS_INIT[:]
+	if not sprites:
+		regs_init[21] = 0
+
+	if engine == "fast":
+		warn_stand_in()
+
+	start = time.perf_counter()
+	if engine == "fast":
+		frames, ticks = run_fast(capture, regs_init)
+	else:
+		frames, ticks = run_hdl(capture, regs_init)
+	wall = time.perf_counter() - start
+
+	if not frames:
+		print("FAIL: no frame was rendered")
+		sys.exit(1)
+
+	# the last frame is cut short by the end of the capture
+	frame = frames[-2] if len(frames) > 1 else frames[-1]
+
+	res = {
+		"engine"      : engine,
+		"sprites"     : sprites,
+		"time"        : time.strftime("%Y-%m-%dT%H:%M:%S"),
+		"passes"      : PASSES,
+		"ticks"       : ticks,
+		"frames"      : len(frames),
+		"wall_s"      : round(wall, 3),
+		"ticks_per_s" : round(ticks / wall, 1),
+		"fps"         : round(len(frames) / wall, 4),
+		"mismatches"  : compare(frame, target),
+		"pixels"      : TARGET_W * TARGET_H,
+	}
+
+	with open(results_path, "a") as f:
+		f.write(json.dumps(res) + "\n")
+
+	for k, v in res.items():
+		print(f"{k:12} = {v}")
+
+	# the mismatch count is the same on every machine and is committed, the
+	# speed is only compared with earlier runs on the same machine
+	key  = engine if sprites else f"{engine}-no-sprites"
+	node = platform.node()
+	ref  = load_ref(ref_path)
+	mach = load_ref(machine_path)
+	here = mach.setdefault(node, {})
+
+	fail = False
+	base = ref.get(key)
+	if RECORD or base is None:
+		ref[key] = {k: res[k] for k in ("mismatches", "time")}
+		save_ref(ref_path, ref)
+		print(f"Mismatch baseline of {key} recorded")
+	elif res["mismatches"] > base["mismatches"]:
+		print(f"FAIL: mismatches went from {base['mismatches']} to {res['mismatches']}")
+		fail = True
+	elif res["mismatches"] < base["mismatches"]:
+		print(f"Mismatches went down from {base['mismatches']}, record the new baseline")
+
+	base = here.get(key)
+	if RECORD or base is None:
+		here[key] = {k: res[k] for k in ("ticks_per_s", "time")}
+		save_ref(machine_path, mach)
+		print(f"Speed baseline of {key} on {node} recorded")
+	elif res["ticks_per_s"] < base["ticks_per_s"] * (1 - SPEED_TOLERANCE):
+		print(f"FAIL: speed went from {base['ticks_per_s']} to {res['ticks_per_s']} ticks/s")
+		fail = True
+
+	if fail:
+		sys.exit(1)
+	print("PASS")
@@ -26,15 +26,22 @@
 from   ezpath  import *
 from   ezhdl   import *
 from   vic_pkg import *
+from   frame_sink import MAX_HRES, MAX_VRES, BLANK, PALETTE, to_rgb
+
+import time
+import threading
 
 import numpy as np
 import matplotlib.pyplot as plt
 
-MAX_HRES = 504
-MAX_VRES = 312
 
 class FrameRender(Entity):
-	def __init__(self):
+	"""
+	Collects pixels into a back buffer on the simulation thread. Completed
+	lines are published to a front buffer at most <max_rate> times per
+	second, display() shows the front buffer and must run on the GUI thread
+	"""
+	def __init__(self, max_rate=25.0):
 		self.i_clk  = Input(Wire())
 		self.i_rst  = Input(Wire())
 		self.i_push = Input(Wire())
@@ -45,59 +52,89 @@ class FrameRender(Entity):
 
 		self.xpos  = 0
 		self.ypos  = 0
-		self.frame = np.array([[[127]*3]* MAX_HRES] * MAX_VRES)
+		self.frame = np.full((MAX_VRES, MAX_HRES), BLANK, dtype=np.uint8)
+		self.front = self.frame.copy()
 
 		self.frame_count = 0
 
-		self.color = [
-			[0x00, 0x00, 0x00], # black
-			[0xff, 0xff, 0xff], # white
-			[0x9f, 0x4e, 0x44], # red
-			[0x6a, 0xbf, 0xc6], # cyan
-			[0xa0, 0x57, 0xa3], # purple
-			[0x5c, 0xab, 0x5e], # green
-			[0x50, 0x45, 0x9b], # blue
-			[0xc9, 0xd4, 0x87], # yellow
-			[0xa1, 0x68, 0x3c], # orange
-			[0x6d, 0x54, 0x12], # brown
-			[0xcb, 0x7e, 0x75], # pink
-			[0x62, 0x62, 0x62], # dark grey
-			[0x89, 0x89, 0x89], # grey
-			[0x9a, 0xe2, 0x9b], # light green
-			[0x88, 0x7e, 0xcb], # light blue
-			[0xad, 0xad, 0xad]  # light grey
-		]
-
-		self.fig, self.ax = plt.subplots()
-		self.im = self.ax.imshow(self.frame)  # Initial plot
-		plt.axis('off')  # Optional: Hide axes for a cleaner look
+		self.period = 1.0 / max_rate
+		self.t_pub  = 0.0
+		self.fresh  = False
+		self.lock   = threading.Lock()
 
 
 	def _run(self):
 		if self.i_clk.posedge():
 			if self.i_push.now == 1:
-				if(self.xpos > MAX_HRES - 1):
-					self.xpos = MAX_HRES - 1
+				self.push(self.i_colr.now, self.i_lstr.now, self.i_lend.now, self.i_fstr.now)
 
-				if(self.ypos > MAX_VRES - 1):
-					self.ypos = MAX_VRES - 1
+			if self.i_clk.now:
+				pass
 
-				if self.i_lstr.now == 1:
-					self.xpos = 0
-					if self.i_fstr.now == 1:
-						self.ypos = 0
-						self.frame_count += 1
 
-				self.frame[self.ypos][self.xpos] = self.color[self.i_colr.now]
+	def push(self, colr, lstr, lend, fstr):
+		if(self.xpos > MAX_HRES - 1):
+			self.xpos = MAX_HRES - 1
 
-				self.xpos += 1
-				if self.i_lend.now == 1:
-					self.ypos += 1
+		if(self.ypos > MAX_VRES - 1):
+			self.ypos = MAX_VRES - 1
 
-					if (self.frame_count == 2) or True:
-						self.im.set_data(self.frame)  # Update the image data
-						plt.draw()
-						plt.pause(0.00001)
+		if lstr == 1:
+			self.xpos = 0
+			if fstr == 1:
+				self.ypos = 0
+				self.frame_count += 1
 
-			if self.i_clk.now:
-				pass
+		self.frame[self.ypos, self.xpos] = colr
+
+		self.xpos += 1
+		if lend == 1:
+			self.ypos += 1
+
+			t = time.monotonic()
+			if t - self.t_pub >= self.period:
+				self.t_pub = t
+				self.publish()
+
+
+	def put_line(self, line, lnum, fcnt):
+		"""
+		Line sink for VicPassive.add_line_sink
+		"""
+		self.frame_count = fcnt
+		self.frame[lnum, :len(line)] = line
+
+		t = time.monotonic()
+		if t - self.t_pub >= self.period:
+			self.t_pub = t
+			self.publish()
+
+
+	def publish(self):
+		with self.lock:
+			np.copyto(self.front, self.frame)
+			self.fresh = True
+
+
+	def display(self, running):
+		"""
+		Refreshes the plot with the latest published frame while <running>()
+		returns True, then shows the final frame
+		"""
+		fig, ax = plt.subplots()
+		im = ax.imshow(to_rgb(self.front))
+		plt.axis('off')  # Optional: Hide axes for a cleaner look
+
+		while running():
+			if self.fresh:
+				with self.lock:
+					rgb = to_rgb(self.front)
+					self.fresh = False
+				im.set_data(rgb)
+				plt.draw()
+			plt.pause(self.period)
+
+		self.publish()
+		im.set_data(to_rgb(self.front))
+		plt.draw()
+		plt.pause(self.period)
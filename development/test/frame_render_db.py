@@ -0,0 +1,209 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+
+from   ezpath  import *
+from   ezhdl   import *
+from   vic_pkg import *
+
+import sqlite3
+
+import bus_logger as bl
+import numpy as np
+from   event_trace import MAX_ARGS
+
+MAX_HRES = 504
+MAX_VRES = 312
+
+# rows written between two commits
+COMMIT_ROWS = 32
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS pixels (
+	frame INTEGER,
+	y     INTEGER,
+	x     INTEGER,
+	colr  INTEGER,
+	PRIMARY KEY (frame, y, x)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sources (
+	src  INTEGER PRIMARY KEY,
+	name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS templates (
+	evt      INTEGER PRIMARY KEY,
+	src      INTEGER,
+	template TEXT
+);
+
+CREATE TABLE IF NOT EXISTS events (
+	frame INTEGER,
+	y     INTEGER,
+	x     INTEGER,
+	tick  INTEGER,
+	src   INTEGER,
+	evt   INTEGER,
+	reg   INTEGER,
+	{", ".join(f"a{i} INTEGER" for i in range(MAX_ARGS))},
+	text  TEXT
+);
+"""
+
+INSERT_EVENT = f"INSERT INTO events VALUES ({', '.join('?' * (8 + MAX_ARGS))})"
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS events_pixel ON events (frame, y, x);
+CREATE INDEX IF NOT EXISTS events_src   ON events (src, frame);
+CREATE INDEX IF NOT EXISTS events_reg   ON events (reg, frame);
+CREATE INDEX IF NOT EXISTS events_evt   ON events (evt, a0);
+"""
+
+
+class FrameRenderDb(Entity):
+	"""
+	Writes every pixel and the bus_logger events produced while drawing it
+	to an SQLite file, as an alternative to the xlsx analysis. Rows are
+	inserted when they complete on lend and committed in batches, indexes
+	are built by close(). Register writes have the register number in
+	"reg", every other event has the message arguments in a0..a5, e.g.:
+
+		-- every pixel where sprite 3 was displayed, a1 is the sprite
+		-- pixel value which is 0 where the sprite is transparent
+		SELECT frame, y, x FROM events JOIN templates USING (evt)
+		WHERE template LIKE '[SPRITES] Playing Sprite%' AND a0 = 3 AND a1 != 0;
+
+		-- all writes to register 32 in frame 2
+		SELECT y, x, text FROM events WHERE reg = 32 AND frame = 2;
+	"""
+	def __init__(self, path, trace=None):
+		self.i_clk  = Input(Wire())
+		self.i_rst  = Input(Wire())
+		self.i_push = Input(Wire())
+		self.i_lstr = Input(Wire())
+		self.i_lend = Input(Wire())
+		self.i_fstr = Input(Wire())
+		self.i_colr = Input(t_vic_colr)
+
+		self.xpos  = 0
+		self.ypos  = 0
+		self.fnum  = -1
+
+		# without an attached EventTrace only the pixels are stored
+		self.trace = trace
+
+		self.row     = []  # palette indices of the row being drawn
+		self.pending = 0   # rows inserted since the last commit
+		self.nevt    = 0   # templates already stored
+
+		self.db = sqlite3.connect(path)
+		self.db.execute("PRAGMA synchronous = OFF")
+		self.db.executescript(SCHEMA)
+		self.db.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?)",
+		                    [(src, tag) for tag, src in bl.TAGS.items()])
+
+
+	def _run(self):
+		if self.i_clk.negedge():
+			if self.i_push.now == 1:
+				self.push(self.i_colr.now.dump, self.i_lstr.now, self.i_lend.now, self.i_fstr.now)
+
+
+	def push(self, colr, lstr, lend, fstr):
+		if lstr == 1:
+			self.flush()
+			self.xpos = 0
+			if fstr == 1:
+				self.ypos  = 0
+				self.fnum += 1
+			else:
+				self.ypos += 1
+		else:
+			self.xpos += 1
+
+		if self.trace is not None:
+			self.trace.mark(self.fnum, self.ypos, self.xpos)
+		self.row.append(colr)
+
+		if lend == 1:
+			self.flush()
+
+
+	def flush(self):
+		row, self.row = self.row, []
+
+		# pixels pushed before the first frame start belong to no frame
+		if self.fnum >= 0 and row:
+			self.write(row)
+
+		if self.trace is not None:
+			self.trace.release(self.fnum, self.ypos)
+
+
+	def write(self, row):
+		fnum, ypos = self.fnum, self.ypos
+		self.db.executemany("INSERT OR REPLACE INTO pixels VALUES (?, ?, ?, ?)",
+		                    [(fnum, ypos, x, c) for x, c in enumerate(row[:MAX_HRES])])
+
+		# records of the row are contiguous, the pixel of each one follows
+		# from the lengths of the per-pixel ranges
+		span  = self.trace.spans(fnum, ypos) if self.trace is not None else None
+		if span is not None:
+			span = span[:len(row)]
+		if span is not None and span[-1, 1] > span[0, 0]:
+			self.templates()
+			rec  = self.trace.records(int(span[0, 0]), int(span[-1, 1]))
+			xpos = np.repeat(np.arange(len(span)), span[:, 1] - span[:, 0])
+			self.db.executemany(INSERT_EVENT,
+			                    [self.event(fnum, ypos, x, r) for x, r in zip(xpos.tolist(), rec)])
+
+		self.pending += 1
+		if self.pending >= COMMIT_ROWS:
+			self.db.commit()
+			self.pending = 0
+
+
+	def templates(self):
+		new = self.trace.templates[self.nevt:]
+		self.db.executemany("INSERT OR REPLACE INTO templates VALUES (?, ?, ?)",
+		                    [(self.nevt + i, self.trace.sources[self.nevt + i], getattr(t, "__name__", t))
+		                     for i, t in enumerate(new)])
+		self.nevt += len(new)
+
+
+	def event(self, fnum, ypos, xpos, r):
+		evt  = int(r["evt"])
+		args = r["args"].tolist()
+		reg  = args[0] if self.trace.templates[evt] is bl.reg_write_text else None
+		return (fnum, ypos, xpos, int(r["tick"]), int(r["src"]), evt, reg,
+		        *args, self.trace.render(r))
+
+
+	def close(self):
+		print("Indexing pixel database")
+		self.flush()
+		self.db.executescript(INDEXES)
+		self.db.commit()
+		self.db.close()
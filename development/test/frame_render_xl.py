@@ -30,13 +30,26 @@ from   vic_pkg import *
 import bus_logger as bl
 import numpy as np
 import openpyxl as xl
-from   openpyxl.styles import PatternFill, Alignment, Font
+from   openpyxl.styles import NamedStyle, PatternFill, Alignment, Font
+from   openpyxl.cell   import WriteOnlyCell
+from   openpyxl.utils  import get_column_letter
+from   openpyxl.worksheet.dimensions import SheetFormatProperties
 
 MAX_HRES = 504
 MAX_VRES = 312
 
+CELL_SIZE = 12
+
+# rows whose cells carry the text of their events
+EVENT_ROWS = range(50, 251)
+
 class FrameRenderXl(Entity):
-	def __init__(self):
+	"""
+	Streams every frame to its own sheet of a write-only workbook. A row is
+	appended as soon as it completes on lend, so memory does not grow with
+	the number of pixels, the file is only assembled by save()
+	"""
+	def __init__(self, trace=None):
 		self.i_clk  = Input(Wire())
 		self.i_rst  = Input(Wire())
 		self.i_push = Input(Wire())
@@ -47,10 +60,16 @@ class FrameRenderXl(Entity):
 
 		self.xpos  = 0
 		self.ypos  = 0
+		self.fnum  = -1
+
+		# events of an attached EventTrace are only turned into text when a
+		# row is written, without one the cells carry no text
+		self.trace = trace
 
-		self.wb = xl.Workbook()
-		self.sh = self.wb.active
-		self.sh.title = "Frame Dump"
+		self.wb   = xl.Workbook(write_only=True)
+		self.sh   = None
+		self.row  = []  # palette indices of the row being drawn
+		self.rows = 0   # rows appended to the current sheet
 
 		self.color = [
 			"010101", # black
@@ -90,51 +109,91 @@ class FrameRenderXl(Entity):
 			"010101"  # light grey
 		]
 
+		# one shared style per palette entry
+		self.style = []
+		for i in range(len(self.color)):
+			style = NamedStyle(name=f"pixel_{i}")
+			style.font = Font(name="Consolas", color=self.color_txt[i], bold=True)
+			style.fill = PatternFill(start_color=self.color[i], end_color=self.color[i], fill_type='solid')
+			style.alignment = Alignment(horizontal="left", vertical="top")
+			self.wb.add_named_style(style)
+			self.style.append(style.name)
+
+
 	def _run(self):
 		if self.i_clk.negedge():
 			if self.i_push.now == 1:
-#				if(self.xpos > MAX_HRES - 1):
-#					self.xpos = MAX_HRES - 1
-#
-#				if(self.ypos > MAX_VRES - 1):
-#					self.ypos = MAX_VRES - 1
-
-				if self.i_lstr.now == 1:
-					self.xpos = 0
-					if self.i_fstr.now == 1:
-						self.ypos = 0
-					else:
-						self.ypos += 1
-				else:
-					self.xpos += 1
-
-				color = self.color[self.i_colr.now]
-				color_txt = self.color_txt[self.i_colr.now]
-				font = Font(name="Consolas", color=color_txt, bold=True)
-				fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
-				alignment = Alignment(horizontal="left", vertical="top")
-
-				if (self.ypos >= 50) and (self.ypos <= 250):
-					self.sh.cell(row=self.ypos+1, column=self.xpos+1, value= "     \n" + "\n".join(bl.log))
-				self.sh.cell(row=self.ypos+1, column=self.xpos+1).fill = fill
-				self.sh.cell(row=self.ypos+1, column=self.xpos+1).font = font
-				self.sh.cell(row=self.ypos+1, column=self.xpos+1).alignment = alignment
-				bl.clear()
+				self.push(self.i_colr.now, self.i_lstr.now, self.i_lend.now, self.i_fstr.now)
 
 
-	def save(self, path):
-		cell_size = 12
-		print("Saving excel dump")
+	def push(self, colr, lstr, lend, fstr):
+		if lstr == 1:
+			# a row that never saw its lend is written as it is
+			self.flush()
+			self.xpos = 0
+			if fstr == 1:
+				self.ypos  = 0
+				self.fnum += 1
+				self.new_sheet()
+			else:
+				self.ypos += 1
+		else:
+			self.xpos += 1
+
+		if self.trace is not None:
+			self.trace.mark(self.fnum, self.ypos, self.xpos)
+		self.row.append(colr)
+
+		if lend == 1:
+			self.flush()
+
+
+	def new_sheet(self):
+		self.sh = self.wb.create_sheet(f"Frame {self.fnum}")
+		self.sh.sheet_format = SheetFormatProperties(defaultRowHeight=CELL_SIZE, customHeight=True)
+		for x in range(MAX_HRES):
+			self.sh.column_dimensions[get_column_letter(x + 1)].width = CELL_SIZE / 5  # Rough estimation of character width
+		self.rows = 0
+
 
-		# Adjusting cell width
-		for col in self.sh.columns:
-			for cell in col:
-				self.sh.column_dimensions[cell.column_letter].width = cell_size / 5  # Rough estimation of character width
+	def flush(self):
+		row, self.row = self.row, []
 
-		# Adjusting cell height
-		for row in self.sh.rows:
-			for cell in row:
-				self.sh.row_dimensions[cell.row].height = cell_size  # Set height in pixels
+		# pixels pushed before the first frame start have no sheet
+		if self.sh is not None and row and self.ypos >= self.rows:
+			self.write(row)
 
-		print("Finalizing")
+		if self.trace is not None:
+			self.trace.release(self.fnum, self.ypos)
+
+
+	def write(self, row):
+		while self.rows < self.ypos:
+			self.sh.append([])
+			self.rows += 1
+
+		# pixels of this row that produced at least one record
+		busy = ()
+		span = self.trace.spans(self.fnum, self.ypos) if self.trace is not None else None
+		if self.ypos in EVENT_ROWS and span is not None:
+			busy = (span[:, 1] > span[:, 0]).tolist()
+
+		cells = []
+		for xpos, colr in enumerate(row[:MAX_HRES]):
+			cell = WriteOnlyCell(self.sh, value=self.events(xpos) if busy and busy[xpos] else None)
+			cell.style = self.style[colr]
+			cells.append(cell)
+
+		self.sh.append(cells)
+		self.rows += 1
+
+
+	def events(self, xpos):
+		lines = self.trace.lines(self.fnum, self.ypos, xpos)
+		return "     \n" + "\n".join(lines)
+
+
+	def save(self, path):
+		print("Saving excel dump")
+		self.flush()
 		self.wb.save(get_abs_path(path))
@@ -0,0 +1,210 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+
+from   ezpath  import *
+from   ezhdl   import *
+from   vic_pkg import *
+
+import zlib
+import struct
+
+import numpy as np
+
+MAX_HRES = 504
+MAX_VRES = 312
+
+# palette index of pixels that were never drawn, rendered as mid grey
+BLANK = 16
+
+PALETTE = np.array([
+	[0x00, 0x00, 0x00], # black
+	[0xff, 0xff, 0xff], # white
+	[0x9f, 0x4e, 0x44], # red
+	[0x6a, 0xbf, 0xc6], # cyan
+	[0xa0, 0x57, 0xa3], # purple
+	[0x5c, 0xab, 0x5e], # green
+	[0x50, 0x45, 0x9b], # blue
+	[0xc9, 0xd4, 0x87], # yellow
+	[0xa1, 0x68, 0x3c], # orange
+	[0x6d, 0x54, 0x12], # brown
+	[0xcb, 0x7e, 0x75], # pink
+	[0x62, 0x62, 0x62], # dark grey
+	[0x89, 0x89, 0x89], # grey
+	[0x9a, 0xe2, 0x9b], # light green
+	[0x88, 0x7e, 0xcb], # light blue
+	[0xad, 0xad, 0xad], # light grey
+	[0x7f, 0x7f, 0x7f]  # blank
+], dtype=np.uint8)
+
+
+def to_rgb(frame):
+	"""
+	Converts a frame of palette indices into a (h, w, 3) uint8 RGB image
+	"""
+	return PALETTE[frame]
+
+
+def _png_chunk(tag, data):
+	crc = zlib.crc32(tag + data)
+	return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+def write_png(path, frame):
+	"""
+	Writes a frame of palette indices as an 8-bit indexed-color PNG
+	"""
+	h, w = frame.shape
+	rows = np.zeros((h, w + 1), dtype=np.uint8) # filter byte 0 on every row
+	rows[:, 1:] = frame
+
+	with open(path, "wb") as f:
+		f.write(b"\x89PNG\r\n\x1a\n")
+		f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 3, 0, 0, 0)))
+		f.write(_png_chunk(b"PLTE", PALETTE.tobytes()))
+		f.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+		f.write(_png_chunk(b"IEND", b""))
+
+
+def read_raw(path):
+	"""
+	Maps a raw stream written by FrameSink as a (frames, h, w) array
+	"""
+	return np.memmap(path, dtype=np.uint8, mode="r").reshape(-1, MAX_VRES, MAX_HRES)
+
+
+class FrameSink(Entity):
+	"""
+	Headless replacement for FrameRender. Every completed frame is written
+	as an indexed PNG (<path> is formatted with the frame number) or, with
+	<raw> set, appended to a stream of MAX_VRES x MAX_HRES palette indices.
+	Without a <path> frames are kept in the "frames" list. A frame is
+	complete when the next one starts, close() flushes the last one only if
+	it has all <height> lines, the visible lines of t_vic_specs_h63 by
+	default, otherwise it is dropped and "partial" is set. Pixels come either through the inputs or, line by
+	line, through put_line
+	"""
+	def __init__(self, path, raw=False, height=None):
+		self.i_clk  = Input(Wire())
+		self.i_rst  = Input(Wire())
+		self.i_push = Input(Wire())
+		self.i_lstr = Input(Wire())
+		self.i_lend = Input(Wire())
+		self.i_fstr = Input(Wire())
+		self.i_colr = Input(t_vic_colr)
+
+		self.path   = path
+		self.raw    = raw
+		self.file   = None
+		self.frames = []
+
+		self.xpos  = 0
+		self.ypos  = 0
+		self.frame = np.full((MAX_VRES, MAX_HRES), BLANK, dtype=np.uint8)
+		self.dirty = False
+		self.lines = 0
+
+		self.height  = height or (t_vic_specs_h63.yend - t_vic_specs_h63.ynul)
+		self.partial = False
+
+		self.frame_count = 0
+		self.written     = 0
+
+
+	def _run(self):
+		if self.i_clk.posedge():
+			if self.i_push.now == 1:
+				self.push(self.i_colr.now, self.i_lstr.now, self.i_lend.now, self.i_fstr.now)
+
+
+	def push(self, colr, lstr, lend, fstr):
+		if(self.xpos > MAX_HRES - 1):
+			self.xpos = MAX_HRES - 1
+
+		if(self.ypos > MAX_VRES - 1):
+			self.ypos = MAX_VRES - 1
+
+		if lstr == 1:
+			self.xpos = 0
+			if fstr == 1:
+				self.emit()
+				self.ypos = 0
+				self.frame_count += 1
+
+		self.frame[self.ypos, self.xpos] = colr
+		self.dirty = True
+
+		self.xpos += 1
+		if lend == 1:
+			self.ypos  += 1
+			self.lines += 1
+
+
+	def put_line(self, line, lnum, fcnt):
+		"""
+		Line sink for VicPassive.add_line_sink
+		"""
+		if fcnt != self.frame_count:
+			self.emit()
+			self.frame_count = fcnt
+
+		self.frame[lnum, :len(line)] = line
+		self.dirty  = True
+		self.lines += 1
+
+
+	def emit(self):
+		# pixels pushed before the first frame start belong to no frame
+		if not (self.dirty and self.frame_count):
+			self.reset_frame()
+			return
+
+		if self.path is None:
+			self.frames.append(self.frame.copy())
+		elif self.raw:
+			if self.file is None:
+				self.file = open(self.path, "wb")
+			self.file.write(self.frame.tobytes())
+		else:
+			write_png(self.path.format(self.written), self.frame)
+
+		self.written += 1
+		self.reset_frame()
+
+
+	def reset_frame(self):
+		self.frame.fill(BLANK)
+		self.dirty = False
+		self.lines = 0
+
+
+	def close(self):
+		if self.dirty and self.frame_count:
+			if self.lines >= self.height:
+				self.emit()
+			else:
+				self.partial = True
+		if self.file is not None:
+			self.file.close()
+			self.file = None
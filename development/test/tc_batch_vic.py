@@ -0,0 +1,86 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks batch_vic against a serial run: the reference capture is             #
+#  repeated LOOPS times into one long capture, which is rendered once by a     #
+#  single engine and once cut into segments of SEGMENT_FRAMES frames by the    #
+#  workers. Both must give the same frames, and every seam must be verified    #
+#  as identical. Uses VicPassive, VicFast with --fast.                         #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from capture   import open_capture, write_header
+from registers import REGS_INIT
+from vic_ref   import *
+
+import batch_vic as bv
+
+input_path = get_abs_path("input/frame_dump.txt")
+loop_path  = get_abs_path("output/batch_loop.cap")
+
+LOOPS          = 6
+SEGMENT_FRAMES = 2
+
+
+if __name__ == "__main__":
+	fast  = "--fast" in sys.argv
+
+	if fast:
+		warn_stand_in()
+	words = open_capture(input_path).words
+
+	with open(loop_path, "wb") as f:
+		write_header(f, LOOPS * len(words))
+		for i in range(LOOPS):
+			f.write(words.tobytes())
+
+	words = open_capture(loop_path).words
+	run   = bv.run_fast if fast else bv.run_hdl
+	starts, serial = run(words, 0, len(words), len(words), REGS_INIT)
+
+	tiled, seams = bv.render_capture(loop_path, segment_frames=SEGMENT_FRAMES, fast=fast)
+
+	count  = min(len(serial), len(tiled))
+	failed = sum(int((a != b).sum()) for a, b in zip(serial, tiled))
+
+	print(f"frames         = {len(serial)}, {len(tiled)}")
+	print(f"mismatches     = {failed}")
+	print(f"seams          = {seams}")
+
+	if failed or (len(serial) != len(tiled)) or not count:
+		print("FAIL")
+		sys.exit(1)
+	if not seams or any(ok is not True for j, ok in seams):
+		print("FAIL: not every seam was verified")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,108 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the bus_logger ring buffer: entries beyond the depth drop the oldest #
+#  ones and are counted in overflow, templates are only formatted when read,   #
+#  and the pixel and register triggers append snapshots of the last entries.   #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+import bus_logger as bl
+
+DEPTH = 16
+
+
+class Counted:
+	"""
+	Message template counting how often it is formatted
+	"""
+	calls = 0
+
+	def __call__(self, n):
+		Counted.calls += 1
+		return f"[SYNC] counted {n}"
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	bl.set_depth(DEPTH)
+	bl.clear()
+	bl.overflow = 0
+
+	for i in range(DEPTH):
+		bl.add("[SYNC] CYCLE = {}", i)
+	passed = check("no overflow when full", (bl.overflow == 0) and (len(bl.log) == DEPTH))
+
+	for i in range(DEPTH, DEPTH + 5):
+		bl.add("[SYNC] CYCLE = {}", i)
+	bl.add(["[SYNC] a", "[SYNC] b"])
+	passed &= check("overflow counted", bl.overflow == 7)
+	passed &= check("oldest entries dropped", bl.lines(3) == ["[SYNC] CYCLE = 20", "[SYNC] a", "[SYNC] b"])
+	passed &= check("whole log rendered", bl.lines()[0] == "[SYNC] CYCLE = 7" and len(bl.lines()) == DEPTH)
+
+	template = bl.formatter(bl.SYNC)(Counted())
+	bl.add(template, 1)
+	passed &= check("formatting is deferred", Counted.calls == 0)
+	passed &= check("formatted when read", (bl.lines(1) == ["[SYNC] counted 1"]) and (Counted.calls == 1))
+	passed &= check("template category", (bl.source_of(template) == bl.SYNC) and (bl.source_of("[BORDER] x") == bl.BORDER))
+
+	# triggers
+	bl.trig_depth = 2
+	bl.trig_pixel = {(10, 20)}
+	bl.trig_reg   = {32}
+	bl.snapshots.clear()
+
+	bl.add("[BORDER] before")
+	bl.on_pixel(11, 20)
+	bl.on_reg_write(33)
+	passed &= check("no snapshot off trigger", bl.snapshots == [])
+
+	bl.on_pixel(10, 20)
+	bl.add("[REGISTER] after")
+	bl.on_reg_write(32)
+	passed &= check("pixel snapshot", bl.snapshots[0] == ("pixel 10, 20", ["[SYNC] counted 1", "[BORDER] before"]))
+	passed &= check("register snapshot", bl.snapshots[1] == ("register 32 write", ["[BORDER] before", "[REGISTER] after"]))
+	passed &= check("overflow keeps counting", bl.overflow == 10)
+
+	# a smaller depth keeps the newest entries
+	bl.set_depth(2)
+	passed &= check("depth change keeps newest", bl.lines() == ["[BORDER] before", "[REGISTER] after"])
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
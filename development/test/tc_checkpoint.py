@@ -0,0 +1,206 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checkpoint round trip on both engines: the capture is run twice from a      #
+#  reset while a checkpoint is written at the start of frame SAVE_AT, then a    #
+#  second run resumes from that file. The frames of the resumed run must be    #
+#  identical to the last frames of the uninterrupted one.                      #
+#  --fast-only runs the VicFast half alone.                                    #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from ezhdl       import *
+from vic_passive import *
+from vic_fast    import *
+from frame_sink  import *
+from capture     import open_capture
+from bus_decode  import decode_blocks
+
+import checkpoint
+
+input_path = get_abs_path("input/frame_dump.txt")
+state_path = get_abs_path("output/tc_checkpoint.vst")
+
+PASSES  = 2
+SAVE_AT = 1
+
+FAST_ONLY = "--fast-only" in sys.argv
+
+
+def segments(nsamples, offset):
+	"""
+	(lo, hi) sample ranges of PASSES runs through the capture, from the
+	sample <offset> counted across all of them
+	"""
+	first = offset // nsamples
+	return [(offset % nsamples, nsamples)] + [(0, nsamples)] * (PASSES - 1 - first)
+
+
+class CheckpointTest(Entity):
+	"""
+	Runs the capture through a VicPassive from a reset, writing the state at
+	the start of frame SAVE_AT, or from the checkpoint <ckpt>
+	"""
+	def __init__(self, capture, ckpt=None):
+		self.capture = capture
+		self.ckpt    = ckpt
+
+		self.dut    = VicPassive()
+		self.sink   = FrameSink(None)
+		self.clkgen = ClockGen(16.0e6)
+
+		if ckpt is not None:
+			self.dut.restore(ckpt.state)
+
+		self.clk = Signal(Wire())
+		self.rst = Signal(Wire())
+
+		self.clk        <<= self.clkgen.clk
+		self.dut.i_clk  <<= self.clk
+		self.dut.i_rst  <<= self.rst
+
+		self.dut.add_line_sink(self.sink.put_line)
+
+	@procedure
+	def _run(self):
+		# a restored state continues without a reset
+		words = self.capture.words
+		if self.ckpt is None:
+			yield from posedge(self.clk)
+			self.rst.nxt <<= 1
+
+			yield from posedge(self.clk)
+			self.rst.nxt <<= 0
+			offset = 0
+		else:
+			offset = self.ckpt.offset
+
+		line_out = self.dut.e_line_out
+		fcnt     = line_out.fcnt
+		fnum     = -1
+		for lo, hi in segments(len(words), offset):
+			for bus in decode_blocks(words[:hi], start=lo):
+				for ph0, db, a, rw, cs, aec in bus.rows():
+					yield from posedge(self.clk)
+
+					# no pixel is pending when a frame has just started
+					if line_out.fcnt != fcnt:
+						fcnt  = line_out.fcnt
+						fnum += 1
+						if self.ckpt is None and fnum == SAVE_AT:
+							checkpoint.save(state_path, self.dut, offset, fnum)
+
+					self.dut.i_ph0.nxt <<= ph0
+					self.dut.i_db .nxt <<= db
+					self.dut.i_a  .nxt <<= a
+					self.dut.i_rw .nxt <<= rw
+					self.dut.i_cs .nxt <<= cs
+					self.dut.i_aec.nxt <<= aec
+					offset += 1
+
+		yield from posedge(self.clk)
+		self.dut.flush_lines()
+		SimpleSim.stop()
+
+
+def run_hdl(capture, ckpt=None):
+	testcase = CheckpointTest(capture, ckpt)
+	SimpleSim.run(testcase)
+	testcase.sink.close()
+	return testcase.sink.frames
+
+
+def run_fast(capture, ckpt=None):
+	"""
+	Same as CheckpointTest on VicFast, which is checkpointed after the
+	cycle that starts frame SAVE_AT, together with the pixels it pushed
+	from the frame start onwards
+	"""
+	engine = VicFast()
+	sink   = FrameSink(None)
+
+	def push(colr, flag):
+		sink.push(colr, int(bool(flag & PIX_LSTR)), int(bool(flag & PIX_LEND)), int(bool(flag & PIX_FSTR)))
+
+	if ckpt is None:
+		engine.reset()
+		offset = 0
+	else:
+		engine.restore(ckpt.state)
+		offset = ckpt.offset
+		for colr, flag in ckpt.pending:
+			push(colr, flag)
+
+	words = capture.words
+	fnum  = -1
+	for lo, hi in segments(len(words), offset):
+		for bus in decode_blocks(words[:hi], start=lo):
+			for n in engine.run(bus):
+				offset += 16
+				fstr = None
+				for i in range(n):
+					flag = engine.o_flag[i]
+					if (flag & PIX_FSTR) and (flag & PIX_LSTR):
+						fnum += 1
+						fstr  = i
+					push(engine.o_colr[i], flag)
+
+				if ckpt is None and fstr is not None and fnum == SAVE_AT:
+					pending = [(engine.o_colr[i], engine.o_flag[i]) for i in range(fstr, n)]
+					checkpoint.save(state_path, engine, offset, fnum, pending)
+
+	sink.close()
+	return sink.frames
+
+
+def round_trip(name, run, capture):
+	full    = run(capture)
+	resumed = run(capture, checkpoint.load(state_path))
+
+	tail = full[len(full) - len(resumed):]
+	ok   = bool(resumed) and all((a == b).all() for a, b in zip(resumed, tail))
+	print(f"{name:<8} frames = {len(full)}, resumed = {len(resumed)}, {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	capture = open_capture(input_path)
+
+	passed = round_trip("VicFast", run_fast, capture)
+	if not FAST_ONLY:
+		passed &= round_trip("VicPassive", run_hdl, capture)
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,106 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the decimated capture format: the reference capture must decimate    #
+#  without flags, expand must rebuild a stream that decimates to the same      #
+#  records and drives VicFast to the same pixels as the original samples, and  #
+#  corrupted samples must be flagged.                                          #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from vic_fast   import *
+from decimate   import *
+from capture    import open_capture
+from bus_decode import decode_blocks
+
+import numpy as np
+
+input_path = get_abs_path("input/frame_dump.txt")
+
+# bit position of db in a sample word, see expand
+DB_SHIFT = 9
+
+FIELDS = ("a2", "a10", "ctl", "db7", "db13", "db14", "db15")
+
+
+def pixels(words):
+	engine = VicFast()
+	engine.reset()
+	out = []
+	for bus in decode_blocks(words):
+		for n in engine.run(bus):
+			out.extend(zip(engine.o_colr[:n], engine.o_flag[:n]))
+	return out
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	words = np.asarray(open_capture(input_path).words)
+	rec, starts = decimate(words)
+	print(f"cycles         = {len(rec)}")
+
+	passed = check("reference is lossless", is_lossless(rec))
+
+	# the first expanded cycle has no falling edge before it
+	again, _ = decimate(expand(rec))
+	passed &= check("expand round trip", all((again[f] == rec[f][1:]).all() for f in FIELDS))
+	passed &= check("round trip is lossless", is_lossless(again))
+
+	span = pixels(words[starts[0]:starts[-1] + 16])
+	passed &= check("same pixels as the capture", bool(span) and (span == pixels(expand(rec))))
+
+	# a data bus glitch inside the hold window of the g-access
+	bad = words.copy()
+	bad[starts[100] + 5] ^= 1 << DB_SHIFT
+	bad_rec = decimate(bad)[0]
+	passed &= check("skew flagged", (bad_rec["flags"][100] == FLAG_SKEW) and not is_lossless(bad_rec))
+	passed &= check("only that cycle flagged", np.count_nonzero(bad_rec["flags"]) == 1)
+
+	# the same glitch while the bus turns around is not seen by the emulator
+	bad = words.copy()
+	bad[starts[100] + 1] ^= 1 << DB_SHIFT
+	passed &= check("turnaround not flagged", is_lossless(decimate(bad)[0]))
+
+	# a missing sample shortens a cycle
+	bad = np.delete(words, starts[100] + 3)
+	flags = decimate(bad)[0]["flags"]
+	passed &= check("phase flagged", bool(flags[100] & FLAG_PHASE))
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
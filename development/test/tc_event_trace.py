@@ -0,0 +1,96 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the event trace: bus_logger entries become typed records, marks      #
+#  index them by pixel, released rows drop their index and records while the   #
+#  absolute positions of the remaining rows stay valid, and the trace grows    #
+#  past its initial capacity.                                                  #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+import bus_logger as bl
+import event_trace
+
+CAPACITY = 4
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+def draw_row(trace, frame, ypos, width):
+	# two entries per pixel, one with arguments and one continuation line
+	for x in range(width):
+		bl.add("[SYNC] pixel {} {}", ypos, x)
+		bl.add(["    more"])
+		trace.mark(frame, ypos, x)
+
+
+if __name__ == "__main__":
+	trace = event_trace.attach(event_trace.EventTrace(CAPACITY), bl.SYNC)
+
+	draw_row(trace, 0, 0, 4)
+	draw_row(trace, 0, 1, 4)
+	passed = check("grows past capacity", trace.count == 16)
+	passed &= check("pixel lines", trace.lines(0, 1, 2) == ["[SYNC] pixel 1 2", "    more"])
+	passed &= check("pixel range", trace.range(0, 1, 2) == (12, 14))
+	passed &= check("continuation category", list(trace.events(0, 0, 3, bl.SYNC)["src"]) == [bl.SYNC, bl.SYNC])
+	passed &= check("category filter", len(trace.events(0, 0, 3, bl.BORDER)) == 0)
+	passed &= check("find by template", len(trace.find("[SYNC] pixel {} {}")) == 8)
+	passed &= check("bus_logger log unused", len(bl.log) == 0)
+
+	trace.release(0, 0)
+	passed &= check("released row dropped", (trace.spans(0, 0) is None) and (trace.range(0, 0, 1) == (0, 0)))
+	passed &= check("records compacted", (trace.base == 8) and (trace.count == 8))
+	passed &= check("positions stay absolute", trace.range(0, 1, 2) == (12, 14))
+	passed &= check("lines after release", trace.lines(0, 1, 2) == ["[SYNC] pixel 1 2", "    more"])
+	passed &= check("released records gone", len(trace.records(0, 8)) == 0)
+
+	draw_row(trace, 1, 0, 2)
+	trace.release(0)
+	passed &= check("frame release", (trace.spans(0, 1) is None) and (trace.base == 16) and (trace.count == 4))
+	passed &= check("next frame kept", trace.lines(1, 0, 1) == ["[SYNC] pixel 0 1", "    more"])
+
+	trace.clear()
+	passed &= check("clear", (trace.count == 0) and (trace.base == 20) and (trace.spans(1, 0) is None))
+
+	event_trace.detach()
+	bl.clear()
+	bl.add("[SYNC] not traced")
+	passed &= check("detach", (bl.trace is None) and (trace.count == 0) and (len(bl.log) == 1))
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
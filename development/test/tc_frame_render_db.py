@@ -0,0 +1,109 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Writes a few frames with events to the pixel database of FrameRenderDb and  #
+#  reads them back: every pixel, the events at their pixels with arguments,    #
+#  register number and text, and the templates and sources they refer to.      #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from frame_render_db import *
+
+import bus_logger as bl
+import event_trace
+import os
+import sqlite3
+
+import numpy as np
+
+db_path = get_abs_path("output/tc_frame_render_db.db")
+
+WIDTH  = 5
+HEIGHT = 3
+FRAMES = 3
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	if os.path.exists(db_path):
+		os.remove(db_path)
+
+	rng    = np.random.default_rng(3)
+	frames = [rng.integers(0, 16, (HEIGHT, WIDTH)) for _ in range(FRAMES)]
+
+	trace  = event_trace.attach(mask=bl.SYNC | bl.REGISTER)
+	render = FrameRenderDb(db_path, trace)
+
+	for fnum, frame in enumerate(frames):
+		for y in range(HEIGHT):
+			for x in range(WIDTH):
+				if x == y:
+					bl.add("[SYNC] pixel {} {}", y, x)
+				if (y, x) == (1, 3):
+					bl.add(bl.reg_write_text, 32, fnum, 0, 0, 0)
+				render.push(int(frame[y, x]), int(x == 0), int(x == WIDTH - 1), int(x == 0 and y == 0))
+
+	render.close()
+	event_trace.detach()
+
+	db = sqlite3.connect(db_path)
+
+	pixels = np.full((FRAMES, HEIGHT, WIDTH), -1)
+	for f, y, x, c in db.execute("SELECT frame, y, x, colr FROM pixels"):
+		pixels[f, y, x] = c
+	passed = check("pixels", (pixels == np.array(frames)).all())
+
+	rows = db.execute("SELECT frame, y, x, a0, a1 FROM events JOIN templates USING (evt) "
+	                  "WHERE template = '[SYNC] pixel {} {}' ORDER BY frame, y").fetchall()
+	want = [(f, n, n, n, n) for f in range(FRAMES) for n in range(HEIGHT)]
+	passed &= check("events at their pixel", rows == want)
+
+	rows = db.execute("SELECT frame, y, x, a1, text FROM events WHERE reg = 32 ORDER BY frame").fetchall()
+	want = [(f, 1, 3, f, bl.reg_write_text(32, f, 0, 0, 0)) for f in range(FRAMES)]
+	passed &= check("register writes", rows == want)
+
+	rows = db.execute("SELECT name FROM events JOIN sources USING (src) GROUP BY name ORDER BY name").fetchall()
+	passed &= check("event sources", rows == [("[REGISTER]",), ("[SYNC]",)])
+
+	indexes = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+	passed &= check("indexes built", {"events_pixel", "events_reg"} <= indexes)
+	db.close()
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,103 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the xlsx export of FrameRenderXl: every frame gets its own sheet,    #
+#  cells carry the fill of their palette entry, pixels inside EVENT_ROWS       #
+#  carry the text of their trace events, and written rows release theirs.      #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from frame_render_xl import *
+
+import bus_logger as bl
+import event_trace
+
+import numpy as np
+import openpyxl as xl
+
+WIDTH  = 4
+HEIGHT = EVENT_ROWS.start + 2
+EVENT  = (EVENT_ROWS.start + 1, 2)
+
+xlsx_path = "output/tc_frame_render_xl.xlsx"
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	rng    = np.random.default_rng(11)
+	frames = [rng.integers(0, 16, (HEIGHT, WIDTH)) for _ in range(2)]
+
+	trace  = event_trace.attach(mask=bl.SYNC)
+	render = FrameRenderXl(trace)
+
+	left = []
+	for fnum, frame in enumerate(frames):
+		for y in range(HEIGHT):
+			for x in range(WIDTH):
+				if (y, x) == EVENT:
+					bl.add("[SYNC] event {}", fnum)
+				# an event outside EVENT_ROWS is released without text
+				if (y, x) == (0, 1):
+					bl.add("[SYNC] hidden")
+				render.push(int(frame[y, x]), int(x == 0), int(x == WIDTH - 1), int(x == 0 and y == 0))
+		left.append(trace.count)
+
+	render.save(xlsx_path)
+	event_trace.detach()
+
+	wb = xl.load_workbook(get_abs_path(xlsx_path))
+	passed = check("sheet per frame", wb.sheetnames == [f"Frame {n}" for n in range(len(frames))])
+
+	fills = True
+	texts = True
+	for fnum, frame in enumerate(frames):
+		sh = wb[f"Frame {fnum}"]
+		for y in range(HEIGHT):
+			for x in range(WIDTH):
+				cell = sh.cell(row=y + 1, column=x + 1)
+				fills &= cell.fill.start_color.rgb[-6:] == render.color[frame[y, x]]
+				want  = f"     \n[SYNC] event {fnum}" if (y, x) == EVENT else None
+				texts &= cell.value == want
+	passed &= check("pixel fills", fills)
+	passed &= check("event text", texts)
+
+	passed &= check("rows release events", left == [0, 0] and trace.count == 0)
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,159 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the FrameSink output on small synthetic frames: every emitted frame  #
+#  starts blank, the incomplete last frame is dropped on close, and the PNG,   #
+#  raw and put_line paths all produce the same frames.                         #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from frame_sink import *
+
+import os
+import zlib
+import tempfile
+
+import numpy as np
+
+WIDTH  = 6
+HEIGHT = 4
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+def make_frames():
+	# frame 1 only draws the left half of its lines, so stale pixels of
+	# frame 0 would show
+	rng    = np.random.default_rng(7)
+	frames = [rng.integers(0, 16, (HEIGHT, WIDTH), dtype=np.uint8) for _ in range(3)]
+	return frames, [WIDTH, WIDTH // 2, WIDTH]
+
+
+def push_frames(sink, frames, widths, last_lines, end=True):
+	# a few pixels before the first frame start belong to no frame
+	for x in range(3):
+		sink.push(5, int(x == 0), 0, 0)
+
+	for n, (frame, width) in enumerate(zip(frames, widths)):
+		height = last_lines if n == len(frames) - 1 else HEIGHT
+		for y in range(height):
+			for x in range(width):
+				sink.push(frame[y, x], int(x == 0), int(x == width - 1), int(x == 0 and y == 0))
+
+	# next frame start, the single pixel of the frame after it
+	if end:
+		sink.push(0, 1, 0, 1)
+
+
+def expected(frames, widths):
+	ret = []
+	for frame, width in zip(frames, widths):
+		full = np.full((MAX_VRES, MAX_HRES), BLANK, dtype=np.uint8)
+		full[:HEIGHT, :width] = frame[:, :width]
+		ret.append(full)
+	return ret
+
+
+def read_png(path):
+	with open(path, "rb") as f:
+		data = f.read()
+	pos = 8
+	idat = b""
+	while pos < len(data):
+		size = int.from_bytes(data[pos:pos + 4], "big")
+		tag  = data[pos + 4:pos + 8]
+		if tag == b"IDAT":
+			idat += data[pos + 8:pos + 8 + size]
+		pos += size + 12
+	rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8)
+	return rows.reshape(MAX_VRES, MAX_HRES + 1)[:, 1:]
+
+
+def same(a, b):
+	return (len(a) == len(b)) and all((x == y).all() for x, y in zip(a, b))
+
+
+if __name__ == "__main__":
+	frames, widths = make_frames()
+	want = expected(frames, widths)
+
+	sink = FrameSink(None, height=HEIGHT)
+	push_frames(sink, frames, widths, HEIGHT)
+	sink.close()
+	passed  = check("complete frames", same(sink.frames, want))
+	passed &= check("frames start blank", (sink.frames[1][:, WIDTH // 2:] == BLANK).all())
+	passed &= check("partial dropped", sink.partial and (sink.written == len(frames)))
+
+	sink = FrameSink(None, height=HEIGHT)
+	push_frames(sink, frames, widths, HEIGHT)
+	sink.push(0, 0, 0, 0)
+	sink.close()
+	passed &= check("short frame dropped", sink.partial and same(sink.frames, want))
+
+	sink = FrameSink(None, height=HEIGHT)
+	push_frames(sink, frames, widths, HEIGHT, end=False)
+	sink.close()
+	passed &= check("last frame complete", same(sink.frames, want) and not sink.partial)
+
+	sink = FrameSink(None, height=HEIGHT)
+	push_frames(sink, frames, widths, HEIGHT - 1, end=False)
+	sink.close()
+	passed &= check("last frame short", same(sink.frames, want[:2]) and sink.partial)
+
+	sink = FrameSink(None, height=HEIGHT)
+	for n, (frame, width) in enumerate(zip(frames, widths)):
+		for y in range(HEIGHT):
+			sink.put_line(frame[y, :width], y, n + 1)
+	sink.close()
+	passed &= check("put_line", same(sink.frames, want) and not sink.partial)
+
+	with tempfile.TemporaryDirectory() as tmp:
+		raw = os.path.join(tmp, "frames.raw")
+		sink = FrameSink(raw, raw=True, height=HEIGHT)
+		push_frames(sink, frames, widths, HEIGHT)
+		sink.close()
+		passed &= check("raw stream", same(list(read_raw(raw)), want))
+
+		png = os.path.join(tmp, "frame_{}.png")
+		sink = FrameSink(png, height=HEIGHT)
+		push_frames(sink, frames, widths, HEIGHT)
+		sink.close()
+		passed &= check("png files", same([read_png(png.format(n)) for n in range(sink.written)], want))
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,94 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the line-batched output of LineOut: the pixels of VicFast are fed    #
+#  both to a FrameSink, pixel by pixel, and through LineOut to the put_line    #
+#  of a second FrameSink. Both must end up with the same frames.               #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from vic_fast   import *
+from line_out   import *
+from frame_sink import *
+from capture    import open_capture
+from bus_decode import decode_blocks
+
+import numpy as np
+
+input_path = get_abs_path("input/frame_dump.txt")
+
+PASSES = 2
+
+
+if __name__ == "__main__":
+	capture = open_capture(input_path)
+	engine  = VicFast()
+	engine.reset()
+
+	pixels = FrameSink(None)
+	lines  = FrameSink(None)
+	out    = LineOut(t_vic_specs_h63)
+
+	count = 0
+	def put_line(line, lnum, fcnt):
+		global count
+		count += 1
+		lines.put_line(line, lnum, fcnt)
+
+	out.sinks.append(put_line)
+
+	for f in range(PASSES):
+		for bus in decode_blocks(capture.words):
+			for n in engine.run(bus):
+				for i in range(n):
+					flag = engine.o_flag[i]
+					lstr = int(bool(flag & PIX_LSTR))
+					lend = int(bool(flag & PIX_LEND))
+					fstr = int(bool(flag & PIX_FSTR))
+					pixels.push(engine.o_colr[i], lstr, lend, fstr)
+					out   .push(engine.o_colr[i], lstr, lend, fstr)
+
+	out.flush()
+	pixels.close()
+	lines.close()
+
+	failed = sum(int((a != b).sum()) for a, b in zip(pixels.frames, lines.frames))
+
+	print(f"lines          = {count}")
+	print(f"frames         = {len(pixels.frames)}, {len(lines.frames)}")
+	print(f"mismatches     = {failed}")
+
+	if failed or (len(pixels.frames) != len(lines.frames)) or not count:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,127 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the timing of LineRam against the Array signal it stands in for:     #
+#  writes and clears become visible on the next edge, a clear drops a write    #
+#  staged before it on the same edge and keeps one staged after it, and a      #
+#  random sequence of writes, clears and reads matches a model of ram.nxt and  #
+#  ram.now.                                                                    #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+
+from line_ram import *
+
+import random
+
+SIZE  = 40
+EDGES = 20000
+
+
+class NxtModel:
+	"""
+	ram.now/ram.nxt of an Array signal, nxt being copied to now on each edge
+	"""
+	def __init__(self, size):
+		self.now = [0] * size
+		self.nxt = [0] * size
+
+	def clock(self):
+		self.now = list(self.nxt)
+
+	def write(self, addr, data):
+		self.nxt[addr] = data
+
+	def read(self, addr):
+		return self.now[addr]
+
+	def clear(self):
+		self.nxt = [0] * len(self.nxt)
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+if __name__ == "__main__":
+	ram = LineRam(SIZE)
+	ram.clock()
+	ram.write(3, 0x123)
+	passed = check("write is staged", ram.read(3) == 0)
+	ram.clock()
+	passed &= check("write on the next edge", ram.read(3) == 0x123)
+
+	ram.clear()
+	passed &= check("clear is staged", ram.read(3) == 0x123)
+	ram.clock()
+	passed &= check("clear on the next edge", ram.read(3) == 0)
+
+	ram.write(5, 0x55)
+	ram.clear()
+	ram.clock()
+	passed &= check("clear drops earlier write", ram.read(5) == 0)
+
+	ram.write(7, 0x11)
+	ram.clock()
+	ram.clear()
+	ram.write(6, 0x66)
+	ram.clock()
+	passed &= check("clear keeps later write", (ram.read(6) == 0x66) and (ram.read(7) == 0))
+
+	# the owner writes at most once per edge, as there is a single write port
+	rand  = random.Random(25)
+	ram   = LineRam(SIZE)
+	model = NxtModel(SIZE)
+	same  = True
+	for edge in range(EDGES):
+		ram.clock()
+		model.clock()
+		ops = [rand.choice(("write", "clear", "read")) for i in range(rand.randrange(3))]
+		if ops.count("write") > 1:
+			ops.remove("write")
+		for op in ops:
+			addr = rand.randrange(SIZE)
+			if op == "write":
+				data = rand.randrange(1 << 16)
+				ram.write(addr, data)
+				model.write(addr, data)
+			elif op == "clear":
+				ram.clear()
+				model.clear()
+			else:
+				same &= ram.read(addr) == model.read(addr)
+	passed &= check("random sequence", same and (list(ram.mem) == model.now))
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,122 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the rendered graphics rows against the cycle-exact graphics          #
+#  generator: VicFast playing back LineGfx rows must output the same color     #
+#  and background flag on every pixel as VicFast without them, also when the   #
+#  mode flags, xscroll and the background colors are written at random points  #
+#  of the display lines.                                                       #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from vic_fast    import *
+from capture     import open_capture
+from bus_decode  import decode_blocks
+
+import random
+
+input_path = get_abs_path("input/frame_dump.txt")
+
+PASSES = 2
+
+# one write to GFX_REGS every WRITE_CYCLES cycles on average from the second
+# pass on, touching only the bits that select the graphics pixels
+WRITE_CYCLES = 40
+WRITE_BITS   = {17: 0x60, 22: 0x17, 33: 0x0f, 34: 0x0f, 35: 0x0f, 36: 0x0f}
+
+
+class ProbeFast(VicFast):
+	def __init__(self, rows, writes):
+		super().__init__()
+		self.pixels = []
+		self.played = 0
+		self.writes = writes
+		self.count  = 0
+		if not rows:
+			self.line_gfx = None
+
+	def _gfx_gen(self, strb):
+		if strb & 1:
+			self.played += (self.gx_row_pos != 0)
+		super()._gfx_gen(strb)
+		if strb & 1:
+			self.pixels.append((self.gx_o_colr, self.gx_o_bgnd))
+
+	def _registers(self, strb, db, a, rw, cs, rst):
+		super()._registers(strb, db, a, rw, cs, rst)
+		if strb == 15:
+			write = self.writes.get(self.count)
+			if write is not None:
+				addr, data = write
+				mask = WRITE_BITS[addr]
+				self.rg_regs[addr] = (self.rg_regs[addr] & ~mask) | (data & mask)
+				self.rg_wmsk = 1 << addr
+			self.count += 1
+
+
+def make_writes(start, stop):
+	rand   = random.Random(22)
+	writes = {}
+	for cycl in range(start, stop):
+		if rand.randrange(WRITE_CYCLES) == 0:
+			writes[cycl] = (rand.choice(list(WRITE_BITS)), rand.randrange(256))
+	return writes
+
+
+if __name__ == "__main__":
+	capture = open_capture(input_path)
+	cycles  = sum(len(bus.ph0) // 16 for bus in decode_blocks(capture.words))
+	writes  = make_writes(cycles, PASSES * cycles)
+
+	engines = [ProbeFast(rows, writes) for rows in (True, False)]
+
+	for engine in engines:
+		engine.reset()
+		for f in range(PASSES):
+			for bus in decode_blocks(capture.words):
+				for n in engine.run(bus):
+					pass
+
+	rows, exact = engines
+	failed = sum(a != b for a, b in zip(rows.pixels, exact.pixels))
+	failed += abs(len(rows.pixels) - len(exact.pixels))
+
+	print(f"pixels         = {len(rows.pixels)}")
+	print(f"played back    = {rows.played}")
+	print(f"writes         = {len(writes)}")
+	print(f"mismatches     = {failed}")
+
+	if failed or not rows.played:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
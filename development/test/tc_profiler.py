@@ -0,0 +1,121 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the profiler on plain classes: attach() must replace _run on the     #
+#  class before the instances exist, count the calls per strobe value, keep    #
+#  the time of timed() callables and iterators apart, and detach() must put    #
+#  the original methods back.                                                  #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+import profiler as pf
+import time
+
+CALLS = 40
+SLEEP = 0.002
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+class Value:
+	def __init__(self):
+		self.dump = 0
+
+
+class Port:
+	def __init__(self):
+		self.now = Value()
+
+
+class Strobe:
+	def __init__(self):
+		self.o_strb = Port()
+
+	def _run(self):
+		self.o_strb.now.dump = (self.o_strb.now.dump + 1) % pf.NUM_STRB
+
+
+class Slow:
+	def __init__(self):
+		self.calls = 0
+
+	def _run(self):
+		self.calls += 1
+		time.sleep(SLEEP)
+
+
+class Vic:
+	def __init__(self):
+		self.e_strobe = Strobe()
+		self.e_slow   = Slow()
+
+
+if __name__ == "__main__":
+	original = Slow._run
+	pf.attach((Strobe, Slow))
+
+	# a scheduler that bound the methods when the entities were built
+	vic  = Vic()
+	runs = [vic.e_slow._run, vic.e_strobe._run]
+	pf.start(vic)
+
+	for i in range(CALLS):
+		for run in runs:
+			run()
+	pf.timed("testbench", lambda: time.sleep(SLEEP))()
+	steps = list(pf.timed("decode", iter(range(3))))
+	pf.stop()
+
+	rows = {r["entity"]: r for r in pf.report()}
+	slow = rows.get("Slow", {"calls": 0, "time": 0.0, "strobe": []})
+	passed  = check("bound methods timed", slow["calls"] == CALLS and vic.e_slow.calls == CALLS)
+	passed &= check("calls per strobe", slow["strobe"] == [CALLS // pf.NUM_STRB + (i < CALLS % pf.NUM_STRB) for i in range(pf.NUM_STRB)])
+	passed &= check("entity time", slow["time"] >= CALLS * SLEEP)
+	passed &= check("timed callable", rows["testbench"]["calls"] == 1 and rows["testbench"]["time"] >= SLEEP)
+	passed &= check("timed iterator", rows["decode"]["calls"] == 3 and steps == [0, 1, 2])
+
+	total = sum(r["time"] for r in rows.values())
+	passed &= check("other is the remainder", rows["(other)"]["time"] >= 0 and abs(total - (pf.t_stop - pf.t_start)) < 1e-9)
+	passed &= check("sorted by time", list(rows)[0] == "Slow")
+	passed &= check("table", all(name in pf.table() for name in ("Slow", "Strobe", "(other)")))
+
+	pf.detach()
+	passed &= check("detach", Slow._run is original and not pf.stats and not pf.patched)
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
@@ -0,0 +1,247 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Equivalence test between VicPassive and the behavioral VicFast engine:      #
+#  both run the whole capture twice from the same reset sequence and every     #
+#  pushed pixel, including its framing flags, must be identical, and so must   #
+#  the lines VicPassive hands to add_line_sink. A passing run records the      #
+#  digest of the pixel stream in input/vic_ref.json.                           #
+#  --fast-only runs VicFast alone against the recorded digests, it fails as    #
+#  long as no VicPassive run has been recorded.                                #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+import hashlib
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from ezhdl       import *
+from vic_passive import *
+from vic_fast    import *
+from line_out    import *
+from vic_ref     import *
+from capture     import open_capture
+from bus_decode  import decode_blocks
+
+import numpy as np
+
+input_path = get_abs_path("input/frame_dump.txt")
+
+PASSES = 2
+
+FAST_ONLY = "--fast-only" in sys.argv
+
+
+class PixelProbe(Entity):
+	def __init__(self):
+		self.i_clk  = Input(Wire())
+		self.i_push = Input(Wire())
+		self.i_lstr = Input(Wire())
+		self.i_lend = Input(Wire())
+		self.i_fstr = Input(Wire())
+		self.i_colr = Input(t_vic_colr)
+
+		self.pixels = []
+
+	def _run(self):
+		if self.i_clk.posedge():
+			if self.i_push.now == 1:
+				flag = ((PIX_LSTR if self.i_lstr.now else 0) |
+				        (PIX_LEND if self.i_lend.now else 0) |
+				        (PIX_FSTR if self.i_fstr.now else 0))
+				self.pixels.append((self.i_colr.now.dump, flag))
+
+
+class VicEquivTest(Entity):
+	def __init__(self, capture):
+		self.capture = capture
+
+		self.dut    = VicPassive()
+		self.probe  = PixelProbe()
+		self.clkgen = ClockGen(16.0e6)
+
+		self.clk = Signal(Wire())
+		self.rst = Signal(Wire())
+
+		self.clk           <<= self.clkgen.clk
+		self.dut.i_clk     <<= self.clk
+		self.dut.i_rst     <<= self.rst
+
+		self.probe.i_clk   <<= self.clk
+		self.probe.i_colr  <<= self.dut.o_colr
+		self.probe.i_push  <<= self.dut.o_push
+		self.probe.i_fstr  <<= self.dut.o_fstr
+		self.probe.i_lend  <<= self.dut.o_lend
+		self.probe.i_lstr  <<= self.dut.o_lstr
+
+		# the line-batched output of the DUT, checked against the pixels
+		self.lines = []
+		self.dut.add_line_sink(self.put_line)
+
+	def put_line(self, line, lnum, fcnt):
+		self.lines.append((line.copy(), lnum, fcnt))
+
+	@procedure
+	def _run(self):
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 1
+
+		yield from posedge(self.clk)
+		self.rst.nxt <<= 0
+
+		for f in range(PASSES):
+			for bus in decode_blocks(self.capture.words):
+				for ph0, db, a, rw, cs, aec in bus.rows():
+					yield from posedge(self.clk)
+					self.dut.i_ph0.nxt <<= ph0
+					self.dut.i_db .nxt <<= db
+					self.dut.i_a  .nxt <<= a
+					self.dut.i_rw .nxt <<= rw
+					self.dut.i_cs .nxt <<= cs
+					self.dut.i_aec.nxt <<= aec
+
+		# one more edge so that the DUT also consumes the last sample, as the
+		# engine does
+		yield from posedge(self.clk)
+		SimpleSim.stop()
+
+
+def run_fast(capture):
+	engine = VicFast()
+	engine.reset()
+
+	pixels = []
+	for f in range(PASSES):
+		for bus in decode_blocks(capture.words):
+			for n in engine.run(bus):
+				for i in range(n):
+					pixels.append((engine.o_colr[i], engine.o_flag[i]))
+	return pixels
+
+
+def split_lines(pixels):
+	"""
+	Lines of a stream of (color, flags) pairs, as LineOut hands them to its
+	sinks
+	"""
+	out   = LineOut(t_vic_specs_h63)
+	lines = []
+	out.sinks.append(lambda line, lnum, fcnt: lines.append((line.copy(), lnum, fcnt)))
+
+	for colr, flag in pixels:
+		out.push(colr, int(bool(flag & PIX_LSTR)), int(bool(flag & PIX_LEND)), int(bool(flag & PIX_FSTR)))
+	out.flush()
+
+	return lines
+
+
+def digest(pixels):
+	"""
+	Pixel count and SHA-256 of a stream of (color, flags) pairs
+	"""
+	data = np.array(pixels, dtype=np.uint8).tobytes()
+	return {"pixels": len(pixels), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def check_fast(fast):
+	"""
+	Compares VicFast with the recorded digests. The VicFast digest guards
+	against changes to the engine, the VicPassive one is only written by a
+	passing equivalence run
+	"""
+	ref  = load_ref()
+	dig  = digest(fast)
+	good = True
+
+	for engine in ("vic_fast", "vic_passive"):
+		if engine not in ref:
+			print(f"{engine:<12} not recorded")
+			good = False
+		elif ref[engine] != dig:
+			print(f"{engine:<12} differs: {ref[engine]}")
+			good = False
+		else:
+			print(f"{engine:<12} identical")
+
+	if not good:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
+	sys.exit(0)
+
+
+if __name__ == "__main__":
+	capture = open_capture(input_path)
+
+	print("Running VicFast")
+	fast = run_fast(capture)
+
+	if FAST_ONLY:
+		check_fast(fast)
+
+	print("Running VicPassive")
+	testcase = VicEquivTest(capture)
+	SimpleSim.run(testcase)
+	hdl = testcase.probe.pixels
+
+	frames = sum(1 for c, f in hdl if f & PIX_FSTR)
+	print(f"{len(hdl)} pixels from VicPassive, {len(fast)} from VicFast, {frames} frames")
+
+	for i in range(min(len(hdl), len(fast))):
+		if hdl[i] != fast[i]:
+			print(f"FAIL: first mismatch at pixel {i}: VicPassive {hdl[i]}, VicFast {fast[i]}")
+			sys.exit(1)
+
+	if len(hdl) != len(fast):
+		print("FAIL: pixel count mismatch")
+		sys.exit(1)
+
+	# lines passed to add_line_sink, the last one by flush_lines
+	testcase.dut.flush_lines()
+	lines = split_lines(fast)
+	print(f"{len(testcase.lines)} lines from VicPassive.add_line_sink, {len(lines)} from the pixels")
+
+	for i, ((a, an, af), (b, bn, bf)) in enumerate(zip(testcase.lines, lines)):
+		if (an, af) != (bn, bf) or not np.array_equal(a, b):
+			print(f"FAIL: first line mismatch at line {i}: VicPassive {an}/{af}, pixels {bn}/{bf}")
+			sys.exit(1)
+
+	if len(testcase.lines) != len(lines):
+		print("FAIL: line count mismatch")
+		sys.exit(1)
+
+	ref = load_ref()
+	ref["vic_passive"] = digest(hdl)
+	ref["vic_fast"]    = digest(fast)
+	save_ref(ref)
+	print(f"recorded in {ref_path}")
+
+	print("PASS")
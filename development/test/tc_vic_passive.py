@@ -26,6 +26,8 @@
 import sys
 sys.dont_write_bytecode = True
 
+import threading
+
 from ezpath import *
 
 add_rel_path("../src")
@@ -33,19 +35,118 @@ add_rel_path("../../resources/ezhdl")
 
 from ezhdl           import *
 from vic_passive     import *
-from frame_render    import *
-from frame_render_xl import *
+from vic_fast        import *
+from frame_sink      import *
+from vic_ref         import *
+from capture         import open_capture
+from bus_decode      import decode_blocks
+
+import checkpoint
+import event_trace
+import warm_start
+
+import profiler as pf
+
+# --headless replaces the plot and the xlsx export with a FrameSink, so that
+# neither matplotlib nor openpyxl are imported
+HEADLESS = "--headless" in sys.argv
+
+# --db writes the pixel analysis to an SQLite file instead of the xlsx
+DATABASE = "--db" in sys.argv
+
+# --profile times the sub-entities of the DUT, see profiler.py
+PROFILE = "--profile" in sys.argv
+
+# --save-states writes a checkpoint at every frame start, --resume <file>
+# continues from one, see VicTest and run_fast()
+SAVE_STATES = "--save-states" in sys.argv
+RESUME      = sys.argv[sys.argv.index("--resume") + 1] if "--resume" in sys.argv else None
+
+# --warm [file] starts from a warm_start snapshot, or from a pre-scan of the
+# capture when no file is given, and stops once the first settled frame, the
+# one after warm_start.PRIME_FRAMES frames, is complete
+WARM = "--warm" in sys.argv
+WARM_PATH = None
+if WARM and sys.argv.index("--warm") + 1 < len(sys.argv):
+	WARM_PATH = sys.argv[sys.argv.index("--warm") + 1]
+	if WARM_PATH.startswith("--"):
+		WARM_PATH = None
+
+if not HEADLESS:
+	from frame_render    import *
+	from frame_render_xl import *
+	from frame_render_db import *
 
 input_path  = get_abs_path("input/frame_dump.txt")
+frames_path = get_abs_path("output/frame_{:03d}.png")
+raw_path    = get_abs_path("output/frames.raw")
+db_path     = get_abs_path("output/frame_analysis.db")
+prof_path   = get_abs_path("output/profile.json")
+state_path  = get_abs_path("output/frame_{:04d}.vst")
+
+
+def make_sink():
+	if "--raw" in sys.argv:
+		return FrameSink(raw_path, raw=True)
+	return FrameSink(frames_path)
+
+
+def make_analysis():
+	# the analysis is the one consumer of the bus log, so it opts in here
+	trace = event_trace.attach()
+	if DATABASE:
+		return FrameRenderDb(db_path, trace)
+	return FrameRenderXl(trace)
+
+
+def save_analysis(analysis):
+	if DATABASE:
+		analysis.close()
+	else:
+		analysis.save("output/frame_analysis.xlsx")
+
+
+def get_warm(capture):
+	if not WARM:
+		return None
+	if WARM_PATH is not None:
+		return warm_start.load(WARM_PATH)
+	return warm_start.scan(capture.words)
+
+
+def segments(nsamples, warm):
+	"""
+	(lo, hi) sample ranges to feed in order. A warm start reads the capture
+	as a loop from its start position, which reaches the end of the first
+	settled frame well within PRIME_FRAMES + 2 turns
+	"""
+	if warm is None:
+		return [(0, nsamples)] * 2
+	return [(warm.start, nsamples), (0, warm.start)] * (warm_start.PRIME_FRAMES + 2)
+
+
+def save_profile():
+	if PROFILE:
+		pf.stop()
+		print(pf.table())
+		pf.dump(prof_path)
+
 
 class VicTest(Entity):
 	def __init__(self):
-		self.ifile = open(input_path)
-		self.lines = self.ifile.readlines()
+		self.capture = open_capture(input_path)
+		self.warm    = get_warm(self.capture)
+		self.ckpt    = None if RESUME is None else checkpoint.load(RESUME)
 
-		self.dut      = VicPassive()
-		self.render   = FrameRender()
-		self.renderxl = FrameRenderXl()
+		# the classes are instrumented before any of them is built
+		if PROFILE:
+			pf.attach(SUB_ENTITIES if HEADLESS else SUB_ENTITIES + (FrameRenderXl, FrameRenderDb))
+
+		self.dut      = VicPassive(REGS_INIT if self.warm is None else self.warm.regs)
+		if self.ckpt is not None:
+			self.dut.restore(self.ckpt.state)
+		self.render   = make_sink() if HEADLESS else FrameRender()
+		self.renderxl = None        if HEADLESS else make_analysis()
 		self.clkgen   = ClockGen(16.0e6)
 
 		self.clk = Signal(Wire())
@@ -56,13 +157,14 @@ class VicTest(Entity):
 		self.dut.i_clk       <<= self.clk
 		self.dut.i_rst       <<= self.rst
 
-		self.render.i_clk    <<= self.clk
-		self.render.i_rst    <<= self.rst
-		self.render.i_colr   <<= self.dut.o_colr
-		self.render.i_push   <<= self.dut.o_push
-		self.render.i_fstr   <<= self.dut.o_fstr
-		self.render.i_lend   <<= self.dut.o_lend
-		self.render.i_lstr   <<= self.dut.o_lstr
+		if PROFILE:
+			pf.start(self.dut)
+
+		# the renderer only needs whole lines
+		self.dut.add_line_sink(self.render.put_line)
+
+		if self.renderxl is None:
+			return
 
 		self.renderxl.i_clk  <<= self.clk
 		self.renderxl.i_rst  <<= self.rst
@@ -75,33 +177,150 @@ class VicTest(Entity):
 
 	@procedure
 	def _run(self):
-		yield from posedge(self.clk)
-		self.rst.nxt <<= 1
-
-		yield from posedge(self.clk)
-		self.rst.nxt <<= 0
-
-		for f in range(2):
-			for l in self.lines:
-				yield from posedge(self.clk)
-				line_val = int(l.split()[1])
-				self.dut.i_ph0.nxt <<= (line_val >> 21) & 1
-				self.dut.i_db .nxt <<= (line_val >> 9) & (2**12 - 1)
-				self.dut.i_a  .nxt <<= (line_val >> 3) & (2**6 - 1)
-				self.dut.i_rw .nxt <<= (line_val >> 2) & 1
-				self.dut.i_cs .nxt <<= (line_val >> 1) & 1
-				self.dut.i_aec.nxt <<= (line_val >> 0) & 1
+		# a restored state continues without a reset
+		words = self.capture.words
+		if self.ckpt is None:
+			yield from posedge(self.clk)
+			self.rst.nxt <<= 1
+
+			yield from posedge(self.clk)
+			self.rst.nxt <<= 0
+			segs = segments(len(words), self.warm)
+		else:
+			segs = [(self.ckpt.offset, len(words))]
+
+		drive  = pf.timed("testbench", self.drive) if PROFILE else self.drive
+		decode = (lambda it: pf.timed("bus decode", it)) if PROFILE else (lambda it: it)
+
+		warm     = self.warm is not None
+		line_out = self.dut.e_line_out
+		fcnt     = line_out.fcnt
+		for lo, hi in segs:
+			offset = lo
+			for bus in decode(decode_blocks(words[:hi], start=lo)):
+				for row in decode(bus.rows()):
+					yield from posedge(self.clk)
+
+					# the line being collected is part of the state, so no
+					# pixel is pending when a frame has just started
+					if SAVE_STATES and line_out.fcnt != fcnt:
+						fcnt = line_out.fcnt
+						checkpoint.save(state_path.format(fcnt), self.dut, offset, fcnt)
+
+					# the first settled frame is complete once the next one starts
+					if warm and (self.render.frame_count >= warm_start.PRIME_FRAMES + 2):
+						SimpleSim.stop()
+						return
+
+					drive(*row)
+					offset += 1
 
 		SimpleSim.stop()
 
 
+	def drive(self, ph0, db, a, rw, cs, aec):
+		self.dut.i_ph0.nxt <<= ph0
+		self.dut.i_db .nxt <<= db
+		self.dut.i_a  .nxt <<= a
+		self.dut.i_rw .nxt <<= rw
+		self.dut.i_cs .nxt <<= cs
+		self.dut.i_aec.nxt <<= aec
+
+
+def run_fast(render, renderxl):
+	"""
+	Runs the same test on the behavioral engine, feeding the renderers
+	directly instead of going through the simulator. With --save-states a
+	checkpoint is written at every frame start, with --resume <file> the
+	run continues from a checkpoint until the end of the capture
+	"""
+	capture = open_capture(input_path)
+	warm    = get_warm(capture)
+	engine  = VicFast(regs_init=REGS_INIT if warm is None else warm.regs)
+
+	def push(colr, flag):
+		lstr = int(bool(flag & PIX_LSTR))
+		lend = int(bool(flag & PIX_LEND))
+		fstr = int(bool(flag & PIX_FSTR))
+		render.push(colr, lstr, lend, fstr)
+		if renderxl is not None:
+			renderxl.push(colr, lstr, lend, fstr)
+
+	words = capture.words
+	if RESUME is None:
+		engine.reset()
+		fnum = -1
+		segs = segments(len(words), warm)
+	else:
+		ckpt = checkpoint.load(RESUME)
+		engine.restore(ckpt.state)
+		fnum = ckpt.frame
+		segs = [(ckpt.offset, len(words))]
+		for colr, flag in ckpt.pending:
+			push(colr, flag)
+
+	for lo, hi in segs:
+		offset = lo
+		for bus in decode_blocks(words[:hi], start=lo):
+			for n in engine.run(bus):
+				offset += 16
+				fstr = None
+				for i in range(n):
+					colr = engine.o_colr[i]
+					flag = engine.o_flag[i]
+					if (flag & PIX_FSTR) and (flag & PIX_LSTR):
+						fnum += 1
+						fstr  = i
+					push(colr, flag)
+
+				if SAVE_STATES and fstr is not None:
+					pending = [(engine.o_colr[i], engine.o_flag[i]) for i in range(fstr, n)]
+					checkpoint.save(state_path.format(fnum), engine, offset, fnum, pending)
+
+				if (warm is not None) and (fnum >= warm_start.PRIME_FRAMES + 1):
+					return
+
+
 if __name__ == "__main__":
-	SimpleSim.vcd_path = get_abs_path("output/waves.vcd")
-	SimpleSim.vcd_timescale = "ns"
-	SimpleSim.vcd_live = False
-	SimpleSim.force_dump = True
-	testcase = VicTest()
-	SimpleSim.run(testcase)
-
-	testcase.renderxl.save("output/frame_analysis.xlsx")
+	if "--fast" in sys.argv:
+		warn_stand_in()
+
+	if HEADLESS:
+		if "--fast" in sys.argv:
+			render = make_sink()
+			run_fast(render, None)
+		else:
+			testcase = VicTest()
+			render   = testcase.render
+			SimpleSim.run(testcase)
+			testcase.dut.flush_lines()
+			save_profile()
+		render.close()
+		print(f"{render.written} frames written")
+		if render.partial:
+			print("incomplete last frame dropped")
+		sys.exit(0)
+
+	if "--fast" in sys.argv:
+		render   = FrameRender()
+		renderxl = make_analysis()
+		sim = threading.Thread(target=run_fast, args=(render, renderxl))
+	else:
+		SimpleSim.vcd_path = get_abs_path("output/waves.vcd")
+		SimpleSim.vcd_timescale = "ns"
+		SimpleSim.vcd_live = False
+		SimpleSim.force_dump = True
+		testcase = VicTest()
+		render   = testcase.render
+		renderxl = testcase.renderxl
+		sim = threading.Thread(target=SimpleSim.run, args=(testcase,))
+
+	# the simulation runs in the background, the plot is refreshed from the
+	# main thread without ever blocking it
+	sim.start()
+	render.display(sim.is_alive)
+	sim.join()
+
+	save_profile()
+	save_analysis(renderxl)
 	input('Press "Enter" to terminate the test')
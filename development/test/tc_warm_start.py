@@ -0,0 +1,117 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Checks the warm start against a cold run with sprites enabled: the capture  #
+#  is run twice from a reset, and its second frame, rendered in steady state,  #
+#  must match the first settled frame of a warm start, after PRIME_FRAMES      #
+#  frames. The warm start is taken from warm_start.scan() and from the         #
+#  snapshot it saves, both on the capture and on the capture rotated to begin  #
+#  in the middle of a frame, where a cold run would not even be in sync.       #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+import sys
+sys.dont_write_bytecode = True
+
+from ezpath import *
+
+add_rel_path("../src")
+add_rel_path("../../resources/ezhdl")
+
+from vic_fast   import *
+from frame_sink import *
+from registers  import REGS_INIT
+from capture    import open_capture
+from bus_decode import decode_blocks
+
+import warm_start
+
+import numpy as np
+
+input_path = get_abs_path("input/frame_dump.txt")
+warm_path  = get_abs_path("output/tc_warm_start.json")
+
+PASSES = 2
+
+# start of line 100, in samples
+ROTATE = 16 * t_vic_specs_h63.cycl * 100
+
+
+def check(name, ok):
+	print(f"{name:<28} {'ok' if ok else 'FAILED'}")
+	return ok
+
+
+def render(words, regs, segs, frames):
+	"""
+	First <frames> complete frames of a VicFast run from a reset, feeding
+	the (lo, hi) sample ranges <segs> in order
+	"""
+	engine = VicFast(regs_init=regs)
+	engine.reset()
+	sink   = FrameSink(None)
+
+	for lo, hi in segs:
+		for bus in decode_blocks(words[:hi], start=lo):
+			for n in engine.run(bus):
+				for i in range(n):
+					flag = engine.o_flag[i]
+					sink.push(engine.o_colr[i], int(bool(flag & PIX_LSTR)),
+					          int(bool(flag & PIX_LEND)), int(bool(flag & PIX_FSTR)))
+			if len(sink.frames) >= frames:
+				return sink.frames[:frames]
+
+	sink.close()
+	return sink.frames[:frames]
+
+
+if __name__ == "__main__":
+	words  = open_capture(input_path).words
+	cold   = render(words, REGS_INIT, [(0, len(words))] * PASSES, 2)
+	passed = check("cold frames", len(cold) == 2)
+	steady = cold[-1]
+
+	settle = warm_start.PRIME_FRAMES
+	for name, shift in (("", 0), ("rotated ", ROTATE)):
+		capture = np.roll(np.asarray(words), -shift)
+		warm    = warm_start.scan(capture)
+		warm.save(warm_path)
+		for src, ws in (("scan", warm), ("snapshot", warm_start.load(warm_path))):
+			segs   = [(ws.start, len(capture)), (0, ws.start)] * (settle + 2)
+			frames = render(capture, ws.regs, segs, settle + 1)
+			passed &= check(f"{name}warm {src}", len(frames) == settle + 1 and (frames[settle] == steady).all())
+		if frames:
+			print(f"  unsettled first frame differs in {int((frames[0] != steady).sum())} pixels")
+
+	# the same frame without sprites must differ, or sprites were never drawn
+	regs = REGS_INIT[:]
+	regs[21] = 0
+	bare = render(words, regs, [(0, len(words))] * PASSES, 2)
+	passed &= check("frame has sprites", len(bare) == 2 and (bare[-1] != steady).any())
+
+	if not passed:
+		print("FAIL")
+		sys.exit(1)
+	print("PASS")
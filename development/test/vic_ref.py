@@ -0,0 +1,70 @@
+# ---------------------------------------------------------------------------- #
+#          .XXXXXXXXXXXXXXXX.  .XXXXXXXXXXXXXXXX.  .XX.                        #
+#          XXXXXXXXXXXXXXXXX'  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          XXXX                XXXX          XXXX  XXXX                        #
+#          XXXXXXXXXXXXXXXXX.  XXXXXXXXXXXXXXXXXX  XXXX                        #
+#          'XXXXXXXXXXXXXXXXX  XXXXXXXXXXXXXXXXX'  XXXX                        #
+#                        XXXX  XXXX                XXXX                        #
+#          .XXXXXXXXXXXXXXXXX  XXXX                XXXXXXXXXXXXXXXXX.          #
+#          'XXXXXXXXXXXXXXXX'  'XX'                'XXXXXXXXXXXXXXXX'          #
+# ---------------------------------------------------------------------------- #
+#              Copyright 2023 Vittorio Pascucci (SideProjectsLab)              #
+#                                                                              #
+#  Licensed under the GNU GENERAL PUBLIC LICENSE Version 3 (the "License");    #
+#  you may not use this file except in compliance with the License.            #
+#  You may obtain a copy of the License at                                     #
+#                                                                              #
+#      https://www.gnu.org/licenses/                                           #
+#                                                                              #
+#  Unless required by applicable law or agreed to in writing, software         #
+#  distributed under the License is distributed on an "AS IS" BASIS,           #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#  See the License for the specific language governing permissions and         #
+#  limitations under the License.                                              #
+# ---------------------------------------------------------------------------- #
+#                                                                              #
+#  Recorded result of the VicPassive/VicFast equivalence test (tc_vic_fast.py) #
+#  and the check that the tools running VicFast in place of VicPassive use to  #
+#  warn while that equivalence has not been recorded.                          #
+#                                                                              #
+# ---------------------------------------------------------------------------- #
+
+from ezpath import *
+
+import json
+
+ref_path = get_abs_path("input/vic_ref.json")
+
+
+def load_ref():
+	"""
+	Pixel stream digests by engine, see tc_vic_fast.py
+	"""
+	try:
+		with open(ref_path) as f:
+			return json.load(f)
+	except FileNotFoundError:
+		return {}
+
+
+def save_ref(ref):
+	with open(ref_path, "w") as f:
+		json.dump(ref, f, indent=1)
+
+
+def is_stand_in_verified():
+	"""
+	True once a passing tc_vic_fast.py run has recorded the VicPassive digest
+	and VicFast still produced the same one
+	"""
+	ref = load_ref()
+	return ("vic_passive" in ref) and (ref.get("vic_fast") == ref["vic_passive"])
+
+
+def warn_stand_in():
+	"""
+	Printed by the tools that run VicFast in place of VicPassive
+	"""
+	if not is_stand_in_verified():
+		print("WARNING: VicFast has not been checked against VicPassive, its results")
+		print("         only hold for VicPassive once tc_vic_fast.py has passed with ezhdl")